@@ -4,10 +4,14 @@ import json
 import os
 import argparse
 import sys
+import numpy as np
 from src.core.ecs import EntityManager
 from src.core.time_manager import TimeManager
 from src.core.input_manager import InputManager
 from src.core.config_manager import ConfigManager
+from src.core.prefabs import PrefabRegistry
+from src.core.scheduler import Scheduler
+from src.core.profiler import Profiler
 from src.world.grid import Grid, TERRAIN_WATER, TERRAIN_STONE, TERRAIN_GRASS, TERRAIN_DIRT, ZONE_STOCKPILE, ZONE_FARM, ZONE_RESIDENTIAL, ZONE_NONE
 from src.world.zone_manager import ZoneManager
 from src.systems.render_system import RenderSystem
@@ -28,6 +32,9 @@ def main():
     # 0. Parse Arguments
     parser = argparse.ArgumentParser(description="Project Medieval Game")
     parser.add_argument("--headless", action="store_true", help="Run in headless mode (no GUI)")
+    parser.add_argument("--profile", action="store_true", help="Enable the per-system profiler")
+    parser.add_argument("--path-workers", type=int, default=None,
+                        help="Pathfinding worker processes (default: pathfinding.workers in balance.json)")
     args = parser.parse_args()
 
     # 1. Initialization
@@ -42,6 +49,11 @@ def main():
     
     tick_rate = global_conf.get("tick_rate", 60)
     sim_conf = config_manager.get("simulation", {})
+    profiling_conf = config_manager.get("profiling", {})
+    Profiler.configure(args.profile or profiling_conf.get("enabled", False),
+                       history=profiling_conf.get("history_ticks", 300))
+    profile_dump_interval = profiling_conf.get("dump_interval_ticks", 600)
+    profile_dump_path = profiling_conf.get("dump_path", "logs/profile")
     day_length = sim_conf.get("day_length_seconds", 600.0)
     season_length = sim_conf.get("season_length_days", 90)
     starting_season = sim_conf.get("starting_season", "spring")
@@ -51,6 +63,7 @@ def main():
                                season_length_days=season_length, starting_season=starting_season)
     Logger.set_time_manager(time_manager)
     entity_manager = EntityManager()
+    prefabs = PrefabRegistry(entity_manager, config_manager)
     
     # World Generation - Realistic Medieval Village Layout
     pixels_per_unit = global_conf.get("pixels_per_unit", 32)
@@ -59,7 +72,8 @@ def main():
     # Create a larger map for a more realistic village
     map_width = max(80, width // pixels_per_unit + 20)  # At least 80 tiles wide
     map_height = max(60, height // pixels_per_unit + 20)  # At least 60 tiles tall
-    grid = Grid(map_width, map_height)
+    world_conf = config_manager.get("world", {})
+    grid = Grid(map_width, map_height, world_conf.get("chunk_size", 16))
     
     # ===== TERRAIN GENERATION =====
     # Create a realistic terrain layout
@@ -71,38 +85,40 @@ def main():
     
     # 1. Create a river flowing from north to south on the east side
     river_x = map_width - 8
-    for y in range(5, map_height - 5):
-        grid.set_terrain(river_x, y, TERRAIN_WATER)
-        if y % 3 == 0:  # Make river slightly wider in some places
-            if river_x + 1 < map_width:
-                grid.set_terrain(river_x + 1, y, TERRAIN_WATER)
+    river_ys = np.arange(5, map_height - 5)
+    river = np.zeros((2, river_ys.size), dtype=bool)
+    river[0] = True
+    river[1] = river_ys % 3 == 0  # Make river slightly wider in some places
+    grid.set_terrain_mask(river, TERRAIN_WATER, origin=(river_x, 5))
     
     # 2. Create farmland area (south, dirt terrain)
     farm_start_y = map_height // 2 + 5
-    for x in range(10, map_width - 15):
-        for y in range(farm_start_y, map_height - 5):
-            grid.set_terrain(x, y, TERRAIN_DIRT)
+    grid.fill_terrain((10, farm_start_y, map_width - 15, map_height - 5), TERRAIN_DIRT)
     
     # 3. Create stone quarry area (west)
-    for x in range(2, 8):
-        for y in range(10, 20):
-            if (x + y) % 3 == 0:  # Sparse stone patches
-                grid.set_terrain(x, y, TERRAIN_STONE)
+    quarry = np.add.outer(np.arange(2, 8), np.arange(10, 20)) % 3 == 0  # Sparse stone patches
+    grid.set_terrain_mask(quarry, TERRAIN_STONE, origin=(2, 10))
     
     # Rest is grass (default)
     Logger.info(f"Generated map: {map_width}x{map_height} tiles")
     
     # New Phase 3 Managers
-    zone_manager = ZoneManager(grid)
+    zone_manager = ZoneManager(grid, config_manager.get("stockpile.slot_capacity", 20))
     job_system = JobSystem()
     
     # Systems
-    action_system = ActionSystem(entity_manager, grid, config_manager)
+    action_system = ActionSystem(entity_manager, grid, config_manager, path_workers=args.path_workers,
+                                 zone_manager=zone_manager)
     ai_system = AISystem(entity_manager, job_system, grid, zone_manager, config_manager)
     needs_system = NeedsSystem(entity_manager, time_manager, config_manager)
     farming_system = FarmingSystem(entity_manager, job_system, grid, zone_manager, time_manager, config_manager)
     routine_system = RoutineSystem(entity_manager, time_manager, config_manager)
     survival_system = SurvivalSystem(entity_manager, time_manager, config_manager, grid)
+    # Logic systems in their serial order; the scheduler runs non-conflicting ones in parallel
+    scheduler = Scheduler(entity_manager, max_workers=sim_conf.get("scheduler_workers", 4))
+    for system in (needs_system, routine_system, farming_system, survival_system, ai_system, action_system):
+        scheduler.add_system(system)
+    Logger.info(f"System stages: {scheduler.describe()}")
 
     # 3. Graphics Setup (Conditional)
     screen = None
@@ -138,10 +154,8 @@ def main():
     stockpile_size = 4
     stockpile_start_x = village_center_x - stockpile_size // 2
     stockpile_start_y = village_center_y - stockpile_size // 2
-    for x in range(stockpile_start_x, stockpile_start_x + stockpile_size):
-        for y in range(stockpile_start_y, stockpile_start_y + stockpile_size):
-            if 0 <= x < map_width and 0 <= y < map_height:
-                zone_manager.mark_zone(x, y, ZONE_STOCKPILE)
+    zone_manager.mark_zone_region((stockpile_start_x, stockpile_start_y,
+                                   stockpile_start_x + stockpile_size, stockpile_start_y + stockpile_size), ZONE_STOCKPILE)
     stockpile_pos = (stockpile_start_x + stockpile_size // 2, stockpile_start_y + stockpile_size // 2)
     Logger.info(f"Created Stockpile zone at {stockpile_start_x}-{stockpile_start_x + stockpile_size}, {stockpile_start_y}-{stockpile_start_y + stockpile_size}")
     
@@ -149,10 +163,7 @@ def main():
     farm_size_x, farm_size_y = 8, 6
     farm_start_x = village_center_x - farm_size_x // 2
     farm_start_y = map_height // 2 + 8
-    for x in range(farm_start_x, farm_start_x + farm_size_x):
-        for y in range(farm_start_y, farm_start_y + farm_size_y):
-            if 0 <= x < map_width and 0 <= y < map_height:
-                zone_manager.mark_zone(x, y, ZONE_FARM)
+    zone_manager.mark_zone_region((farm_start_x, farm_start_y, farm_start_x + farm_size_x, farm_start_y + farm_size_y), ZONE_FARM)
     farm_pos = (farm_start_x + farm_size_x // 2, farm_start_y + farm_size_y // 2)
     Logger.info(f"Created Farm zone at {farm_start_x}-{farm_start_x + farm_size_x}, {farm_start_y}-{farm_start_y + farm_size_y}")
     
@@ -160,10 +171,8 @@ def main():
     residential_size = 5
     residential_start_x = village_center_x - residential_size // 2
     residential_start_y = village_center_y - residential_size - 3
-    for x in range(residential_start_x, residential_start_x + residential_size):
-        for y in range(residential_start_y, residential_start_y + residential_size):
-            if 0 <= x < map_width and 0 <= y < map_height:
-                zone_manager.mark_zone(x, y, ZONE_RESIDENTIAL)
+    zone_manager.mark_zone_region((residential_start_x, residential_start_y,
+                                   residential_start_x + residential_size, residential_start_y + residential_size), ZONE_RESIDENTIAL)
     residential_pos = (residential_start_x + residential_size // 2, residential_start_y + residential_size // 2)
     Logger.info(f"Created Residential zone at {residential_start_x}-{residential_start_x + residential_size}, {residential_start_y}-{residential_start_y + residential_size}")
     
@@ -177,33 +186,24 @@ def main():
     ]
     
     for i, (vx, vy) in enumerate(villager_positions):
-        villager = entity_manager.create_entity()
-        entity_manager.add_component(villager, PositionComponent(vx, vy))
-        entity_manager.add_component(villager, MovementComponent(speed=config_manager.get("entities.villager.move_speed", 50.0)))
-        entity_manager.add_component(villager, ActionComponent())
-        
-        # Different skill distributions
+        overrides = {
+            "HungerComponent": {"hunger": 30.0 + i * 5.0},  # Varying hunger
+            "TirednessComponent": {"tiredness": 15.0 + i * 3.0},  # Varying tiredness
+            "MoodComponent": {"mood": 65.0 + i * 5.0},  # Varying mood
+            "ColdComponent": {"cold": 10.0 + i * 2.0},  # Varying cold
+        }
+        # Different skill distributions (Balanced keeps the prefab's default_skills)
         if i == 0:  # Logger
-            skills = {"logging": 0.6, "farming": 0.2}
+            overrides["SkillComponent"] = {"skills": {"logging": 0.6, "farming": 0.2}}
         elif i == 1:  # Farmer
-            skills = {"logging": 0.2, "farming": 0.6}
-        else:  # Balanced
-            skills = config_manager.get("entities.villager.default_skills", {"logging": 0.1, "farming": 0.1})
-        
-        entity_manager.add_component(villager, SkillComponent(skills=skills))
-        entity_manager.add_component(villager, InventoryComponent(capacity=10))
-        entity_manager.add_component(villager, HungerComponent(hunger=30.0 + i * 5.0))  # Varying hunger
-        entity_manager.add_component(villager, TirednessComponent(tiredness=15.0 + i * 3.0))  # Varying tiredness
-        entity_manager.add_component(villager, MoodComponent(mood=65.0 + i * 5.0))  # Varying mood
-        entity_manager.add_component(villager, ColdComponent(cold=10.0 + i * 2.0))  # Varying cold
-        entity_manager.add_component(villager, RoutineComponent())
-        entity_manager.add_component(villager, IsSelectable())
-        entity_manager.add_component(villager, IsWalkable())
-        entity_manager.add_component(villager, IsVillager())  # All villagers get this tag
+            overrides["SkillComponent"] = {"skills": {"logging": 0.2, "farming": 0.6}}
         
+        components = prefabs.instantiate("villager", (vx, vy), overrides)
         # First villager is the player-selectable one
         if i == 0:
-            entity_manager.add_component(villager, IsPlayer())
+            components.append(IsPlayer())
+        villager = entity_manager.create_entity(*components)
+        skills = entity_manager.get_component(villager, SkillComponent).skills
         
         villagers.append(villager)
         Logger.info(f"Created Villager {i+1} at ({vx}, {vy}) with skills: {skills}")
@@ -219,35 +219,21 @@ def main():
     # Create a small forest cluster
     for x in range(forest_start_x, forest_start_x + forest_width, 3):
         for y in range(forest_start_y, forest_start_y + forest_height, 3):
-            if grid.is_walkable(x, y) and (x, y) not in tree_positions:
-                tree = entity_manager.create_entity()
-                entity_manager.add_component(tree, PositionComponent(x, y))
-                entity_manager.add_component(tree, ResourceComponent(
-                    resource_type="tree_oak",
-                    health=config_manager.get("entities.tree_oak.hp", 20),
-                    max_health=config_manager.get("entities.tree_oak.hp", 20)
-                ))
-                entity_manager.add_component(tree, IsTree())
-                entity_manager.add_component(tree, IsSelectable())
+            if grid.is_walkable(x, y):
                 tree_positions.append((x, y))
+    trees = prefabs.spawn_batch("tree_oak", tree_positions)
     
     Logger.info(f"Created {len(tree_positions)} trees in forest area")
     
     # Create initial chop jobs for some trees
-    for i, (tx, ty) in enumerate(tree_positions[:5]):  # First 5 trees get jobs
-        tree_entity = None
-        for e, pos in entity_manager.get_entities_with(PositionComponent):
-            if pos.x == tx and pos.y == ty:
-                tree_entity = e
-                break
-        if tree_entity:
-            chop_job = Job(
-                job_type="chop",
-                target_pos=(tx, ty),
-                target_entity_id=tree_entity,
-                required_skill="logging"
-            )
-            job_system.add_job(chop_job)
+    for tree_entity, (tx, ty) in zip(trees[:5], tree_positions):  # First 5 trees get jobs
+        chop_job = Job(
+            job_type="chop",
+            target_pos=(tx, ty),
+            target_entity_id=tree_entity,
+            required_skill="logging"
+        )
+        job_system.add_job(chop_job)
     
     # ===== SPAWN ITEMS =====
     # Initial food items near village center
@@ -256,14 +242,7 @@ def main():
         (village_center_x + 1, village_center_y + 1),
         (village_center_x, village_center_y + 2),
     ]
-    for fx, fy in food_positions:
-        food_entity = entity_manager.create_entity()
-        entity_manager.add_component(food_entity, PositionComponent(fx, fy))
-        entity_manager.add_component(food_entity, ItemComponent(
-            item_type="food_wheat",
-            amount=2,
-            food_value=30.0
-        ))
+    prefabs.spawn_batch("item_food_wheat", food_positions)
     
     # Seeds near farm area
     seed_positions = [
@@ -271,13 +250,7 @@ def main():
         (farm_start_x + 2, farm_start_y + 1),
         (farm_start_x + 3, farm_start_y + 1),
     ]
-    for sx, sy in seed_positions:
-        seed_entity = entity_manager.create_entity()
-        entity_manager.add_component(seed_entity, PositionComponent(sx, sy))
-        entity_manager.add_component(seed_entity, ItemComponent(
-            item_type="seed_wheat",
-            amount=3
-        ))
+    prefabs.spawn_batch("item_seed_wheat", seed_positions)
     
     Logger.info(f"Created {len(food_positions)} food items and {len(seed_positions)} seed items")
     
@@ -287,14 +260,9 @@ def main():
         (farm_start_x + 1, farm_start_y + 3),
         (farm_start_x + 2, farm_start_y + 3),
     ]
-    for cx, cy in crop_positions:
-        crop_entity = entity_manager.create_entity()
-        entity_manager.add_component(crop_entity, PositionComponent(cx, cy))
-        entity_manager.add_component(crop_entity, CropComponent(
-            crop_type="wheat",
-            growth_progress=0.7,  # Already 70% grown
-            state="growing"
-        ))
+    prefabs.spawn_batch("crop_wheat", crop_positions, {
+        "CropComponent": {"growth_progress": 0.7, "state": "growing"}  # Already 70% grown
+    })
     
     Logger.info(f"Created {len(crop_positions)} growing crops in farm zone")
     
@@ -349,17 +317,21 @@ def main():
             if input_manager.last_command:
                 cmd = input_manager.last_command
                 if cmd['type'] == 'SET_ZONE':
-                    # Place zone at clicked position
+                    # Paint zone over the dragged rectangle (a click paints one tile)
                     wx, wy = cmd['world_pos']
+                    ex, ey = cmd.get('world_end', (wx, wy))
                     tx = int(wx / pixels_per_unit)
                     ty = int(wy / pixels_per_unit)
+                    tx2 = int(ex / pixels_per_unit)
+                    ty2 = int(ey / pixels_per_unit)
                     zone_type = cmd['zone_type']
                     
-                    zone_manager.mark_zone(tx, ty, zone_type)
+                    painted = zone_manager.mark_zone_region(
+                        (min(tx, tx2), min(ty, ty2), max(tx, tx2) + 1, max(ty, ty2) + 1), zone_type)
                     zone_name = "Stockpile" if zone_type == ZONE_STOCKPILE else \
                                "Farm" if zone_type == ZONE_FARM else \
                                "Residential" if zone_type == ZONE_RESIDENTIAL else "Unknown"
-                    Logger.gameplay(f"Placed {zone_name} zone at ({tx}, {ty})")
+                    Logger.gameplay(f"Placed {zone_name} zone on {painted} tiles at ({tx}, {ty})-({tx2}, {ty2})")
                     
                 elif cmd['type'] == 'INTERACT_OR_MOVE':
                      wx, wy = cmd['world_pos']
@@ -572,12 +544,9 @@ def main():
             time_manager.update()
             
             # Update Logic Systems
-            needs_system.update(dt)
-            routine_system.update(dt)
-            farming_system.update(dt)
-            survival_system.update(dt)
-            ai_system.update(dt)
-            action_system.update(dt)
+            scheduler.run_frame(dt)
+            if Profiler.enabled:
+                Profiler.end_tick(time_manager.total_ticks)
             
             render_system.update(dt)
             ui_system.update_god_panel(
@@ -587,7 +556,8 @@ def main():
                 zoom=render_system.zoom_level,
                 zone_mode=input_manager.get_zone_placement_mode(),
                 season=time_manager.get_season(),
-                day_night_state=time_manager.get_day_night_state()
+                day_night_state=time_manager.get_day_night_state(),
+                slowest_systems=Profiler.slowest_systems(2) if Profiler.enabled else None
             )
             ui_system.update(dt)
             
@@ -597,18 +567,19 @@ def main():
             pygame.event.pump()
             
             time_manager.update()
-            needs_system.update(dt)
-            routine_system.update(dt)
-            farming_system.update(dt)
-            survival_system.update(dt)
-            ai_system.update(dt)
-            action_system.update(dt)
+            scheduler.run_frame(dt)
+            if Profiler.enabled:
+                Profiler.end_tick(time_manager.total_ticks)
+                if time_manager.total_ticks % profile_dump_interval == 0:
+                    Profiler.dump(profile_dump_path)
             
             # Logging (Every ~1 second)
             if time_manager.frame_count % 60 == 0:
                 # Log game time and day
                 game_time_str = f"Day {time_manager.day} {int(time_manager.time_of_day):02d}:{int((time_manager.time_of_day % 1.0) * 60):02d}"
                 Logger.info(f"[Headless] Game Time: {game_time_str} | Season: {time_manager.get_season()} | Tick: {time_manager.total_ticks}")
+                stage_times = " | ".join(f"{name} {t * 1000:.2f}ms" for name, t in scheduler.stage_timings)
+                Logger.info(f"[Scheduler] {stage_times}")
                 
                 # Log all villagers' status
                 for i, villager_id in enumerate(villagers):
@@ -678,6 +649,11 @@ def main():
                 
         clock.tick(tick_rate)
 
+    scheduler.shutdown()
+    action_system.shutdown()
+    if Profiler.enabled:
+        Profiler.dump(profile_dump_path)
+        Logger.info(f"Profile written to {profile_dump_path}.csv/.json")
     config_manager.stop()
     pygame.quit()
     Logger.info("Game Terminated")
@@ -1,6 +1,6 @@
 from dataclasses import dataclass, field
 from typing import List, Tuple, Optional
-from src.core.ecs import Component
+from src.core.ecs import Component, ColumnComponent, ColumnField
 
 @dataclass(slots=True)
 class PositionComponent(Component):
@@ -13,6 +13,7 @@ class MovementComponent(Component):
     speed: float = 1.0
     target: Optional[Tuple[int, int]] = None
     progress: float = 0.0  # Progress to next tile (0.0 to 1.0)
+    pathing: bool = False  # Waiting for a queued path request
 
 @dataclass(slots=True)
 class ResourceComponent(Component):
@@ -45,27 +46,27 @@ class JobComponent(Component):
     target_pos: Optional[Tuple[int, int]] = None
     target_entity_id: Optional[int] = None
 
-@dataclass(slots=True)
-class HungerComponent(Component):
-    hunger: float = 0.0  # 0-100, increases over time, decreases when eating
+@dataclass
+class HungerComponent(ColumnComponent):
+    hunger: float = ColumnField(0.0)  # 0-100, increases over time, decreases when eating
 
-@dataclass(slots=True)
-class TirednessComponent(Component):
-    tiredness: float = 0.0  # 0-100, increases when working, decreases when sleeping
+@dataclass
+class TirednessComponent(ColumnComponent):
+    tiredness: float = ColumnField(0.0)  # 0-100, increases when working, decreases when sleeping
 
-@dataclass(slots=True)
-class MoodComponent(Component):
-    mood: float = 50.0  # 0-100, affects work efficiency, influenced by food/rest/social
+@dataclass
+class MoodComponent(ColumnComponent):
+    mood: float = ColumnField(50.0)  # 0-100, affects work efficiency, influenced by food/rest/social
 
 @dataclass(slots=True)
 class DurabilityComponent(Component):
     current: float
     max: float
 
-@dataclass(slots=True)
-class CropComponent(Component):
+@dataclass
+class CropComponent(ColumnComponent):
     crop_type: str  # e.g., "wheat"
-    growth_progress: float = 0.0  # 0.0 to 1.0
+    growth_progress: float = ColumnField(0.0)  # 0.0 to 1.0
     state: str = "seed"  # "seed", "growing", "ripe"
     planted_time: float = 0.0  # Game time when planted
 
@@ -79,9 +80,9 @@ class RoutineComponent(Component):
     current_state: str = "WORKING"  # "SLEEPING", "WAKING", "EATING", "WORKING", "SOCIALIZING"
     next_scheduled_activity: Optional[str] = None
 
-@dataclass(slots=True)
-class ColdComponent(Component):
-    cold: float = 0.0  # 0-100, increases over time (faster at night/winter), decreases near fire
+@dataclass
+class ColdComponent(ColumnComponent):
+    cold: float = ColumnField(0.0)  # 0-100, increases over time (faster at night/winter), decreases near fire
 
 @dataclass(slots=True)
 class TrapComponent(Component):
@@ -91,9 +92,9 @@ class TrapComponent(Component):
     last_check_time: float = 0.0  # Game time when last checked
     catch_probability: float = 0.15  # Base catch probability
 
-@dataclass(slots=True)
-class FireComponent(Component):
-    fuel_remaining: float = 0.0  # Amount of fuel (logs) remaining
+@dataclass
+class FireComponent(ColumnComponent):
+    fuel_remaining: float = ColumnField(0.0)  # Amount of fuel (logs) remaining
     warmth_radius: int = 5  # Radius of warmth effect
     fuel_consumption_per_hour: float = 1.0  # Fuel consumed per game hour
 
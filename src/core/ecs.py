@@ -1,6 +1,10 @@
 import time
+import threading
 from dataclasses import dataclass, field
-from typing import Any, Type, TypeVar, Optional, Dict, Set, List, Iterable, Tuple
+from itertools import islice
+import numpy as np
+from typing import Any, Type, TypeVar, Optional, Dict, Set, List, Iterable, Iterator, Tuple, FrozenSet
+from src.core.profiler import Profiler
 
 # --- Component ---
 @dataclass(slots=True)
@@ -10,91 +14,653 @@ class Component:
 
 T = TypeVar('T', bound=Component)
 
+# --- Columnar Components ---
+class ColumnField:
+    """
+    Declares a numeric component field that lives in a dense NumPy column of the
+    entity's archetype instead of on the component instance.
+
+    Usage (the descriptor doubles as the dataclass default):
+        @dataclass
+        class HungerComponent(ColumnComponent):
+            hunger: float = ColumnField(0.0)
+    """
+    __slots__ = ('name', 'default', 'dtype')
+
+    def __init__(self, default: float = 0.0, dtype: Any = np.float64):
+        self.name = ''
+        self.default = default
+        self.dtype = dtype
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+
+    def __get__(self, obj: Any, owner: Optional[type] = None) -> Any:
+        if obj is None:
+            # Class access: report the default so @dataclass picks it up
+            return self.default
+        arrays = obj._ecs_arrays
+        if arrays is None:
+            return obj.__dict__[self.name]
+        return arrays[self.name][obj._ecs_row].item()
+
+    def __set__(self, obj: Any, value: Any):
+        arrays = obj._ecs_arrays
+        if arrays is None:
+            obj.__dict__[self.name] = value
+        else:
+            arrays[self.name][obj._ecs_row] = value
+
+class ColumnComponent(Component):
+    """
+    Base class for components with ColumnField attributes. Subclasses must use a plain
+    @dataclass (no slots). While attached to an entity, the instance is a proxy onto its
+    row in the archetype's NumPy columns; detached instances hold their values locally.
+    """
+    # name -> ColumnField, collected per subclass
+    _column_fields: Dict[str, ColumnField] = {}
+    # Set while attached: field name -> ndarray of the owning archetype, and the row index
+    _ecs_arrays: Optional[Dict[str, np.ndarray]] = None
+    _ecs_row: int = -1
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        fields = {}
+        for klass in reversed(cls.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, ColumnField):
+                    fields[name] = value
+        cls._column_fields = fields
+
+    def _attach(self, arrays: Dict[str, np.ndarray], row: int):
+        local = self.__dict__
+        for name in self._column_fields:
+            arrays[name][row] = local.pop(name)
+        self._ecs_arrays = arrays
+        self._ecs_row = row
+
+    def _detach(self):
+        arrays, row = self._ecs_arrays, self._ecs_row
+        self._ecs_arrays = None
+        for name in self._column_fields:
+            self.__dict__[name] = arrays[name][row].item()
+
 # --- System ---
+# Resource written by systems that change the entity layout immediately (create/destroy
+# entities, add/remove components outside the command buffer). Such systems run alone.
+STRUCTURE = "entity_structure"
+
 class System:
-    """Base class for all systems."""
+    """
+    Base class for all systems.
+    `reads` / `writes` list the component types (or shared resource names) the system
+    touches; the Scheduler uses them to decide which systems may run concurrently.
+    """
+    reads: Tuple[Any, ...] = ()
+    writes: Tuple[Any, ...] = ()
+
     def update(self, dt: float):
         raise NotImplementedError
 
+# Marks a row whose entity left the table while the table was being iterated
+TOMBSTONE = -1
+
+# --- Entity Handles ---
+# An entity ID packs a slot index (low bits) and the slot's generation (high bits).
+# Slots are recycled after destroy_entity; bumping the generation makes every old
+# handle to that slot stale, which has_entity detects with one comparison.
+ENTITY_INDEX_BITS = 24
+ENTITY_INDEX_MASK = (1 << ENTITY_INDEX_BITS) - 1
+
+def entity_slot(entity: int) -> int:
+    """Dense slot index of an entity handle (usable as an array index)."""
+    return entity & ENTITY_INDEX_MASK
+
+def entity_generation(entity: int) -> int:
+    return entity >> ENTITY_INDEX_BITS
+
+# --- Archetype ---
+class Archetype:
+    """
+    Table holding every entity that has exactly the same set of component types.
+    Storage is column-wise: row i of every column belongs to entities[i].
+    """
+    __slots__ = ('signature', 'mask', 'entities', 'rows', 'columns', 'add_edges', 'remove_edges', 'holes',
+                 'column_types', 'arrays', 'capacity')
+
+    def __init__(self, signature: FrozenSet[Type[Component]], mask: int = 0):
+        self.signature = signature
+        # Bitmask of the signature (one bit per component type, see EntityManager.component_mask)
+        self.mask = mask
+        self.entities: List[int] = []
+        # entity_id -> row index into entities / columns (live rows only)
+        self.rows: Dict[int, int] = {}
+        # component_type -> [component_instance per row]
+        self.columns: Dict[Type[Component], List[Component]] = {t: [] for t in signature}
+        # Cached transitions to neighbouring archetypes (component_type -> Archetype)
+        self.add_edges: Dict[Type[Component], 'Archetype'] = {}
+        self.remove_edges: Dict[Type[Component], 'Archetype'] = {}
+        # Number of TOMBSTONE rows waiting for compact()
+        self.holes = 0
+
+        # Dense NumPy storage for ColumnComponent fields: comp_type -> {field name -> ndarray}.
+        # Arrays hold `capacity` rows; the first len(entities) are in use.
+        self.column_types: Tuple[type, ...] = tuple(t for t in signature if issubclass(t, ColumnComponent))
+        self.capacity = 16 if self.column_types else 0
+        self.arrays: Dict[type, Dict[str, np.ndarray]] = {
+            t: {name: np.full(self.capacity, f.default, dtype=f.dtype) for name, f in t._column_fields.items()}
+            for t in self.column_types
+        }
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def column(self, comp_type: Type[ColumnComponent], name: str) -> np.ndarray:
+        """
+        Raw NumPy view of one ColumnField, aligned with self.entities.
+        Rows whose entity is TOMBSTONE hold stale values and may be written freely.
+        """
+        return self.arrays[comp_type][name][:len(self.entities)]
+
+    def _reserve(self, size: int):
+        if size <= self.capacity:
+            return
+        capacity = max(size, self.capacity * 2)
+        for fields in self.arrays.values():
+            for name, array in fields.items():
+                grown = np.empty(capacity, dtype=array.dtype)
+                grown[:len(array)] = array
+                # Replace in place: attached components hold a reference to this dict
+                fields[name] = grown
+        self.capacity = capacity
+
+    def append(self, entity: int, components: Dict[Type[Component], Component]):
+        """Appends a row. `components` must contain exactly one instance per signature type."""
+        row = len(self.entities)
+        self.rows[entity] = row
+        self.entities.append(entity)
+        for comp_type, column in self.columns.items():
+            column.append(components[comp_type])
+
+        if self.column_types:
+            self._reserve(row + 1)
+            for comp_type in self.column_types:
+                components[comp_type]._attach(self.arrays[comp_type], row)
+
+    def extend(self, entities: List[int], columns: Dict[Type[Component], List[Component]]):
+        """Appends many rows at once. `columns` holds one list per signature type, aligned with entities."""
+        start = len(self.entities)
+        self.entities.extend(entities)
+        self.rows.update(zip(entities, range(start, start + len(entities))))
+        for comp_type, column in self.columns.items():
+            column.extend(columns[comp_type])
+
+        if self.column_types:
+            end = len(self.entities)
+            self._reserve(end)
+            for comp_type in self.column_types:
+                arrays = self.arrays[comp_type]
+                components = columns[comp_type]
+                for name in comp_type._column_fields:
+                    arrays[name][start:end] = [c.__dict__.pop(name) for c in components]
+                for row, component in enumerate(components, start):
+                    component._ecs_arrays = arrays
+                    component._ecs_row = row
+
+    def replace(self, entity: int, component: Component):
+        """Swaps the component instance of an existing row."""
+        comp_type = type(component)
+        row = self.rows[entity]
+        column = self.columns[comp_type]
+        if comp_type in self.arrays:
+            column[row]._detach()
+            component._attach(self.arrays[comp_type], row)
+        column[row] = component
+
+    def pop(self, entity: int, keep_rows: bool = False) -> Dict[Type[Component], Component]:
+        """
+        Removes an entity's row and returns its components.
+        Normally the last row is swapped into the gap. With keep_rows=True the row is
+        left as a TOMBSTONE instead, so that row indices stay stable for running iterators.
+        """
+        row = self.rows.pop(entity)
+        components = {comp_type: column[row] for comp_type, column in self.columns.items()}
+        for comp_type in self.column_types:
+            components[comp_type]._detach()
+
+        if keep_rows:
+            for column in self.columns.values():
+                column[row] = None
+            self.entities[row] = TOMBSTONE
+            self.holes += 1
+            return components
+
+        last = len(self.entities) - 1
+        if row != last:
+            for column in self.columns.values():
+                column[row] = column[last]
+            for fields in self.arrays.values():
+                for array in fields.values():
+                    array[row] = array[last]
+            for comp_type in self.column_types:
+                self.columns[comp_type][row]._ecs_row = row
+            moved = self.entities[last]
+            self.entities[row] = moved
+            self.rows[moved] = row
+
+        for column in self.columns.values():
+            column.pop()
+        self.entities.pop()
+        return components
+
+    def compact(self):
+        """Drops TOMBSTONE rows and rebuilds the row index."""
+        live = [row for row, entity in enumerate(self.entities) if entity != TOMBSTONE]
+        self.entities[:] = [self.entities[row] for row in live]
+        for column in self.columns.values():
+            column[:] = [column[row] for row in live]
+        self.rows = {entity: row for row, entity in enumerate(self.entities)}
+        self.holes = 0
+
+        if self.column_types:
+            index = np.array(live, dtype=np.intp)
+            for fields in self.arrays.values():
+                for array in fields.values():
+                    array[:len(index)] = array[index]
+            for comp_type in self.column_types:
+                for row, component in enumerate(self.columns[comp_type]):
+                    component._ecs_row = row
+
+# --- View ---
+class View:
+    """
+    Registered query over a fixed tuple of component types.
+
+    The view keeps the list of matching archetypes up to date as new archetypes appear,
+    so iterating it only walks tables that already contain the matches.
+    Iteration is safe against structural changes made inside the loop:
+    - entities removed or moved out of a table are skipped (their rows are tombstoned
+      until the outermost iteration finishes);
+    - entities created or moved into a matching table during the loop are not visited
+      until the next iteration.
+    """
+    __slots__ = ('_manager', 'comp_types', 'mask', 'archetypes')
+
+    def __init__(self, manager: 'EntityManager', comp_types: Tuple[Type[Component], ...]):
+        self._manager = manager
+        self.comp_types = comp_types
+        self.mask = manager.component_mask(*comp_types)
+        self.archetypes: List[Archetype] = []
+
+    def matches(self, archetype: Archetype) -> bool:
+        return archetype.mask & self.mask == self.mask
+
+    def __len__(self) -> int:
+        return sum(len(archetype) for archetype in self.archetypes)
+
+    def tables(self) -> List[Archetype]:
+        """
+        Non-empty matching archetypes, for systems that process whole columns at once
+        (see Archetype.column).
+        """
+        tables = [archetype for archetype in self.archetypes if archetype.rows]
+        if Profiler.enabled:
+            Profiler.record_query(sum(len(archetype.entities) for archetype in tables))
+        return tables
+
+    def __iter__(self) -> Iterator[Tuple[int, ...]]:
+        """Yields (entity_id, comp1, comp2, ...) in the order of comp_types."""
+        manager = self._manager
+        comp_types = self.comp_types
+
+        # Freeze table lengths: rows appended during iteration belong to the next pass
+        tables = [(a, len(a.entities)) for a in self.archetypes if a.rows]
+        if Profiler.enabled:
+            Profiler.record_query(sum(length for _, length in tables))
+        if not tables:
+            return
+
+        # Views may be iterated from several scheduler threads at once
+        with manager._iter_lock:
+            manager._iter_depth += 1
+        try:
+            for archetype, length in tables:
+                rows = zip(archetype.entities, *[archetype.columns[t] for t in comp_types])
+                for row in islice(rows, length):
+                    if row[0] != TOMBSTONE:
+                        yield row
+        finally:
+            with manager._iter_lock:
+                manager._iter_depth -= 1
+                if not manager._iter_depth and manager._dirty_archetypes:
+                    manager._compact()
+
 # --- EntityManager ---
 class EntityManager:
     def __init__(self):
-        self._next_entity_id: int = 0
-        self._entities: Set[int] = set()
-        # component_type -> {entity_id -> component_instance}
-        self._components: Dict[Type[Component], Dict[int, Component]] = {}
-        
-        # Cache for queries could be added here, but keeping it simple for now.
-
-    def create_entity(self) -> int:
-        """Creates a new entity ID."""
-        entity = self._next_entity_id
-        self._next_entity_id += 1
-        self._entities.add(entity)
+        # Generation counter per slot, and slots freed by destroy_entity (reused LIFO)
+        self._generations: List[int] = []
+        self._free_slots: List[int] = []
+
+        # Archetype storage: entities with the same component set share one table.
+        # signature -> Archetype
+        self._archetypes: Dict[FrozenSet[Type[Component]], Archetype] = {}
+        # component_type -> bit in archetype/entity signatures (assigned on first use)
+        self._component_bits: Dict[Type[Component], int] = {}
+        # entity_id -> archetype currently holding the entity
+        self._entity_archetype: Dict[int, Archetype] = {}
+
+        # Registered queries: comp_types tuple -> View
+        self._views: Dict[Tuple[Type[Component], ...], View] = {}
+        # Number of view iterations in progress; while > 0 rows are tombstoned, not swapped
+        self._iter_depth = 0
+        self._iter_lock = threading.Lock()
+        self._dirty_archetypes: Set[Archetype] = set()
+
+        self._empty_archetype = self._get_archetype(frozenset())
+
+        # Structural changes recorded by systems, applied at sync points (flush_commands)
+        self.commands = CommandBuffer(self)
+
+    def _get_archetype(self, signature: FrozenSet[Type[Component]]) -> Archetype:
+        archetype = self._archetypes.get(signature)
+        if archetype is None:
+            archetype = Archetype(signature, self.component_mask(*signature))
+            self._archetypes[signature] = archetype
+            # Keep registered views current
+            for view in self._views.values():
+                if view.matches(archetype):
+                    view.archetypes.append(archetype)
+        return archetype
+
+    def component_mask(self, *comp_types: Type[Component]) -> int:
+        """Bitmask with one bit set per component type."""
+        bits = self._component_bits
+        mask = 0
+        for comp_type in comp_types:
+            bit = bits.get(comp_type)
+            if bit is None:
+                bit = bits[comp_type] = 1 << len(bits)
+            mask |= bit
+        return mask
+
+    def _pop_row(self, archetype: Archetype, entity: int) -> Dict[Type[Component], Component]:
+        if self._iter_depth:
+            self._dirty_archetypes.add(archetype)
+            return archetype.pop(entity, keep_rows=True)
+        return archetype.pop(entity)
+
+    def _compact(self):
+        for archetype in self._dirty_archetypes:
+            archetype.compact()
+        self._dirty_archetypes.clear()
+
+    def reserve_entity(self) -> int:
+        """
+        Allocates an entity handle without placing it in any table.
+        The entity has no components (and ignores add_component) until _place() is called;
+        CommandBuffer.spawn uses this to hand out IDs before the spawn is applied.
+        """
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = len(self._generations)
+            if slot > ENTITY_INDEX_MASK:
+                raise RuntimeError(f"Entity limit reached ({ENTITY_INDEX_MASK + 1} live entities)")
+            self._generations.append(0)
+        if Profiler.enabled:
+            Profiler.count("entities.created")
+        return (self._generations[slot] << ENTITY_INDEX_BITS) | slot
+
+    def _place(self, entity: int, components: Iterable[Component]):
+        """Inserts a reserved entity straight into the archetype of its full component set."""
+        by_type = {type(c): c for c in components}
+        archetype = self._get_archetype(frozenset(by_type))
+        archetype.append(entity, by_type)
+        self._entity_archetype[entity] = archetype
+
+    def create_entity(self, *components: Component) -> int:
+        """
+        Creates a new entity ID, reusing a freed slot if one is available.
+        Components passed here are stored in one step instead of one table move per add_component.
+        """
+        entity = self.reserve_entity()
+        if components:
+            self._place(entity, components)
+        else:
+            self._empty_archetype.append(entity, {})
+            self._entity_archetype[entity] = self._empty_archetype
         return entity
 
+    def create_entities(self, columns: Dict[Type[Component], List[Component]]) -> List[int]:
+        """
+        Creates len(column) entities sharing one component set in a single table insert.
+        `columns` maps each component type to its instances, one per new entity.
+        """
+        count = len(next(iter(columns.values()))) if columns else 0
+        # Recycled slots first, then a block of fresh slots (generation 0, so handle == slot)
+        entities = [self.reserve_entity() for _ in range(min(count, len(self._free_slots)))]
+        fresh = count - len(entities)
+        if fresh:
+            start = len(self._generations)
+            if start + fresh - 1 > ENTITY_INDEX_MASK:
+                raise RuntimeError(f"Entity limit reached ({ENTITY_INDEX_MASK + 1} live entities)")
+            self._generations.extend([0] * fresh)
+            entities.extend(range(start, start + fresh))
+            if Profiler.enabled:
+                Profiler.count("entities.created", fresh)
+
+        archetype = self._get_archetype(frozenset(columns))
+        archetype.extend(entities, columns)
+        entity_archetype = self._entity_archetype
+        for entity in entities:
+            entity_archetype[entity] = archetype
+        return entities
+
     def destroy_entity(self, entity: int):
-        """Removes an entity and all its components."""
-        if entity in self._entities:
-            self._entities.remove(entity)
-            for store in self._components.values():
-                if entity in store:
-                    del store[entity]
+        """Removes an entity and all its components. Its slot is recycled."""
+        archetype = self._entity_archetype.pop(entity, None)
+        if archetype is None:
+            if self.has_entity(entity):
+                # Reserved but never placed: just release the handle
+                self._release_slot(entity)
+            return
+        # Only the entity's own table is touched
+        self._pop_row(archetype, entity)
+        self._release_slot(entity)
+
+    def _release_slot(self, entity: int):
+        if Profiler.enabled:
+            Profiler.count("entities.destroyed")
+        slot = entity & ENTITY_INDEX_MASK
+        self._generations[slot] += 1
+        self._free_slots.append(slot)
 
     def has_entity(self, entity: int) -> bool:
-        """Checks if an entity exists."""
-        return entity in self._entities
+        """Checks if an entity handle is still alive (stale handles fail the generation check)."""
+        # A freed slot's generation is bumped immediately, so no issued handle matches it
+        slot = entity & ENTITY_INDEX_MASK
+        return slot < len(self._generations) and self._generations[slot] == entity >> ENTITY_INDEX_BITS
+
+    @property
+    def slot_count(self) -> int:
+        """Number of slots ever allocated; dense per-entity arrays need this many rows."""
+        return len(self._generations)
 
     def add_component(self, entity: int, component: Component):
-        """Adds a component to an entity."""
+        """Adds a component to an entity, replacing any existing one of the same type."""
+        archetype = self._entity_archetype.get(entity)
+        if archetype is None:
+            return
+
         comp_type = type(component)
-        if comp_type not in self._components:
-            self._components[comp_type] = {}
-        self._components[comp_type][entity] = component
+        if comp_type in archetype.columns:
+            # Same component set, just swap the instance in place
+            archetype.replace(entity, component)
+            return
+
+        target = archetype.add_edges.get(comp_type)
+        if target is None:
+            target = self._get_archetype(archetype.signature | {comp_type})
+            archetype.add_edges[comp_type] = target
+
+        components = self._pop_row(archetype, entity)
+        components[comp_type] = component
+        target.append(entity, components)
+        self._entity_archetype[entity] = target
 
     def remove_component(self, entity: int, comp_type: Type[T]):
         """Removes a component from an entity."""
-        if comp_type in self._components and entity in self._components[comp_type]:
-            del self._components[comp_type][entity]
+        archetype = self._entity_archetype.get(entity)
+        if archetype is None or comp_type not in archetype.columns:
+            return
+
+        target = archetype.remove_edges.get(comp_type)
+        if target is None:
+            target = self._get_archetype(archetype.signature - {comp_type})
+            archetype.remove_edges[comp_type] = target
+
+        components = self._pop_row(archetype, entity)
+        del components[comp_type]
+        target.append(entity, components)
+        self._entity_archetype[entity] = target
 
     def get_component(self, entity: int, comp_type: Type[T]) -> Optional[T]:
         """Retrieves a specific component for an entity."""
-        if comp_type in self._components:
-            return self._components[comp_type].get(entity)
-        return None
+        archetype = self._entity_archetype.get(entity)
+        if archetype is None:
+            return None
+        column = archetype.columns.get(comp_type)
+        if column is None:
+            return None
+        return column[archetype.rows[entity]]
 
     def has_component(self, entity: int, comp_type: Type[Component]) -> bool:
         """Checks if an entity has a specific component."""
-        return comp_type in self._components and entity in self._components[comp_type]
+        archetype = self._entity_archetype.get(entity)
+        bit = self._component_bits.get(comp_type)
+        return archetype is not None and bit is not None and archetype.mask & bit != 0
+
+    def has_components(self, entity: int, mask: int) -> bool:
+        """
+        Checks if an entity has every component in `mask` (see component_mask).
+        Build the mask once and reuse it: the test itself is a single AND.
+        """
+        archetype = self._entity_archetype.get(entity)
+        return archetype is not None and archetype.mask & mask == mask
+
+    def get_signature(self, entity: int) -> int:
+        """Component bitmask of an entity (0 if it does not exist)."""
+        archetype = self._entity_archetype.get(entity)
+        return archetype.mask if archetype is not None else 0
+
+    def flush_commands(self) -> int:
+        """Applies every command recorded in self.commands. Returns the number applied."""
+        return self.commands.flush()
+
+    def view(self, *comp_types: Type[Component]) -> View:
+        """
+        Returns the registered View for comp_types, creating it on first use.
+        Systems should fetch their views once (e.g. in __init__) and iterate them every tick.
+        """
+        view = self._views.get(comp_types)
+        if view is None:
+            with self._iter_lock:
+                view = self._views.get(comp_types)
+                if view is None:
+                    view = View(self, comp_types)
+                    view.archetypes = [a for a in self._archetypes.values() if view.matches(a)]
+                    self._views[comp_types] = view
+        return view
 
     def get_entities_with(self, *comp_types: Type[Component]) -> Iterable[Tuple[int, ...]]:
         """
         Yields (entity_id, comp1, comp2, ...) for entities that have ALL specified components.
-        This is a basic implementation. For production, consider Archetypes or Bitmasks.
+        Backed by the cached View for this signature; see View for iteration guarantees.
         """
         if not comp_types:
             return
+        yield from self.view(*comp_types)
+
+# --- Command Buffer ---
+CMD_SPAWN = 0
+CMD_DESTROY = 1
+CMD_ADD = 2
+CMD_REMOVE = 3
+
+class CommandBuffer:
+    """
+    Records structural changes (spawn, destroy, add/remove component) made during a
+    system update and applies them in one batch at a sync point.
+
+    Commands are applied in the order they were recorded. Spawned entities get their
+    handle immediately but only appear in queries after the flush, and go straight into
+    the table of their full component set. Commands aimed at entities that died in the
+    meantime are ignored, as with the immediate EntityManager calls.
+    """
+    def __init__(self, manager: EntityManager):
+        self._manager = manager
+        self._commands: List[Tuple[int, int, Any]] = []
+        # Systems in a parallel scheduler stage record into the same buffer
+        self._lock = threading.Lock()
+        # Entities with a destroy queued since the last flush
+        self._destroyed: Set[int] = set()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._commands)
+
+    def spawn(self, *components: Component) -> int:
+        """Queues a new entity with the given components and returns its handle."""
+        with self._lock:
+            entity = self._manager.reserve_entity()
+            self._commands.append((CMD_SPAWN, entity, components))
+        return entity
+
+    def destroy(self, entity: int) -> bool:
+        """
+        Queues an entity for destruction. Returns False if it is already dead or queued,
+        so callers can claim an entity once (e.g. two villagers picking up the same item).
+        """
+        with self._lock:
+            if entity in self._destroyed or not self._manager.has_entity(entity):
+                return False
+            self._destroyed.add(entity)
+            self._commands.append((CMD_DESTROY, entity, None))
+        return True
+
+    def is_destroyed(self, entity: int) -> bool:
+        """True if a destroy for this entity is waiting to be applied."""
+        with self._lock:
+            return entity in self._destroyed
+
+    def add_component(self, entity: int, component: Component):
+        with self._lock:
+            self._commands.append((CMD_ADD, entity, component))
+
+    def remove_component(self, entity: int, comp_type: Type[Component]):
+        with self._lock:
+            self._commands.append((CMD_REMOVE, entity, comp_type))
+
+    def flush(self) -> int:
+        """Applies all queued commands. Returns the number applied."""
+        # Swap first: commands recorded while applying (none today) go to the next flush
+        with self._lock:
+            commands = self._commands
+            if not commands:
+                return 0
+            self._commands = []
+            self._destroyed = set()
 
-        # Find the component type with the fewest entities to iterate over
-        # to minimize checks.
-        sorted_types = sorted(comp_types, key=lambda t: len(self._components.get(t, {})))
-        primary_type = sorted_types[0]
-        other_types = sorted_types[1:]
-
-        primary_store = self._components.get(primary_type, {})
-        
-        # Create a copy to allow modification during iteration
-        for entity, primary_comp in list(primary_store.items()):
-            components = [primary_comp]
-            has_all = True
-            for ot in other_types:
-                store = self._components.get(ot)
-                if store is None or entity not in store:
-                    has_all = False
-                    break
-                components.append(store[entity])
-            
-            if has_all:
-                # We need to return components in the order requested, not sorted order
-                # Re-fetch based on original order is safest/clearest
-                yield tuple([entity] + [self._components[t][entity] for t in comp_types])
+        manager = self._manager
+        for op, entity, arg in commands:
+            if op == CMD_SPAWN:
+                if manager.has_entity(entity):
+                    manager._place(entity, arg)
+            elif op == CMD_DESTROY:
+                manager.destroy_entity(entity)
+            elif op == CMD_ADD:
+                manager.add_component(entity, arg)
+            else:
+                manager.remove_component(entity, arg)
+        return len(commands)
@@ -20,6 +20,7 @@ class InputManager:
         # Zone placement mode
         self.zone_placement_mode: Optional[int] = None  # None, or zone_type ID
         self.zone_placement_pos: Optional[Tuple[int, int]] = None  # Tile position to place zone
+        self.zone_drag_start: Optional[Tuple[float, float]] = None  # World pos where a zone drag began
 
         # Key mappings
         self.key_map = {
@@ -72,7 +73,7 @@ class InputManager:
                         Logger.log(LogCategory.INPUT, "Zone placement: OFF")
                     else:
                         self.zone_placement_mode = ZONE_STOCKPILE
-                        Logger.log(LogCategory.INPUT, "Zone placement: STOCKPILE (Right-click to place)")
+                        Logger.log(LogCategory.INPUT, "Zone placement: STOCKPILE (Right-click or drag to place)")
                 elif event.key == pygame.K_f:
                     # Toggle farm placement mode
                     from src.world.grid import ZONE_FARM, ZONE_NONE
@@ -81,7 +82,7 @@ class InputManager:
                         Logger.log(LogCategory.INPUT, "Zone placement: OFF")
                     else:
                         self.zone_placement_mode = ZONE_FARM
-                        Logger.log(LogCategory.INPUT, "Zone placement: FARM (Right-click to place)")
+                        Logger.log(LogCategory.INPUT, "Zone placement: FARM (Right-click or drag to place)")
                 elif event.key == pygame.K_r:
                     # Toggle residential placement mode
                     from src.world.grid import ZONE_RESIDENTIAL, ZONE_NONE
@@ -90,7 +91,7 @@ class InputManager:
                         Logger.log(LogCategory.INPUT, "Zone placement: OFF")
                     else:
                         self.zone_placement_mode = ZONE_RESIDENTIAL
-                        Logger.log(LogCategory.INPUT, "Zone placement: RESIDENTIAL (Right-click to place)")
+                        Logger.log(LogCategory.INPUT, "Zone placement: RESIDENTIAL (Right-click or drag to place)")
                 elif event.key == pygame.K_x:
                     # Cancel zone placement mode
                     self.zone_placement_mode = None
@@ -117,12 +118,21 @@ class InputManager:
                          wx, wy = screen_to_world_callback(event.pos[0], event.pos[1])
                          # If in zone placement mode, set zone instead of move command
                          if self.zone_placement_mode is not None:
-                             # Convert world pos to tile pos (assuming pixels_per_unit)
-                             # We'll pass world pos and let main.py handle conversion
-                             self.zone_placement_pos = (wx, wy)
-                             self.last_command = {'type': 'SET_ZONE', 'world_pos': (wx, wy), 'zone_type': self.zone_placement_mode}
+                             # Zone is painted on release, over the dragged rectangle
+                             self.zone_drag_start = (wx, wy)
                          else:
                              self.last_command = {'type': 'INTERACT_OR_MOVE', 'world_pos': (wx, wy)}
+
+            elif event.type == pygame.MOUSEBUTTONUP:
+                if event.button == 3 and self.zone_drag_start is not None:
+                     if screen_to_world_callback and self.zone_placement_mode is not None:
+                         wx, wy = screen_to_world_callback(event.pos[0], event.pos[1])
+                         # Convert world pos to tile pos (assuming pixels_per_unit)
+                         # We'll pass world pos and let main.py handle conversion
+                         self.zone_placement_pos = self.zone_drag_start
+                         self.last_command = {'type': 'SET_ZONE', 'world_pos': self.zone_drag_start,
+                                              'world_end': (wx, wy), 'zone_type': self.zone_placement_mode}
+                     self.zone_drag_start = None
                     
         # Continuous Key State for smooth movement
         keys = pygame.key.get_pressed()
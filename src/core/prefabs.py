@@ -0,0 +1,141 @@
+import sys
+from dataclasses import fields
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+from src.core.ecs import Component, EntityManager
+from src.core.config_manager import ConfigManager
+from src.utils.logger import Logger
+
+# Prefab values starting with this prefix are looked up in the config, e.g. "$entities.tree_oak.hp"
+CONFIG_REF_PREFIX = "$"
+
+# Per-entity overrides: component class name -> {field: value}
+Overrides = Dict[str, Dict[str, Any]]
+
+def _copy_mutable(values: Dict[str, Any], mutable: Tuple[str, ...]) -> Dict[str, Any]:
+    """Copy of a kwargs dict with its dict/list values shallow-copied."""
+    values = values.copy()
+    for key in mutable:
+        values[key] = values[key].copy()
+    return values
+
+def _component_classes() -> Dict[str, Type[Component]]:
+    """Every imported Component subclass, by class name."""
+    classes = {}
+    pending = list(Component.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        # @dataclass(slots=True) replaces the class; the original lingers in __subclasses__
+        # until collected, so take whatever the defining module exports under that name
+        module = sys.modules.get(cls.__module__)
+        classes[cls.__name__] = getattr(module, cls.__qualname__, cls)
+    return classes
+
+class PrefabRegistry:
+    """
+    Entity templates loaded from the "prefabs" section of config/balance.json:
+
+        "prefabs": {
+            "tree_oak": {
+                "components": {
+                    "ResourceComponent": {"resource_type": "tree_oak", "health": "$entities.tree_oak.hp"},
+                    "IsTree": {}
+                }
+            }
+        }
+
+    Components are named by class; every prefab also gets a PositionComponent from the
+    spawn position. Templates are compiled on first use and recompiled after a config reload.
+    """
+    def __init__(self, entity_manager: EntityManager, config_manager: ConfigManager):
+        self.entity_manager = entity_manager
+        self.config_manager = config_manager
+        # prefab name -> (source dict it was compiled from, compiled template)
+        self._compiled: Dict[str, Tuple[dict, List[Tuple[type, Dict[str, Any], Tuple[str, ...]]]]] = {}
+        self._classes: Dict[str, Type[Component]] = {}
+
+    def names(self) -> List[str]:
+        return list(self.config_manager.get("prefabs", {}))
+
+    def _component_class(self, name: str) -> Type[Component]:
+        cls = self._classes.get(name)
+        if cls is None:
+            self._classes = _component_classes()
+            cls = self._classes.get(name)
+            if cls is None:
+                raise KeyError(f"Unknown component type in prefab: {name}")
+        return cls
+
+    def _resolve(self, value: Any) -> Any:
+        if isinstance(value, str) and value.startswith(CONFIG_REF_PREFIX):
+            return self.config_manager.get(value[len(CONFIG_REF_PREFIX):])
+        return value
+
+    def _template(self, prefab: str) -> List[Tuple[type, Dict[str, Any], Tuple[str, ...]]]:
+        source = self.config_manager.get(f"prefabs.{prefab}")
+        if source is None:
+            raise KeyError(f"Unknown prefab: {prefab}")
+        cached = self._compiled.get(prefab)
+        if cached is not None and cached[0] is source:
+            return cached[1]
+
+        template = []
+        for comp_name, spec in source.get("components", {}).items():
+            kwargs = {key: self._resolve(value) for key, value in spec.items()}
+            # Mutable values (skills dict, drops, ...) are copied per instance
+            mutable = tuple(key for key, value in kwargs.items() if isinstance(value, (dict, list)))
+            template.append((self._component_class(comp_name), kwargs, mutable))
+        self._compiled[prefab] = (source, template)
+        return template
+
+    def _position_class(self) -> Type[Component]:
+        return self._component_class("PositionComponent")
+
+    def instantiate(self, prefab: str, position: Optional[Tuple[int, int]] = None,
+                    overrides: Optional[Overrides] = None) -> List[Component]:
+        """Builds the component instances of one prefab without creating an entity."""
+        components = []
+        for cls, kwargs, mutable in self._template(prefab):
+            values = _copy_mutable(kwargs, mutable)
+            if overrides and cls.__name__ in overrides:
+                values.update(overrides[cls.__name__])
+            components.append(cls(**values))
+        if position is not None:
+            components.append(self._position_class()(position[0], position[1]))
+        return components
+
+    def spawn(self, prefab: str, position: Optional[Tuple[int, int]] = None,
+              overrides: Optional[Overrides] = None) -> int:
+        """Creates one entity from a prefab."""
+        return self.entity_manager.create_entity(*self.instantiate(prefab, position, overrides))
+
+    def spawn_batch(self, prefab: str, positions: Iterable[Tuple[int, int]],
+                    overrides: Optional[Overrides] = None) -> List[int]:
+        """
+        Creates one entity per position in a single pass. All of them share the prefab's
+        component set, so they are inserted into one archetype table with one extend.
+        """
+        positions = list(positions)
+        if not positions:
+            return []
+
+        columns: Dict[type, List[Component]] = {}
+        for cls, kwargs, mutable in self._template(prefab):
+            values = kwargs
+            if overrides and cls.__name__ in overrides:
+                values = {**kwargs, **overrides[cls.__name__]}
+                # Override values are shared by the whole batch too
+                mutable = tuple(key for key, value in values.items() if isinstance(value, (dict, list)))
+            if not values and not fields(cls):
+                # Stateless tag: one shared instance is indistinguishable from N copies
+                columns[cls] = [cls()] * len(positions)
+            elif mutable:
+                columns[cls] = [cls(**_copy_mutable(values, mutable)) for _ in positions]
+            else:
+                columns[cls] = [cls(**values) for _ in positions]
+        position_cls = self._position_class()
+        columns[position_cls] = [position_cls(x, y) for x, y in positions]
+
+        entities = self.entity_manager.create_entities(columns)
+        Logger.debug(f"Spawned {len(entities)} x {prefab}")
+        return entities
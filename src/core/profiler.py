@@ -0,0 +1,143 @@
+import csv
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+class Profiler:
+    """
+    Per-tick instrumentation, collected into fixed-size ring buffers.
+
+    Like Logger this is a process-wide singleton used through class methods. Hot paths
+    guard their calls with `if Profiler.enabled:` so a disabled profiler costs one
+    attribute check. Metric names are dotted strings:
+        system.<Name>.ms            wall time of System.update
+        query.<Name>.count / .rows  view iterations started by a system, and rows visited
+        path.calls / path.nodes     pathfinding requests and nodes expanded
+        path.unreachable            requests rejected by the region check
+        path.queue.done / .pending  queued requests finished this tick / still waiting
+        path.repairs                paths re-planned after terrain edits
+        path.cache.hits / .misses   path cache lookups
+        flow.rebuilds / .updates    full and incremental flow field recomputes
+        entities.created / .destroyed
+        tick.ms                     wall time of the scheduler frame
+    """
+    _instance = None
+    enabled = False
+    history = 300
+
+    # Accumulators for the tick in progress
+    _current: Dict[str, float] = {}
+    # metric -> ring buffer of per-tick values (0.0 for ticks where it was not recorded)
+    _series: Dict[str, Deque[float]] = {}
+    _ticks: Deque[int] = deque(maxlen=history)
+    _lock = threading.Lock()
+    # Name of the system running on this thread, for query attribution
+    _local = threading.local()
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Profiler, cls).__new__(cls)
+        return cls._instance
+
+    @classmethod
+    def configure(cls, enabled: bool, history: int = 300):
+        """Turns collection on or off and resets the ring buffers."""
+        cls.enabled = enabled
+        cls.history = history
+        cls.reset()
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._current = {}
+            cls._series = {}
+            cls._ticks = deque(maxlen=cls.history)
+
+    # --- Recording ---
+    @classmethod
+    def count(cls, metric: str, amount: float = 1.0):
+        with cls._lock:
+            cls._current[metric] = cls._current.get(metric, 0.0) + amount
+
+    @classmethod
+    def add_time(cls, metric: str, seconds: float):
+        cls.count(metric + ".ms", seconds * 1000.0)
+
+    @classmethod
+    def set_current_system(cls, name: Optional[str]):
+        cls._local.system = name
+
+    @classmethod
+    def record_query(cls, rows: int):
+        """Called by View iteration: attributes one query and its row count to the running system."""
+        system = getattr(cls._local, "system", None) or "other"
+        with cls._lock:
+            current = cls._current
+            key = f"query.{system}"
+            current[key + ".count"] = current.get(key + ".count", 0.0) + 1
+            current[key + ".rows"] = current.get(key + ".rows", 0.0) + rows
+
+    @classmethod
+    def end_tick(cls, tick: int):
+        """Moves the current accumulators into the ring buffers."""
+        with cls._lock:
+            current, cls._current = cls._current, {}
+            filled = len(cls._ticks)
+            cls._ticks.append(tick)
+            for metric, value in current.items():
+                if metric not in cls._series:
+                    # New metric: back-fill earlier ticks with zeros so series stay aligned
+                    cls._series[metric] = deque([0.0] * filled, maxlen=cls.history)
+                cls._series[metric].append(value)
+            for metric, series in cls._series.items():
+                if metric not in current:
+                    series.append(0.0)
+
+    # --- Reporting ---
+    @classmethod
+    def summary(cls) -> Dict[str, Tuple[float, float]]:
+        """metric -> (mean, max) over the ring buffer."""
+        with cls._lock:
+            return {
+                metric: (sum(series) / len(series), max(series))
+                for metric, series in cls._series.items() if series
+            }
+
+    @classmethod
+    def slowest_systems(cls, count: int = 3) -> List[Tuple[str, float]]:
+        """(system name, mean ms per tick), slowest first."""
+        systems = [
+            (metric[len("system."):-len(".ms")], mean)
+            for metric, (mean, _) in cls.summary().items()
+            if metric.startswith("system.")
+        ]
+        systems.sort(key=lambda item: item[1], reverse=True)
+        return systems[:count]
+
+    @classmethod
+    def dump(cls, path_prefix: str):
+        """Writes <prefix>.csv (one row per tick) and <prefix>.json (summary + series)."""
+        directory = os.path.dirname(path_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with cls._lock:
+            ticks = list(cls._ticks)
+            series = {metric: list(values) for metric, values in cls._series.items()}
+        metrics = sorted(series)
+
+        with open(path_prefix + ".csv", "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["tick"] + metrics)
+            for i, tick in enumerate(ticks):
+                writer.writerow([tick] + [round(series[m][i], 4) for m in metrics])
+
+        with open(path_prefix + ".json", "w", encoding="utf-8") as f:
+            json.dump({
+                "written_at": time.time(),
+                "ticks": ticks,
+                "summary": {m: {"mean": mean, "max": peak} for m, (mean, peak) in cls.summary().items()},
+                "series": series,
+            }, f)
@@ -0,0 +1,101 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from src.core.ecs import System, EntityManager, STRUCTURE
+from src.core.profiler import Profiler
+
+def _access(system: System) -> Tuple[frozenset, frozenset]:
+    reads, writes = frozenset(system.reads), frozenset(system.writes)
+    if not reads and not writes:
+        # Undeclared systems are assumed to touch everything
+        writes = frozenset((STRUCTURE,))
+    return reads, writes
+
+def _conflicts(a: System, b: System) -> bool:
+    a_reads, a_writes = _access(a)
+    b_reads, b_writes = _access(b)
+    if STRUCTURE in a_writes or STRUCTURE in b_writes:
+        return True
+    return bool(a_writes & (b_reads | b_writes) or b_writes & a_reads)
+
+class Scheduler:
+    """
+    Runs logic systems in dependency order.
+
+    Systems are added in their intended serial order and declare `reads` / `writes`
+    (component types, or names of shared resources such as "jobs"). A later system
+    depends on every earlier one it conflicts with; systems are grouped into stages by
+    their depth in that DAG, and the systems of one stage run concurrently on a thread pool.
+    After each stage the entity command buffer is flushed, so structural changes from
+    parallel systems must go through entity_manager.commands.
+    """
+    def __init__(self, entity_manager: EntityManager, max_workers: int = 4):
+        self.entity_manager = entity_manager
+        self.max_workers = max_workers
+        self.systems: List[System] = []
+        self.stages: List[List[System]] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+        # Timings of the last run_frame, in seconds
+        self.stage_timings: List[Tuple[str, float]] = []
+        self.system_timings: Dict[str, float] = {}
+
+    def add_system(self, system: System):
+        self.systems.append(system)
+        self._build_stages()
+
+    def _build_stages(self):
+        depth: List[int] = []
+        for i, system in enumerate(self.systems):
+            level = 0
+            for j in range(i):
+                if _conflicts(self.systems[j], system):
+                    level = max(level, depth[j] + 1)
+            depth.append(level)
+
+        self.stages = [[] for _ in range(max(depth) + 1)] if depth else []
+        for system, level in zip(self.systems, depth):
+            self.stages[level].append(system)
+
+    def describe(self) -> str:
+        return " -> ".join(
+            "[" + ", ".join(type(s).__name__ for s in stage) + "]" for stage in self.stages
+        )
+
+    def _run_system(self, system: System, dt: float):
+        name = type(system).__name__
+        if Profiler.enabled:
+            Profiler.set_current_system(name)
+        start = time.perf_counter()
+        system.update(dt)
+        elapsed = time.perf_counter() - start
+        self.system_timings[name] = elapsed
+        if Profiler.enabled:
+            Profiler.set_current_system(None)
+            Profiler.add_time(f"system.{name}", elapsed)
+
+    def run_frame(self, dt: float):
+        """Runs every stage once, flushing queued entity commands after each stage."""
+        self.stage_timings = []
+        frame_start = time.perf_counter()
+        for stage in self.stages:
+            start = time.perf_counter()
+            if len(stage) == 1 or self.max_workers <= 1:
+                for system in stage:
+                    self._run_system(system, dt)
+            else:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="system")
+                futures = [self._executor.submit(self._run_system, system, dt) for system in stage]
+                for future in futures:
+                    future.result()  # Re-raises exceptions from the worker
+            self.entity_manager.flush_commands()
+            name = "+".join(type(s).__name__ for s in stage)
+            self.stage_timings.append((name, time.perf_counter() - start))
+        if Profiler.enabled:
+            Profiler.add_time("tick", time.perf_counter() - frame_start)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -1,21 +1,73 @@
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 import math
-from src.core.ecs import System, EntityManager
+import time
+from src.core.ecs import System, EntityManager, STRUCTURE
 from src.components.data_components import ActionComponent, MovementComponent, PositionComponent, ResourceComponent, InventoryComponent, ItemComponent, DurabilityComponent, HungerComponent, MoodComponent, TirednessComponent, SleepStateComponent, CropComponent, ColdComponent, TrapComponent, FireComponent
 from src.components.skill_component import SkillComponent
 from src.core.config_manager import ConfigManager
+from src.core.prefabs import PrefabRegistry
 from src.world.grid import Grid
-from src.world.pathfinding import find_path
+from src.world.zone_manager import ZoneManager, STOCKPILE
+from src.world.path_cache import PathCache
+from src.world.path_queue import PathQueue, PathRequest
+from src.world.path_service import PathService
+from src.world.replanner import IncrementalPlanner
+from src.world.pathfinding import PathEngine
 from src.utils.logger import Logger, LogCategory
+from src.core.profiler import Profiler
+
+# Edits larger than this (tiles) reset the path planners instead of repairing them
+REPAIR_MAX_TILES = 64
 
 class ActionSystem(System):
-    def __init__(self, entity_manager: EntityManager, grid: Grid, config_manager: ConfigManager):
+    reads = (SkillComponent,)
+    writes = (ActionComponent, MovementComponent, PositionComponent, InventoryComponent, ItemComponent,
+              ResourceComponent, HungerComponent, TirednessComponent, MoodComponent, ColdComponent,
+              SleepStateComponent, CropComponent, TrapComponent, FireComponent, STOCKPILE, STRUCTURE)
+
+    def __init__(self, entity_manager: EntityManager, grid: Grid, config_manager: ConfigManager,
+                 path_workers: Optional[int] = None, zone_manager: Optional[ZoneManager] = None):
         self.entity_manager = entity_manager
         self.grid = grid
+        # Stockpile drops merge into the tile's stack when zones are known
+        self.zone_manager = zone_manager
         self.config_manager = config_manager
+        self.prefabs = PrefabRegistry(entity_manager, config_manager)
+        PathEngine.configure(jps=config_manager.get("pathfinding.jps", False))
+        self.path_cache = PathCache(grid, config_manager.get("pathfinding.cache_size", 512))
+        # Worker pool for big headless runs; otherwise a time-sliced queue on this thread
+        if path_workers is None:
+            path_workers = config_manager.get("pathfinding.workers", 0)
+        node_budget = config_manager.get("pathfinding.node_budget_per_tick", 2000)
+        ms_budget = config_manager.get("pathfinding.ms_budget_per_tick", 2.0)
+        if path_workers > 0:
+            self.path_queue = PathService(grid, path_workers, config_manager.get("pathfinding.worker_processes", True))
+        else:
+            self.path_queue = PathQueue(grid, node_budget, ms_budget)
+        # entity -> its in-flight path request
+        self._path_requests: Dict[int, PathRequest] = {}
+        # Entities whose request was made this tick and is not dispatched yet
+        self._unsent: List[int] = []
+        # Terrain edits since the last tick, and the D* Lite planners of paths they touched
+        self._terrain_edits: List[Tuple[int, int, int, int]] = []
+        self._planners: Dict[int, IncrementalPlanner] = {}
+        # Entities waiting for a path repair, oldest first (a dict as an ordered set), and
+        # the node / ms budget repairs get each tick, as the path queue does
+        self._repairs: Dict[int, None] = {}
+        self._repair_budget = (node_budget, ms_budget)
+        # entity -> (path being walked, chunks it crosses), and chunk -> entities, so an
+        # edit only looks at the paths through the chunks it touched
+        self._routes: Dict[int, Tuple[List[Tuple[int, int]], Set[Tuple[int, int]]]] = {}
+        self._routes_by_chunk: Dict[Tuple[int, int], Set[int]] = {}
+        grid.add_change_listener(self._on_grid_changed)
         self._fishing_progress = {}  # Track fishing progress per entity
 
     def update(self, dt: float):
+        if self._terrain_edits:
+            self._repair_paths()
+        if self._repairs:
+            self._run_repairs()
+
         # Process entities with ActionComponent
         for entity, action_comp in self.entity_manager.get_entities_with(ActionComponent):
             if action_comp.current_action == "idle":
@@ -57,6 +109,181 @@ class ActionSystem(System):
             elif action_comp.current_action == "tend_fire":
                 self._handle_tend_fire(entity, action_comp)
 
+        # Requests made this tick are dispatched, and get their first slice, right away
+        self._dispatch_paths()
+        self.path_queue.process()
+        self._drop_stale_requests()
+        self._drop_finished_routes()
+
+    def shutdown(self):
+        if isinstance(self.path_queue, PathService):
+            self.path_queue.shutdown()
+
+    # --- Path repair ---
+    def _on_grid_changed(self, x0: int, y0: int, x1: int, y1: int):
+        self._terrain_edits.append((x0, y0, x1, y1))
+
+    def _track_route(self, entity: int, path: List[Tuple[int, int]]):
+        """Indexes the path an entity walks by the chunks it crosses."""
+        self._untrack_route(entity, keep_planner=True)
+        size = self.grid.chunk_size
+        chunks = {(x // size, y // size) for x, y in path}
+        self._routes[entity] = (path, chunks)
+        for chunk in chunks:
+            self._routes_by_chunk.setdefault(chunk, set()).add(entity)
+
+    def _untrack_route(self, entity: int, keep_planner: bool = False):
+        route = self._routes.pop(entity, None)
+        if not keep_planner:
+            self._planners.pop(entity, None)
+        if route is None:
+            return
+        for chunk in route[1]:
+            entities = self._routes_by_chunk.get(chunk)
+            if entities is not None:
+                entities.discard(entity)
+                if not entities:
+                    del self._routes_by_chunk[chunk]
+
+    def _drop_finished_routes(self):
+        """Forgets routes, and their planners, of entities that arrived, re-targeted or died."""
+        for entity, (path, _) in list(self._routes.items()):
+            move_comp = self.entity_manager.get_component(entity, MovementComponent)
+            if move_comp is None or move_comp.path is not path or not path:
+                self._untrack_route(entity)
+
+    def _repair_paths(self):
+        """
+        Queues the paths that cross edited terrain for repair. Every D* Lite planner is
+        handed the edited tiles, and stays alive across edits; an entity gets a planner the
+        first time an edit blocks its path. Only paths through the edited chunks are queued.
+        """
+        edits, self._terrain_edits = self._terrain_edits, []
+        if any((x1 - x0) * (y1 - y0) > REPAIR_MAX_TILES for x0, y0, x1, y1 in edits):
+            # Bulk change: incremental repair would touch everything, start over on demand
+            self._planners.clear()
+        else:
+            tiles = [(x, y) for x0, y0, x1, y1 in edits for x in range(x0, x1) for y in range(y0, y1)]
+            for planner in self._planners.values():
+                planner.tiles_changed(tiles)
+
+        size = self.grid.chunk_size
+        affected: Set[int] = set()
+        for x0, y0, x1, y1 in edits:
+            for cx in range(x0 // size, (x1 - 1) // size + 1):
+                for cy in range(y0 // size, (y1 - 1) // size + 1):
+                    affected |= self._routes_by_chunk.get((cx, cy), set())
+
+        for entity in affected:
+            move_comp = self._repairable(entity)
+            if move_comp is None:
+                continue
+            planner = self._planners.get(entity)
+            if (planner is None or planner.goal != move_comp.path[-1]) and \
+                    all(self.grid.is_walkable(*step) for step in move_comp.path):
+                continue  # Still walkable; not worth a new search for a possible shortcut
+            self._repairs[entity] = None
+
+    def _repairable(self, entity: int) -> Optional[MovementComponent]:
+        """MovementComponent of an entity still walking its tracked route; forgets the route otherwise."""
+        move_comp = self.entity_manager.get_component(entity, MovementComponent)
+        route = self._routes.get(entity)
+        if move_comp is None or route is None or move_comp.path is not route[0] or not move_comp.path:
+            self._untrack_route(entity)
+            return None
+        return move_comp
+
+    def _run_repairs(self):
+        """
+        Repairs queued paths, oldest first, until this tick's node or millisecond budget
+        is spent; the rest wait for the next tick. A single repair is not split.
+        """
+        node_budget, ms_budget = self._repair_budget
+        deadline = time.perf_counter() + ms_budget / 1000.0
+        nodes = 0
+        while self._repairs and nodes < node_budget and time.perf_counter() < deadline:
+            entity = next(iter(self._repairs))
+            del self._repairs[entity]
+            move_comp = self._repairable(entity)
+            pos_comp = self.entity_manager.get_component(entity, PositionComponent)
+            if move_comp is None or pos_comp is None:
+                continue
+            goal = move_comp.path[-1]
+            planner = self._planners.get(entity)
+            if planner is None or planner.goal != goal:
+                planner = self._planners[entity] = IncrementalPlanner(self.grid, (pos_comp.x, pos_comp.y), goal)
+
+            path = planner.path((pos_comp.x, pos_comp.y))
+            nodes += planner.expanded
+            if not path or path[0] != move_comp.path[0]:
+                move_comp.progress = 0.0
+            move_comp.path = path
+            if path:
+                self._track_route(entity, path)
+            else:
+                self._untrack_route(entity)
+            if Profiler.enabled:
+                Profiler.count("path.repairs")
+
+    def _drop_stale_requests(self):
+        """Cancels requests of entities that died or no longer head for that target."""
+        for entity, request in list(self._path_requests.items()):
+            move_comp = self.entity_manager.get_component(entity, MovementComponent)
+            if move_comp is None or move_comp.target != request.end:
+                self.path_queue.cancel(request)
+                del self._path_requests[entity]
+                if move_comp is not None:
+                    move_comp.pathing = False
+
+    def _dispatch_paths(self):
+        """
+        Sends this tick's path requests to the path queue: requests sharing a goal go as
+        one batch, served by a single reverse search within the queue's budget.
+        """
+        unsent, self._unsent = self._unsent, []
+        by_goal: Dict[Tuple[int, int], List[int]] = {}
+        for entity in unsent:
+            request = self._path_requests.get(entity)
+            # id 0: created by _request_path, not yet owned by the queue
+            if request is not None and not request.done and request.id == 0:
+                by_goal.setdefault(request.end, []).append(entity)
+
+        for end, entities in by_goal.items():
+            if len(entities) == 1:
+                request = self._path_requests[entities[0]]
+                self._path_requests[entities[0]] = self.path_queue.submit(request.start, end)
+                continue
+            starts = [self._path_requests[entity].start for entity in entities]
+            for entity, request in zip(entities, self.path_queue.submit_batch(end, starts)):
+                self._path_requests[entity] = request
+
+    def _request_path(self, entity: int, move_comp: MovementComponent, start: Tuple[int, int],
+                      end: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """
+        Path from the cache, or from the path queue once it is ready. Returns None while
+        the entity is still waiting ("pathing"); [] when there is no path.
+        """
+        request = self._path_requests.get(entity)
+        if request is not None and (request.start != start or request.end != end):
+            # Re-targeted (or moved) since submitting: the old result is useless
+            self.path_queue.cancel(request)
+            request = None
+        if request is None:
+            path = self.path_cache.get(start, end)
+            if path is not None:
+                move_comp.pathing = False
+                return path
+            # Held until the end of the tick, so requests sharing a goal can be batched
+            request = self._path_requests[entity] = PathRequest(0, start, end)
+            self._unsent.append(entity)
+        if not request.done:
+            move_comp.pathing = True
+            return None
+        del self._path_requests[entity]
+        move_comp.pathing = False
+        self.path_cache.put(start, end, request.path)
+        return list(request.path)
+
     def _handle_move(self, entity: int, action_comp: ActionComponent, dt: float):
         move_comp = self.entity_manager.get_component(entity, MovementComponent)
         pos_comp = self.entity_manager.get_component(entity, PositionComponent)
@@ -75,7 +302,9 @@ class ActionSystem(System):
                 move_comp.target = None
                 return
                 
-            path = find_path(self.grid, start, end)
+            path = self._request_path(entity, move_comp, start, end)
+            if path is None:
+                return  # Pathing: wait for the queue
             if path:
                 move_comp.path = path
             else:
@@ -87,7 +316,12 @@ class ActionSystem(System):
 
         # 2. Follow path
         if move_comp.path:
+            route = self._routes.get(entity)
+            if route is None or route[0] is not move_comp.path:
+                self._track_route(entity, move_comp.path)
             target_step = move_comp.path[0]
+            if entity in self._repairs and not self.grid.is_walkable(*target_step):
+                return  # Blocked ahead: wait for the queued repair
             
             # Calculate distance (simplified, assuming grid movement)
             # We use a progress float 0..1 for smooth movement between tiles visually (optional)
@@ -103,6 +337,7 @@ class ActionSystem(System):
                 
                 # Re-check if we reached destination
                 if not move_comp.path:
+                    self._untrack_route(entity)
                     # If we were moving to a target for an interaction, keep the target in mind
                     # But for pure move action:
                     if action_comp.current_action == "move":
@@ -137,7 +372,8 @@ class ActionSystem(System):
                     (target_pos.x+1, target_pos.y), (target_pos.x-1, target_pos.y),
                     (target_pos.x, target_pos.y+1), (target_pos.x, target_pos.y-1)
                 ]
-                valid_neighbors = [n for n in neighbors if self.grid.is_walkable(*n)]
+                my_tile = (my_pos.x, my_pos.y)
+                valid_neighbors = [n for n in neighbors if self.grid.is_walkable(*n) and self.grid.is_reachable(my_tile, n)]
                 
                 if not valid_neighbors:
                     Logger.log(LogCategory.GAMEPLAY, f"Entity {entity}: Cannot reach tree at {target_pos.x},{target_pos.y}")
@@ -150,8 +386,11 @@ class ActionSystem(System):
                 move_comp.target = best_n
                 
                 if not move_comp.path and move_comp.target:
-                     # Calculate path
-                     move_comp.path = find_path(self.grid, (my_pos.x, my_pos.y), move_comp.target)
+                    # Same queued search as a move; the path arrives on a later tick
+                    path = self._request_path(entity, move_comp, my_tile, move_comp.target)
+                    if path is None:
+                        return  # Pathing: stay in "chop" and check again next frame
+                    move_comp.path = path
                 
                 if move_comp.path:
                     # Execute move step
@@ -198,23 +437,21 @@ class ActionSystem(System):
                 durability_loss = self.config_manager.get("entities.tools.axe_stone.durability_loss_per_use", 1.0)
                 # For now, we'll just log it - full tool system would track durability per tool
             
-            if target_res.health <= 0:
+            # Claim the tree: a second chopper this tick must not drop another log
+            if target_res.health <= 0 and self.entity_manager.commands.destroy(target_id):
                 Logger.log(LogCategory.GAMEPLAY, f"Entity {entity} chopped tree {target_id}!")
                 
                 # Spawn logs
                 drops = target_res.drops.get("log", [1, 1])
                 # Simplified: always spawn 1 log entity for now, or match drops logic
                 # We spawn an Item entity
-                log_entity = self.entity_manager.create_entity()
-                self.entity_manager.add_component(log_entity, PositionComponent(x=target_pos.x, y=target_pos.y))
-                self.entity_manager.add_component(log_entity, ItemComponent(item_type="log", amount=1))
+                self.entity_manager.commands.spawn(*self.prefabs.instantiate("item_log", (target_pos.x, target_pos.y)))
                 
                 if skill_comp:
                     current_skill = skill_comp.skills.get("logging", 0.0)
                     if current_skill < 1.0:
                         skill_comp.skills["logging"] = min(1.0, current_skill + 0.01)
 
-                self.entity_manager.destroy_entity(target_id)
                 action_comp.current_action = "idle"
                 action_comp.target_entity_id = None
 
@@ -228,17 +465,38 @@ class ActionSystem(System):
             
         inv_comp = self.entity_manager.get_component(entity, InventoryComponent)
         if inv_comp:
-            # Add to inventory
-            current_amount = inv_comp.items.get(item_comp.item_type, 0)
-            inv_comp.items[item_comp.item_type] = current_amount + item_comp.amount
-            
-            Logger.log(LogCategory.GAMEPLAY, f"Entity {entity} picked up {item_comp.amount} {item_comp.item_type}")
-            
-            self.entity_manager.destroy_entity(target_id)
+            # As much as the inventory has room for; the rest stays on the ground
+            room = inv_comp.capacity - sum(inv_comp.items.values())
+            taken = self._take_item(target_id, item_comp, room)
+            if taken:
+                current_amount = inv_comp.items.get(item_comp.item_type, 0)
+                inv_comp.items[item_comp.item_type] = current_amount + taken
+                Logger.log(LogCategory.GAMEPLAY, f"Entity {entity} picked up {taken} {item_comp.item_type}")
             
         action_comp.current_action = "idle"
         action_comp.target_entity_id = None
 
+    def _take_item(self, target_id: int, item_comp: ItemComponent, amount: int) -> int:
+        """
+        Takes up to amount units off an item entity, destroying it once empty, and keeps
+        its stockpile slot in step. Returns how many units were taken.
+        """
+        amount = min(amount, item_comp.amount)
+        commands = self.entity_manager.commands
+        if amount <= 0 or commands.is_destroyed(target_id):
+            return 0
+        if amount == item_comp.amount:
+            # destroy() fails if someone else already claimed the item this tick
+            if not commands.destroy(target_id):
+                return 0
+            if self.zone_manager:
+                self.zone_manager.stockpile.remove_stack(target_id)
+        else:
+            item_comp.amount -= amount
+            if self.zone_manager:
+                self.zone_manager.stockpile.withdraw(target_id, amount)
+        return amount
+
     def _handle_drop(self, entity: int, action_comp: ActionComponent):
         inv_comp = self.entity_manager.get_component(entity, InventoryComponent)
         pos_comp = self.entity_manager.get_component(entity, PositionComponent)
@@ -252,16 +510,50 @@ class ActionSystem(System):
         if inv_comp.items:
             item_type, amount = list(inv_comp.items.items())[0]
             if amount > 0:
-                # Create item entity
-                item_entity = self.entity_manager.create_entity()
-                self.entity_manager.add_component(item_entity, PositionComponent(x=pos_comp.x, y=pos_comp.y))
-                self.entity_manager.add_component(item_entity, ItemComponent(item_type=item_type, amount=amount))
+                tile = (pos_comp.x, pos_comp.y)
+                storage = self.zone_manager.stockpile if self.zone_manager else None
+                stored = min(amount, storage.room(tile, item_type, hauler=entity)) if storage else 0
+                if stored:
+                    # Merge into the tile's stack instead of adding another entity
+                    stack = storage.stack_at(tile, item_type)
+                    stack_item = self._live_stack(tile, stack, item_type)
+                    spawned = None
+                    if stack_item:
+                        stack_item.amount += stored
+                    else:
+                        spawned = ItemComponent(item_type=item_type, amount=stored)
+                        stack = self.entity_manager.commands.spawn(
+                            PositionComponent(x=pos_comp.x, y=pos_comp.y), spawned)
+                    storage.deposit(tile, item_type, stored, stack, hauler=entity, spawned=spawned)
+                if stored < amount:
+                    # Not storage, or the stack is full: the rest lies loose on the tile
+                    self.entity_manager.commands.spawn(
+                        PositionComponent(x=pos_comp.x, y=pos_comp.y),
+                        ItemComponent(item_type=item_type, amount=amount - stored)
+                    )
+                    if storage:
+                        storage.release(entity)
                 
                 del inv_comp.items[item_type]
                 Logger.log(LogCategory.GAMEPLAY, f"Entity {entity} dropped {amount} {item_type}")
                 
         action_comp.current_action = "idle"
     
+    def _live_stack(self, tile: Tuple[int, int], stack: Optional[int], item_type: str) -> Optional[ItemComponent]:
+        """
+        ItemComponent of a stockpile stack that still exists (or was spawned this tick)
+        and is not being picked up.
+        """
+        if stack is None or self.entity_manager.commands.is_destroyed(stack) or not self.entity_manager.has_entity(stack):
+            return None
+        item_comp = self.entity_manager.get_component(stack, ItemComponent)
+        if item_comp is None:
+            # Reserved but not placed yet: its spawn is still in the command buffer
+            item_comp = self.zone_manager.stockpile.pending_item(tile)
+        if item_comp is None or item_comp.item_type != item_type:
+            return None
+        return item_comp
+
     def _handle_eat(self, entity: int, action_comp: ActionComponent):
         """Handle eating action - consume food from inventory or ground."""
         inv_comp = self.entity_manager.get_component(entity, InventoryComponent)
@@ -289,28 +581,28 @@ class ActionSystem(System):
                         best_food_value = food_value
         
         # If no food in inventory, check if we're trying to eat from ground
+        from_ground = False
         if best_food_value == 0.0 and action_comp.target_entity_id:
             target_item = self.entity_manager.get_component(action_comp.target_entity_id, ItemComponent)
             if target_item:
                 item_config = self.config_manager.get(f"entities.items.{target_item.item_type}", {})
                 best_food_value = item_config.get("food_value", 0.0)
                 if best_food_value > 0.0:
-                    # Pick up and eat
-                    self._handle_pickup(entity, action_comp)
-                    # After pickup, food should be in inventory, so retry
-                    inv_comp = self.entity_manager.get_component(entity, InventoryComponent)
-                    if inv_comp and target_item.item_type in inv_comp.items:
+                    # Eat one unit straight off the stack; the rest stays where it is
+                    if self._take_item(action_comp.target_entity_id, target_item, 1):
                         best_food = target_item.item_type
+                        from_ground = True
                     else:
                         action_comp.current_action = "idle"
                         return
         
-        if best_food and best_food_value > 0.0 and inv_comp:
+        if best_food and best_food_value > 0.0 and (from_ground or inv_comp):
             # Consume food
-            if inv_comp.items.get(best_food, 0) > 0:
-                inv_comp.items[best_food] -= 1
-                if inv_comp.items[best_food] <= 0:
-                    del inv_comp.items[best_food]
+            if from_ground or inv_comp.items.get(best_food, 0) > 0:
+                if not from_ground:
+                    inv_comp.items[best_food] -= 1
+                    if inv_comp.items[best_food] <= 0:
+                        del inv_comp.items[best_food]
                 
                 # Reduce hunger
                 hunger_comp.hunger = max(0.0, hunger_comp.hunger - best_food_value)
@@ -432,8 +724,8 @@ class ActionSystem(System):
             action_comp.current_action = "idle"
             return
         
-        # Check if ripe
-        if crop_comp.state != "ripe":
+        # Check if ripe (and not already harvested by someone else this tick)
+        if crop_comp.state != "ripe" or not self.entity_manager.commands.destroy(target_id):
             action_comp.current_action = "idle"
             return
         
@@ -447,16 +739,15 @@ class ActionSystem(System):
             amount = random.randint(amount_range[0], amount_range[1])
             if amount > 0:
                 # Create food item entity
-                food_entity = self.entity_manager.create_entity()
-                self.entity_manager.add_component(food_entity, PositionComponent(x=crop_pos.x, y=crop_pos.y))
-                self.entity_manager.add_component(food_entity, ItemComponent(
-                    item_type=food_type,
-                    amount=amount,
-                    food_value=self.config_manager.get(f"entities.items.{food_type}.food_value", 0.0)
-                ))
-        
-        # Remove crop
-        self.entity_manager.destroy_entity(target_id)
+                self.entity_manager.commands.spawn(
+                    PositionComponent(x=crop_pos.x, y=crop_pos.y),
+                    ItemComponent(
+                        item_type=food_type,
+                        amount=amount,
+                        food_value=self.config_manager.get(f"entities.items.{food_type}.food_value", 0.0)
+                    )
+                )
+        
         Logger.log(LogCategory.GAMEPLAY, f"Entity {entity} harvested {crop_comp.crop_type} at ({crop_pos.x}, {crop_pos.y})")
         
         action_comp.current_action = "idle"
@@ -482,7 +773,8 @@ class ActionSystem(System):
             trap_comp = self.entity_manager.get_component(trap_entity, TrapComponent)
             trap_pos = self.entity_manager.get_component(trap_entity, PositionComponent)
             
-            if not trap_comp or not trap_pos:
+            # A trap that broke earlier this tick is waiting to be removed
+            if not trap_comp or not trap_pos or self.entity_manager.commands.is_destroyed(trap_entity):
                 action_comp.current_action = "idle"
                 return
             
@@ -509,20 +801,14 @@ class ActionSystem(System):
             # Try to catch
             if random.random() < catch_prob:
                 # Success! Generate meat
-                meat_entity = self.entity_manager.create_entity()
-                self.entity_manager.add_component(meat_entity, PositionComponent(x=trap_pos.x, y=trap_pos.y))
-                self.entity_manager.add_component(meat_entity, ItemComponent(
-                    item_type="meat",
-                    amount=1,
-                    food_value=self.config_manager.get("entities.items.meat.food_value", 40.0)
-                ))
+                self.entity_manager.commands.spawn(*self.prefabs.instantiate("item_meat", (trap_pos.x, trap_pos.y)))
                 Logger.log(LogCategory.GAMEPLAY, f"Entity {entity} caught meat in trap at ({trap_pos.x}, {trap_pos.y})")
                 
                 # Reduce trap durability
                 trap_comp.durability -= 1.0
                 if trap_comp.durability <= 0:
                     # Trap broken
-                    self.entity_manager.destroy_entity(trap_entity)
+                    self.entity_manager.commands.destroy(trap_entity)
                     Logger.log(LogCategory.GAMEPLAY, f"Trap at ({trap_pos.x}, {trap_pos.y}) broke!")
                 else:
                     trap_comp.last_check_time = 0.0  # Reset check time
@@ -536,7 +822,7 @@ class ActionSystem(System):
                 # No catch, but still reduce durability slightly
                 trap_comp.durability -= 0.1
                 if trap_comp.durability <= 0:
-                    self.entity_manager.destroy_entity(trap_entity)
+                    self.entity_manager.commands.destroy(trap_entity)
                     Logger.log(LogCategory.GAMEPLAY, f"Trap at ({trap_pos.x}, {trap_pos.y}) broke!")
                 trap_comp.last_check_time = 0.0
         
@@ -642,13 +928,7 @@ class ActionSystem(System):
             
             if random.random() < catch_prob:
                 # Success! Generate fish
-                fish_entity = self.entity_manager.create_entity()
-                self.entity_manager.add_component(fish_entity, PositionComponent(x=pos_comp.x, y=pos_comp.y))
-                self.entity_manager.add_component(fish_entity, ItemComponent(
-                    item_type="fish",
-                    amount=1,
-                    food_value=self.config_manager.get("entities.items.fish.food_value", 35.0)
-                ))
+                self.entity_manager.commands.spawn(*self.prefabs.instantiate("item_fish", (pos_comp.x, pos_comp.y)))
                 Logger.log(LogCategory.GAMEPLAY, f"Entity {entity} caught fish at ({pos_comp.x}, {pos_comp.y})")
                 
                 # Increase skill
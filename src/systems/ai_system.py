@@ -2,13 +2,19 @@ from typing import Optional, Tuple
 from src.core.ecs import System, EntityManager
 from src.components.data_components import ActionComponent, PositionComponent, JobComponent, InventoryComponent, ResourceComponent, ItemComponent, HungerComponent, TirednessComponent, MovementComponent, CropComponent, TrapComponent, FireComponent
 from src.components.skill_component import SkillComponent
-from src.systems.job_system import JobSystem, Job
+from src.systems.job_system import JobSystem, Job, JOBS
 from src.world.grid import Grid, ZONE_STOCKPILE, TERRAIN_WATER
-from src.world.zone_manager import ZoneManager
+from src.world.zone_manager import ZoneManager, STOCKPILE
+from src.world.flow_field import FlowFieldService
 from src.utils.logger import Logger, LogCategory
 from src.core.config_manager import ConfigManager
 
 class AISystem(System):
+    reads = (PositionComponent, HungerComponent, TirednessComponent, SkillComponent, InventoryComponent,
+             ItemComponent, ResourceComponent, CropComponent, TrapComponent, FireComponent)
+    # JobComponents are added and removed through the command buffer
+    writes = (ActionComponent, MovementComponent, JobComponent, JOBS, STOCKPILE)
+
     def __init__(self, entity_manager: EntityManager, job_system: JobSystem, grid: Grid, zone_manager: ZoneManager, config_manager: ConfigManager):
         self.entity_manager = entity_manager
         self.job_system = job_system
@@ -16,13 +22,27 @@ class AISystem(System):
         self.zone_manager = zone_manager
         self.config_manager = config_manager
         self._last_job_gen_tick = 0
+        # Entities whose JobComponent removal is queued this tick (applied at the next flush)
+        self._dropped_jobs = set()
+        # Shared distance fields for stockpile / residential trips
+        self.flow_fields = FlowFieldService(grid, zone_manager)
+        
+        # Registered queries (kept up to date by the EntityManager)
+        self._actors = entity_manager.view(ActionComponent, PositionComponent)
+        self._workers = entity_manager.view(JobComponent, ActionComponent, PositionComponent)
+        self._job_seekers = entity_manager.view(ActionComponent, SkillComponent, PositionComponent)
+        self._items = entity_manager.view(ItemComponent, PositionComponent)
+        self._resources = entity_manager.view(ResourceComponent, PositionComponent)
+        self._traps = entity_manager.view(TrapComponent, PositionComponent)
 
     def update(self, dt: float):
+        self._dropped_jobs.clear()
+
         # 0. Generate jobs from world state
         self._generate_jobs()
 
         # 1. Check for urgent needs (hunger, tiredness) - these interrupt jobs
-        for entity, action_comp, pos_comp in self.entity_manager.get_entities_with(ActionComponent, PositionComponent):
+        for entity, action_comp, pos_comp in self._actors:
             hunger_comp = self.entity_manager.get_component(entity, HungerComponent)
             tiredness_comp = self.entity_manager.get_component(entity, TirednessComponent)
             
@@ -30,13 +50,14 @@ class AISystem(System):
             if hunger_comp and hunger_comp.hunger > 80.0:
                 if action_comp.current_action not in ["eat", "move"]:
                     # Interrupt current job if any
-                    if self.entity_manager.has_component(entity, JobComponent):
+                    if self._has_job(entity):
                         job_comp = self.entity_manager.get_component(entity, JobComponent)
                         if job_comp:
                             job = self.job_system.get_job_by_id(job_comp.job_id)
                             if job:
                                 self.job_system.complete_job(job.id)
-                            self.entity_manager.remove_component(entity, JobComponent)
+                            self._drop_job(entity)
+                            self.zone_manager.stockpile.release(entity)
                     
                     # Try to find and eat food
                     self._find_and_eat_food(entity, action_comp, pos_comp)
@@ -46,28 +67,39 @@ class AISystem(System):
             if tiredness_comp and tiredness_comp.tiredness > 90.0:
                 if action_comp.current_action not in ["sleep", "move"]:
                     # Interrupt current job if any
-                    if self.entity_manager.has_component(entity, JobComponent):
+                    if self._has_job(entity):
                         job_comp = self.entity_manager.get_component(entity, JobComponent)
                         if job_comp:
                             job = self.job_system.get_job_by_id(job_comp.job_id)
                             if job:
                                 self.job_system.complete_job(job.id)
-                            self.entity_manager.remove_component(entity, JobComponent)
+                            self._drop_job(entity)
+                            self.zone_manager.stockpile.release(entity)
                     
                     # Try to find bed and sleep
                     self._find_and_sleep(entity, action_comp, pos_comp)
                     continue
 
         # 2. Handle entities with jobs
-        for entity, job_comp, action_comp, pos_comp in self.entity_manager.get_entities_with(JobComponent, ActionComponent, PositionComponent):
-            self._process_job(entity, job_comp, action_comp, pos_comp)
+        for entity, job_comp, action_comp, pos_comp in self._workers:
+            if entity not in self._dropped_jobs:
+                self._process_job(entity, job_comp, action_comp, pos_comp)
 
         # 3. Handle idle entities (find jobs)
-        for entity, action_comp, skill_comp, pos_comp in self.entity_manager.get_entities_with(ActionComponent, SkillComponent, PositionComponent):
+        for entity, action_comp, skill_comp, pos_comp in self._job_seekers:
             # Only look for job if no job and idle
-            if not self.entity_manager.has_component(entity, JobComponent) and action_comp.current_action == "idle":
+            if not self._has_job(entity) and action_comp.current_action == "idle":
                 self._find_job(entity, skill_comp, pos_comp)
 
+    def _has_job(self, entity: int) -> bool:
+        """Has a JobComponent that is not queued for removal."""
+        return entity not in self._dropped_jobs and self.entity_manager.has_component(entity, JobComponent)
+
+    def _drop_job(self, entity: int):
+        """Queues the JobComponent's removal; the entity counts as job-less for the rest of the tick."""
+        self.entity_manager.commands.remove_component(entity, JobComponent)
+        self._dropped_jobs.add(entity)
+
     def _generate_jobs(self):
         # Only generate jobs every 10 ticks to avoid spam
         from src.utils.logger import Logger
@@ -77,16 +109,9 @@ class AISystem(System):
         self._last_job_gen_tick = current_tick
         
         # Create Haul jobs for items on ground
-        for entity, item_comp, pos_comp in self.entity_manager.get_entities_with(ItemComponent, PositionComponent):
+        for entity, item_comp, pos_comp in self._items:
             # Check if already has a job
-            # Inefficient O(N*M) but fine for now
-            has_job = False
-            for job in self.job_system.jobs:
-                if job.target_entity_id == entity and job.job_type == "haul":
-                    has_job = True
-                    break
-            
-            if has_job:
+            if self.job_system.has_job_for("haul", entity):
                 continue
 
             # Check if item is already in stockpile
@@ -110,19 +135,13 @@ class AISystem(System):
         max_chop_jobs = 10  # Keep up to 10 chop jobs available
         
         if existing_chop_jobs < max_chop_jobs:
-            for entity, resource_comp, pos_comp in self.entity_manager.get_entities_with(ResourceComponent, PositionComponent):
+            for entity, resource_comp, pos_comp in self._resources:
                 # Check if it's a tree
                 if not self.entity_manager.has_component(entity, IsTree):
                     continue
                 
                 # Check if already has a job
-                has_job = False
-                for job in self.job_system.jobs:
-                    if job.target_entity_id == entity and job.job_type == "chop":
-                        has_job = True
-                        break
-                
-                if has_job:
+                if self.job_system.has_job_for("chop", entity):
                     continue
                 
                 # Create chop job
@@ -144,8 +163,12 @@ class AISystem(System):
         available_jobs = self.job_system.get_available_jobs()
         
         best_job = None
+        here = (pos_comp.x, pos_comp.y)
         # Very basic selection: Take first one that matches skill requirement
         for job in available_jobs:
+            # Skip targets walled off from us (region labels make this O(1))
+            if not self.grid.is_reachable(here, job.target_pos, adjacent=True):
+                continue
             if job.required_skill:
                 # Check if we have skill? For now, just assume everyone can do everything if level > 0
                 # Or just simple check
@@ -158,12 +181,17 @@ class AISystem(System):
         
         if best_job:
             self.job_system.assign_job(best_job, entity)
-            self.entity_manager.add_component(entity, JobComponent(
+            self.entity_manager.commands.add_component(entity, JobComponent(
                 job_id=best_job.id,
                 job_type=best_job.job_type,
                 target_pos=best_job.target_pos,
                 target_entity_id=best_job.target_entity_id
             ))
+            if best_job.job_type == "haul":
+                # Claim stockpile room now, so haulers picked this tick spread over the stockpile
+                item_comp = self.entity_manager.get_component(best_job.target_entity_id, ItemComponent)
+                amount = item_comp.amount if item_comp else 1
+                self.zone_manager.stockpile.reserve(entity, best_job.required_item, amount, best_job.target_pos)
             Logger.log(LogCategory.AI, f"Entity {entity} took job {best_job.job_type}")
 
     def _process_job(self, entity: int, job_comp: JobComponent, action_comp: ActionComponent, pos_comp: PositionComponent):
@@ -171,7 +199,7 @@ class AISystem(System):
         
         # If job is gone/invalid, clear component
         if not job:
-            self.entity_manager.remove_component(entity, JobComponent)
+            self._drop_job(entity)
             action_comp.current_action = "idle"
             return
 
@@ -195,7 +223,7 @@ class AISystem(System):
         if job.target_entity_id is not None and not self.entity_manager.has_entity(job.target_entity_id):
             # Target destroyed, job done
             self.job_system.complete_job(job.id)
-            self.entity_manager.remove_component(entity, JobComponent)
+            self._drop_job(entity)
             action_comp.current_action = "idle"
             return
 
@@ -227,8 +255,9 @@ class AISystem(System):
                 (target_pos[0]+1, target_pos[1]), (target_pos[0]-1, target_pos[1]),
                 (target_pos[0], target_pos[1]+1), (target_pos[0], target_pos[1]-1)
             ]
-            # Filter walkable
-            valid = [n for n in neighbors if self.grid.is_walkable(*n)]
+            # Filter walkable and reachable from here
+            here = (pos_comp.x, pos_comp.y)
+            valid = [n for n in neighbors if self.grid.is_walkable(*n) and self.grid.is_reachable(here, n)]
             if valid:
                 # Pick closest
                 best = min(valid, key=lambda n: abs(n[0]-pos_comp.x) + abs(n[1]-pos_comp.y))
@@ -246,7 +275,7 @@ class AISystem(System):
                  # Can't reach
                  Logger.log(LogCategory.AI, f"Entity {entity} can't reach tree at {target_pos}")
                  self.job_system.complete_job(job.id) # Cancel job
-                 self.entity_manager.remove_component(entity, JobComponent)
+                 self._drop_job(entity)
 
     def _handle_haul_job(self, entity: int, job: Job, action_comp: ActionComponent, pos_comp: PositionComponent):
         # 1. Check if we have the item
@@ -261,7 +290,8 @@ class AISystem(System):
             if job.target_entity_id is not None and not self.entity_manager.has_entity(job.target_entity_id):
                 # Item gone?
                 self.job_system.complete_job(job.id)
-                self.entity_manager.remove_component(entity, JobComponent)
+                self._drop_job(entity)
+                self.zone_manager.stockpile.release(entity)
                 action_comp.current_action = "idle"
                 return
             
@@ -280,17 +310,18 @@ class AISystem(System):
                      action_comp.current_action = "move"
         
         else:
-            # Have item, go to stockpile
-            stockpile_pos = self.zone_manager.get_nearest_zone_tile((pos_comp.x, pos_comp.y), ZONE_STOCKPILE)
+            # Have item, go to the reserved stockpile slot (or the nearest stockpile tile by path cost)
+            stockpile_pos = self._stockpile_slot(entity, job, inv_comp, pos_comp)
             
             if not stockpile_pos:
                 # No stockpile? Drop here or wait?
                 Logger.log(LogCategory.AI, f"Entity {entity} has no stockpile to haul to!")
                 # Drop it?
+                self.zone_manager.stockpile.release(entity)
                 action_comp.current_action = "drop"
                 # Complete job?
                 self.job_system.complete_job(job.id)
-                self.entity_manager.remove_component(entity, JobComponent)
+                self._drop_job(entity)
                 return
                 
             dist = abs(pos_comp.x - stockpile_pos[0]) + abs(pos_comp.y - stockpile_pos[1])
@@ -322,7 +353,7 @@ class AISystem(System):
                 from src.components.data_components import MovementComponent
                 move_comp = self.entity_manager.get_component(entity, MovementComponent)
                 if move_comp:
-                    move_comp.target = stockpile_pos
+                    self._move_to_zone(move_comp, pos_comp, stockpile_pos, ZONE_STOCKPILE)
                     action_comp.current_action = "move"
             
             # Fix for "Drop creates a loop":
@@ -339,6 +370,17 @@ class AISystem(System):
             # We complete job.
             # Perfect! It naturally completes.
     
+    def _stockpile_slot(self, entity: int, job: Job, inv_comp: InventoryComponent,
+                        pos_comp: PositionComponent) -> Optional[Tuple[int, int]]:
+        """Tile reserved for this haul; reserves one if the old tile stopped being stockpile."""
+        storage = self.zone_manager.stockpile
+        slot = storage.reservation(entity)
+        if slot is None:
+            amount = inv_comp.items.get(job.required_item, 0)
+            slot = storage.reserve(entity, job.required_item, amount, (pos_comp.x, pos_comp.y))
+        # Stockpile full: fall back to the nearest tile, where the drop makes a loose stack
+        return slot or self._nearest_zone_tile(pos_comp, ZONE_STOCKPILE)
+
     def _find_and_eat_food(self, entity: int, action_comp: ActionComponent, pos_comp: PositionComponent):
         """Find food in inventory or on ground and eat it. Uses priority system for food acquisition."""
         
@@ -361,7 +403,7 @@ class AISystem(System):
         best_food_entity = None
         min_dist = float('inf')
         
-        for food_entity, item_comp, food_pos in self.entity_manager.get_entities_with(ItemComponent, PositionComponent):
+        for food_entity, item_comp, food_pos in self._items:
             # Check if it's food
             item_config = self.config_manager.get(f"entities.items.{item_comp.item_type}", {})
             if item_config.get("food_value", 0.0) > 0:
@@ -396,7 +438,7 @@ class AISystem(System):
             best_trap = None
             min_trap_dist = float('inf')
             
-            for trap_entity, trap_comp, trap_pos in self.entity_manager.get_entities_with(TrapComponent, PositionComponent):
+            for trap_entity, trap_comp, trap_pos in self._traps:
                 if trap_comp.durability > 0:
                     dist = abs(pos_comp.x - trap_pos.x) + abs(pos_comp.y - trap_pos.y)
                     if dist < min_trap_dist and dist < 15:
@@ -455,7 +497,7 @@ class AISystem(System):
         from src.world.grid import ZONE_RESIDENTIAL
         
         # Find nearest residential zone
-        sleep_pos = self.zone_manager.get_nearest_zone_tile((pos_comp.x, pos_comp.y), ZONE_RESIDENTIAL)
+        sleep_pos = self._nearest_zone_tile(pos_comp, ZONE_RESIDENTIAL)
         
         if sleep_pos:
             dist = abs(pos_comp.x - sleep_pos[0]) + abs(pos_comp.y - sleep_pos[1])
@@ -467,12 +509,26 @@ class AISystem(System):
                 # Move to residential zone
                 move_comp = self.entity_manager.get_component(entity, MovementComponent)
                 if move_comp:
-                    move_comp.target = sleep_pos
+                    self._move_to_zone(move_comp, pos_comp, sleep_pos, ZONE_RESIDENTIAL)
                     action_comp.current_action = "move"
         else:
             # No residential zone, can't sleep
             Logger.log(LogCategory.AI, f"Entity {entity} is tired but no residential zone found!")
     
+    def _nearest_zone_tile(self, pos_comp: PositionComponent, zone_type: int) -> Optional[Tuple[int, int]]:
+        """Closest zone tile by path cost; falls back to straight-line distance if none is reachable."""
+        pos = (pos_comp.x, pos_comp.y)
+        return self.flow_fields.nearest(zone_type, pos) or self.zone_manager.get_nearest_zone_tile(pos, zone_type)
+
+    def _move_to_zone(self, move_comp: MovementComponent, pos_comp: PositionComponent, zone_pos: Tuple[int, int], zone_type: int):
+        """Walks down the zone's flow field instead of leaving an A* search to ActionSystem."""
+        if move_comp.target == zone_pos and move_comp.path:
+            return  # Already on the way
+        move_comp.target = zone_pos
+        move_comp.path = []
+        if self.flow_fields.nearest(zone_type, (pos_comp.x, pos_comp.y)) == zone_pos:
+            move_comp.path = self.flow_fields.path(zone_type, (pos_comp.x, pos_comp.y))
+
     def _handle_plant_job(self, entity: int, job: Job, action_comp: ActionComponent, pos_comp: PositionComponent):
         """Handle plant job - move to farm and plant seed."""
         from src.world.grid import ZONE_FARM
@@ -496,7 +552,7 @@ class AISystem(System):
         if job.target_entity_id is not None and not self.entity_manager.has_entity(job.target_entity_id):
             # Target destroyed, job done
             self.job_system.complete_job(job.id)
-            self.entity_manager.remove_component(entity, JobComponent)
+            self._drop_job(entity)
             action_comp.current_action = "idle"
             return
         
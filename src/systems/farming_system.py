@@ -1,6 +1,6 @@
 from src.core.ecs import System, EntityManager
 from src.components.data_components import CropComponent, PositionComponent, ItemComponent
-from src.systems.job_system import JobSystem, Job
+from src.systems.job_system import JobSystem, Job, JOBS
 from src.world.grid import Grid, ZONE_FARM
 from src.world.zone_manager import ZoneManager
 from src.core.time_manager import TimeManager
@@ -8,6 +8,9 @@ from src.core.config_manager import ConfigManager
 from src.utils.logger import Logger, LogCategory
 
 class FarmingSystem(System):
+    reads = (PositionComponent,)
+    writes = (CropComponent, JOBS)
+
     def __init__(self, entity_manager: EntityManager, job_system: JobSystem, grid: Grid, 
                  zone_manager: ZoneManager, time_manager: TimeManager, config_manager: ConfigManager):
         self.entity_manager = entity_manager
@@ -76,13 +79,7 @@ class FarmingSystem(System):
                 continue
             
             # Check if already has a job
-            has_job = False
-            for job in self.job_system.jobs:
-                if job.target_entity_id == entity and job.job_type == "harvest":
-                    has_job = True
-                    break
-            
-            if has_job:
+            if self.job_system.has_job_for("harvest", entity):
                 continue
             
             # Create harvest job (high priority)
@@ -2,6 +2,9 @@ from dataclasses import dataclass, field
 from typing import List, Optional, Tuple, Dict
 import uuid
 
+# Scheduler resource name for systems that read or modify the job board
+JOBS = "jobs"
+
 @dataclass
 class Job:
     job_type: str  # "chop", "haul"
@@ -16,11 +19,19 @@ class Job:
 class JobSystem:
     def __init__(self):
         self.jobs: List[Job] = []
+        # Lookup indexes, kept in sync with self.jobs
+        self._jobs_by_id: Dict[str, Job] = {}
+        # (job_type, target_entity_id) -> number of jobs
+        self._target_counts: Dict[Tuple[str, int], int] = {}
     
     def add_job(self, job: Job):
         self.jobs.append(job)
         # Sort by priority (higher first)
         self.jobs.sort(key=lambda j: j.priority, reverse=True)
+        self._jobs_by_id[job.id] = job
+        if job.target_entity_id is not None:
+            key = (job.job_type, job.target_entity_id)
+            self._target_counts[key] = self._target_counts.get(key, 0) + 1
 
     def get_available_jobs(self) -> List[Job]:
         return [j for j in self.jobs if j.assignee is None]
@@ -29,11 +40,22 @@ class JobSystem:
         job.assignee = entity_id
 
     def complete_job(self, job_id: str):
+        job = self._jobs_by_id.pop(job_id, None)
+        if job is None:
+            return
         self.jobs = [j for j in self.jobs if j.id != job_id]
+        if job.target_entity_id is not None:
+            key = (job.job_type, job.target_entity_id)
+            remaining = self._target_counts[key] - 1
+            if remaining:
+                self._target_counts[key] = remaining
+            else:
+                del self._target_counts[key]
         
     def get_job_by_id(self, job_id: str) -> Optional[Job]:
-        for job in self.jobs:
-            if job.id == job_id:
-                return job
-        return None
+        return self._jobs_by_id.get(job_id)
+
+    def has_job_for(self, job_type: str, target_entity_id: int) -> bool:
+        """Checks if a job of this type already targets the entity."""
+        return (job_type, target_entity_id) in self._target_counts
 
@@ -1,9 +1,20 @@
+from typing import Tuple
+import numpy as np
 from src.core.ecs import System, EntityManager
 from src.components.data_components import HungerComponent, TirednessComponent, MoodComponent, ActionComponent
 from src.core.time_manager import TimeManager
 from src.core.config_manager import ConfigManager
 
+# ActionComponent.current_action -> activity code; any other action counts as working
+ACTIVITY_RESTING = 0
+ACTIVITY_SLEEPING = 1
+ACTIVITY_WORKING = 2
+ACTIVITY_CODES = {"idle": ACTIVITY_RESTING, "eat": ACTIVITY_RESTING, "sleep": ACTIVITY_SLEEPING}
+
 class NeedsSystem(System):
+    reads = (ActionComponent,)
+    writes = (HungerComponent, TirednessComponent, MoodComponent)
+
     def __init__(self, entity_manager: EntityManager, time_manager: TimeManager, config_manager: ConfigManager):
         self.entity_manager = entity_manager
         self.time_manager = time_manager
@@ -24,6 +35,8 @@ class NeedsSystem(System):
         day_night_config = config_manager.get("time.day_night", {})
         self.day_start_hour = day_night_config.get("day_start_hour", 6.0)
         self.day_end_hour = day_night_config.get("day_end_hour", 20.0)
+        
+        self._needs = entity_manager.view(HungerComponent, TirednessComponent, MoodComponent)
 
     def update(self, dt: float):
         # Update season multiplier if season changed
@@ -38,35 +51,44 @@ class NeedsSystem(System):
         # Check if it's nighttime
         is_night = self.time_manager.is_nighttime(self.day_start_hour, self.day_end_hour)
         
-        # Update all entities with needs components
-        for entity, hunger_comp, tiredness_comp, mood_comp in self.entity_manager.get_entities_with(
-            HungerComponent, TirednessComponent, MoodComponent
-        ):
+        # Update all entities with needs components, one archetype table at a time.
+        # Each table exposes hunger/tiredness/mood as NumPy columns, so the whole
+        # colony is updated with a handful of vectorized operations.
+        hunger_increase = self.hunger_per_hour * hours_passed * self.food_consumption_multiplier
+        resting_change = self.tiredness_per_hour_resting * hours_passed
+        # Working increases tiredness (more at night)
+        working_change = self.tiredness_per_hour_working * hours_passed * (1.5 if is_night else 1.0)
+        
+        for table in self._needs.tables():
+            hunger = table.column(HungerComponent, "hunger")
+            tiredness = table.column(TirednessComponent, "tiredness")
+            mood = table.column(MoodComponent, "mood")
+            
             # Update hunger (increases over time, affected by season)
-            hunger_increase = self.hunger_per_hour * hours_passed * self.food_consumption_multiplier
-            hunger_comp.hunger = min(100.0, hunger_comp.hunger + hunger_increase)
+            np.minimum(hunger + hunger_increase, 100.0, out=hunger)
             
             # Update tiredness (increases when working, decreases when resting/sleeping)
-            action_comp = self.entity_manager.get_component(entity, ActionComponent)
-            is_working = action_comp and action_comp.current_action not in ["idle", "sleep", "eat"]
-            is_sleeping = action_comp and action_comp.current_action == "sleep"
-            
-            if is_sleeping:
-                # Resting reduces tiredness
-                tiredness_change = self.tiredness_per_hour_resting * hours_passed
-                tiredness_comp.tiredness = max(0.0, tiredness_comp.tiredness + tiredness_change)
-            elif is_working:
-                # Working increases tiredness (more at night)
-                tiredness_multiplier = 1.5 if is_night else 1.0
-                tiredness_change = self.tiredness_per_hour_working * hours_passed * tiredness_multiplier
-                tiredness_comp.tiredness = min(100.0, tiredness_comp.tiredness + tiredness_change)
+            if ActionComponent in table.columns:
+                is_sleeping, is_working = self._activity_masks(table.columns[ActionComponent])
+                tiredness[:] = np.where(
+                    is_sleeping, np.maximum(tiredness + resting_change, 0.0),
+                    np.where(is_working, np.minimum(tiredness + working_change, 100.0), tiredness)
+                )
             
             # Update mood (decreases if needs are unmet, slowly recovers otherwise)
-            if hunger_comp.hunger > 80.0:
-                mood_comp.mood = max(0.0, mood_comp.mood - hours_passed)
-            elif tiredness_comp.tiredness > 90.0:
-                mood_comp.mood = max(0.0, mood_comp.mood - hours_passed)
-            else:
-                # Slowly recover mood
-                mood_comp.mood = min(100.0, mood_comp.mood + 0.5 * hours_passed)
+            unmet = (hunger > 80.0) | (tiredness > 90.0)
+            mood[:] = np.where(
+                unmet, np.maximum(mood - hours_passed, 0.0),
+                np.minimum(mood + 0.5 * hours_passed, 100.0)
+            )
 
+    @staticmethod
+    def _activity_masks(action_column: list) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns (is_sleeping, is_working) masks for a table's ActionComponent column."""
+        # Tombstoned rows hold None; treat them as idle
+        get_code = ACTIVITY_CODES.get
+        codes = np.fromiter(
+            [get_code(a.current_action, ACTIVITY_WORKING) if a is not None else ACTIVITY_RESTING for a in action_column],
+            dtype=np.int8, count=len(action_column)
+        )
+        return codes == ACTIVITY_SLEEPING, codes == ACTIVITY_WORKING
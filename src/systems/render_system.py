@@ -1,9 +1,10 @@
 import pygame
 import math
+from typing import Dict
 from src.core.ecs import System, EntityManager
 from src.components.data_components import PositionComponent, MovementComponent
 from src.components.tags import IsTree, IsPlayer, IsVillager
-from src.world.grid import Grid, TERRAIN_GRASS, TERRAIN_DIRT, TERRAIN_WATER, TERRAIN_STONE, ZONE_STOCKPILE, ZONE_FARM, ZONE_RESIDENTIAL, ZONE_NONE
+from src.world.grid import Grid, Chunk, LAYER_TERRAIN, LAYER_ZONE, TERRAIN_GRASS, TERRAIN_DIRT, TERRAIN_WATER, TERRAIN_STONE, ZONE_STOCKPILE, ZONE_FARM, ZONE_RESIDENTIAL, ZONE_NONE
 from src.utils.logger import Logger, LogCategory
 
 # Color definitions
@@ -32,6 +33,7 @@ class RenderSystem(System):
         self.entity_manager = entity_manager
         self.zone_manager = zone_manager
         self.time_manager = time_manager
+        self._positioned = entity_manager.view(PositionComponent)
         self.base_pixels_per_unit = config.get("global", {}).get("pixels_per_unit", 32)
         
         # Camera Settings
@@ -46,6 +48,12 @@ class RenderSystem(System):
         
         # Zone visibility
         self.show_zones = True  # Toggle zone overlay
+
+        # Tiles pre-drawn per grid chunk: redrawn only when the chunk's terrain or zones
+        # change (Grid.chunks_changed_since), or when zoom / overlay settings change
+        self._chunk_surfaces: Dict[Chunk, pygame.Surface] = {}
+        self._chunk_style = None  # (zoom, zones shown) the cached chunks were drawn with
+        self._chunk_revision = grid.revision
         
         # Pre-calculate colors for faster lookup
         self.terrain_colors = {
@@ -120,44 +128,25 @@ class RenderSystem(System):
         end_col = min(self.grid.width, end_col)
         end_row = min(self.grid.height, end_row)
         
-        # 3. Draw Grid
-        for x in range(start_col, end_col):
-            for y in range(start_row, end_row):
-                # Calculate screen position
-                # world_pos = x * base_ppu, y * base_ppu
-                world_x = x * self.base_pixels_per_unit
-                world_y = y * self.base_pixels_per_unit
-                
-                screen_x, screen_y = self.world_to_screen(world_x, world_y)
-                
-                # Draw Rectangle
-                # Avoid sub-pixel issues with ceil/int if needed, but int is usually fine for rect
-                size = math.ceil(ppu)
-                rect = (screen_x, screen_y, size, size)
-                
-                terrain_id = self.grid.get_terrain(x, y)
-                color = self.terrain_colors.get(terrain_id, COLOR_UNKNOWN)
-                
-                pygame.draw.rect(self.screen, color, rect)
-                
-                # Draw zone overlay if enabled
-                if self.show_zones and self.zone_manager:
-                    zone_id = self.grid.get_zone(x, y)
-                    if zone_id != ZONE_NONE and zone_id in self.zone_colors:
-                        zone_color = self.zone_colors[zone_id]
-                        # Create a surface for transparency
-                        zone_surface = pygame.Surface((size, size), pygame.SRCALPHA)
-                        zone_surface.fill((*zone_color, ZONE_ALPHA))
-                        self.screen.blit(zone_surface, (screen_x, screen_y))
-                
-                # Only draw grid lines if zoom is high enough, otherwise it looks messy
-                if self.zoom_level > 0.6:
-                    pygame.draw.rect(self.screen, COLOR_GRID_LINE, rect, 1)
+        # 3. Draw Grid, one cached surface per visible chunk
+        self._sync_chunks()
+        chunk_size = self.grid.chunk_size
+        visible: Dict[Chunk, pygame.Surface] = {}
+        for cx in range(start_col // chunk_size, (end_col - 1) // chunk_size + 1):
+            for cy in range(start_row // chunk_size, (end_row - 1) // chunk_size + 1):
+                surface = self._chunk_surfaces.get((cx, cy))
+                if surface is None:
+                    surface = self._draw_chunk(cx, cy, ppu)
+                visible[(cx, cy)] = surface
+                x0, y0, _, _ = self.grid.chunk_bounds(cx, cy)
+                self.screen.blit(surface, self.world_to_screen(x0 * self.base_pixels_per_unit, y0 * self.base_pixels_per_unit))
+        # Chunks scrolled out of view are drawn again if they come back
+        self._chunk_surfaces = visible
         
         # 4. Draw Entities
         # For better performance, spatial partitioning should be used.
         # Here we iterate all entities with PositionComponent.
-        for entity, pos_comp in self.entity_manager.get_entities_with(PositionComponent):
+        for entity, pos_comp in self._positioned:
              # Simple culling check
              if not (start_col <= pos_comp.x < end_col and start_row <= pos_comp.y < end_row):
                  continue
@@ -241,6 +230,46 @@ class RenderSystem(System):
         if self.time_manager:
             self._draw_day_night_lighting()
     
+    def _sync_chunks(self):
+        """Forgets the cached chunks whose terrain or zones changed, or all of them on a zoom / overlay change."""
+        style = (self.zoom_level, bool(self.show_zones and self.zone_manager))
+        if style != self._chunk_style:
+            self._chunk_surfaces.clear()
+            self._chunk_style = style
+        elif self.grid.revision != self._chunk_revision:
+            for layer in (LAYER_TERRAIN, LAYER_ZONE):
+                for chunk in self.grid.chunks_changed_since(self._chunk_revision, layer):
+                    self._chunk_surfaces.pop(chunk, None)
+        self._chunk_revision = self.grid.revision
+
+    def _draw_chunk(self, cx: int, cy: int, ppu: float) -> pygame.Surface:
+        """Draws the tiles of one chunk (terrain, zone overlay, grid lines) onto a new surface."""
+        x0, y0, x1, y1 = self.grid.chunk_bounds(cx, cy)
+        # Avoid sub-pixel gaps: every tile is ceil(ppu) wide, neighbours may overlap a pixel
+        size = math.ceil(ppu)
+        surface = pygame.Surface((int((x1 - x0 - 1) * ppu) + size, int((y1 - y0 - 1) * ppu) + size))
+        terrain = self.grid.layer(LAYER_TERRAIN)[x0:x1, y0:y1]
+        zones = self.grid.layer(LAYER_ZONE)[x0:x1, y0:y1] if self._chunk_style[1] else None
+        # One translucent tile per zone colour, blitted wherever that zone is
+        overlays = {}
+        for zone_id, zone_color in self.zone_colors.items():
+            overlays[zone_id] = pygame.Surface((size, size), pygame.SRCALPHA)
+            overlays[zone_id].fill((*zone_color, ZONE_ALPHA))
+
+        for i in range(x1 - x0):
+            for j in range(y1 - y0):
+                rect = (int(i * ppu), int(j * ppu), size, size)
+                pygame.draw.rect(surface, self.terrain_colors.get(int(terrain[i, j]), COLOR_UNKNOWN), rect)
+
+                # Draw zone overlay if enabled
+                if zones is not None and int(zones[i, j]) in overlays:
+                    surface.blit(overlays[int(zones[i, j])], rect[:2])
+
+                # Only draw grid lines if zoom is high enough, otherwise it looks messy
+                if self.zoom_level > 0.6:
+                    pygame.draw.rect(surface, COLOR_GRID_LINE, rect, 1)
+        return surface
+
     def _draw_seasonal_tint(self):
         """Draw seasonal color tint overlay."""
         season = self.time_manager.get_season()
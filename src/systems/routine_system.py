@@ -6,6 +6,8 @@ from typing import Optional
 
 class RoutineSystem(System):
     """Manages daily routine schedules for villagers."""
+    reads = (ActionComponent, HungerComponent, TirednessComponent)
+    writes = (RoutineComponent,)
     
     def __init__(self, entity_manager: EntityManager, time_manager: TimeManager, config_manager: ConfigManager):
         self.entity_manager = entity_manager
@@ -6,6 +6,10 @@ from src.utils.logger import Logger, LogCategory
 import random
 
 class SurvivalSystem(System):
+    # Burnt-out fires are destroyed through the command buffer
+    reads = (PositionComponent,)
+    writes = (FireComponent, ColdComponent)
+
     def __init__(self, entity_manager: EntityManager, time_manager: TimeManager, config_manager: ConfigManager, grid):
         self.entity_manager = entity_manager
         self.time_manager = time_manager
@@ -23,6 +27,10 @@ class SurvivalSystem(System):
         day_night_config = config_manager.get("time.day_night", {})
         self.day_start_hour = day_night_config.get("day_start_hour", 6.0)
         self.day_end_hour = day_night_config.get("day_end_hour", 20.0)
+        
+        # Registered queries (kept up to date by the EntityManager)
+        self._fires = entity_manager.view(FireComponent, PositionComponent)
+        self._cold_entities = entity_manager.view(ColdComponent, PositionComponent)
 
     def update(self, dt: float):
         # 1. Update fire fuel consumption
@@ -39,7 +47,7 @@ class SurvivalSystem(System):
         hours_per_second = 24.0 / self.day_length_seconds
         hours_passed = dt * hours_per_second
         
-        for fire_entity, fire_comp, fire_pos in self.entity_manager.get_entities_with(FireComponent, PositionComponent):
+        for fire_entity, fire_comp, fire_pos in self._fires:
             # Consume fuel
             fuel_consumed = fire_comp.fuel_consumption_per_hour * hours_passed
             fire_comp.fuel_remaining -= fuel_consumed
@@ -47,7 +55,7 @@ class SurvivalSystem(System):
             if fire_comp.fuel_remaining <= 0:
                 # Fire extinguished
                 Logger.log(LogCategory.GAMEPLAY, f"Fire at ({fire_pos.x}, {fire_pos.y}) ran out of fuel")
-                self.entity_manager.destroy_entity(fire_entity)
+                self.entity_manager.commands.destroy(fire_entity)
 
     def _update_cold(self, dt: float):
         """Update cold levels for all entities based on time, season, and proximity to fire."""
@@ -62,11 +70,14 @@ class SurvivalSystem(System):
         
         # Get all fire positions for proximity check
         fire_positions = []
-        for fire_entity, fire_comp, fire_pos in self.entity_manager.get_entities_with(FireComponent, PositionComponent):
+        for fire_entity, fire_comp, fire_pos in self._fires:
+            # Burnt-out fires are only removed at the next command flush
+            if fire_comp.fuel_remaining <= 0:
+                continue
             fire_positions.append((fire_pos.x, fire_pos.y, fire_comp.warmth_radius))
         
         # Update cold for all entities
-        for entity, cold_comp, pos_comp in self.entity_manager.get_entities_with(ColdComponent, PositionComponent):
+        for entity, cold_comp, pos_comp in self._cold_entities:
             # Check if near fire
             near_fire = False
             for fx, fy, radius in fire_positions:
@@ -97,11 +108,11 @@ class SurvivalSystem(System):
         hours_per_second = 24.0 / self.day_length_seconds
         hours_passed = dt * hours_per_second
         
-        for entity, cold_comp, pos_comp in self.entity_manager.get_entities_with(ColdComponent, PositionComponent):
+        for entity, cold_comp, pos_comp in self._cold_entities:
             if cold_comp.cold > 50.0:  # Only damage if cold is high
                 # Check if near fire (no damage if near fire)
                 near_fire = False
-                for fire_entity, fire_comp, fire_pos in self.entity_manager.get_entities_with(FireComponent, PositionComponent):
+                for fire_entity, fire_comp, fire_pos in self._fires:
                     dist = abs(pos_comp.x - fire_pos.x) + abs(pos_comp.y - fire_pos.y)
                     if dist <= fire_comp.warmth_radius:
                         near_fire = True
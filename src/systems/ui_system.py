@@ -13,7 +13,7 @@ class UISystem(System):
         
         # --- God Panel (Top Right) ---
         panel_width = 250
-        panel_height = 220  # Increased to fit season and day/night info
+        panel_height = 270  # Increased to fit season, day/night and profiler info
         self.god_panel = UIPanel(
             relative_rect=pygame.Rect((screen_width - panel_width - 10, 10), (panel_width, panel_height)),
             manager=self.manager,
@@ -72,10 +72,24 @@ class UISystem(System):
             container=self.god_panel
         )
         
+        # Profiler readout (slowest systems, mean ms per tick); blank when profiling is off
+        self.perf_label = UILabel(
+            relative_rect=pygame.Rect((10, 185), (230, 20)),
+            text="Profiler: off",
+            manager=self.manager,
+            container=self.god_panel
+        )
+        self.perf_detail_label = UILabel(
+            relative_rect=pygame.Rect((10, 210), (230, 20)),
+            text="",
+            manager=self.manager,
+            container=self.god_panel
+        )
+        
         # --- Legend Panel (Right Side, Middle) ---
         legend_width = 250
         legend_height = 350
-        legend_y = 240  # Below god panel with some spacing
+        legend_y = 290  # Below god panel with some spacing
         self.legend_panel = UIPanel(
             relative_rect=pygame.Rect((screen_width - legend_width - 10, legend_y), (legend_width, legend_height)),
             manager=self.manager,
@@ -121,7 +135,8 @@ class UISystem(System):
         )
 
     def update_god_panel(self, fps: float, world_time_str: str, cam_pos: tuple, zoom: float, 
-                         zone_mode: int = None, season: str = None, day_night_state: str = None):
+                         zone_mode: int = None, season: str = None, day_night_state: str = None,
+                         slowest_systems: list = None):
         self.fps_label.set_text(f"FPS: {fps:.1f}")
         self.time_label.set_text(f"Time: {world_time_str}")
         self.cam_label.set_text(f"Cam: ({int(cam_pos[0])}, {int(cam_pos[1])})")
@@ -153,6 +168,12 @@ class UISystem(System):
             day_night_display = day_night_state.capitalize()
             self.day_night_label.set_text(f"Time: {day_night_display}")
         
+        # Update profiler readout
+        if slowest_systems:
+            lines = [f"{name.replace('System', '')}: {ms:.2f}ms" for name, ms in slowest_systems]
+            self.perf_label.set_text(f"Slowest: {lines[0]}")
+            self.perf_detail_label.set_text(" | ".join(lines[1:]))
+        
     def _update_legend_content(self):
         """Update legend content with color explanations."""
         # Get color definitions from render system
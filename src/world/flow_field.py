@@ -0,0 +1,208 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from src.world.grid import Grid, LAYER_MOVE_COST, LAYER_ZONE
+from src.world.zone_manager import ZoneManager
+from src.world.pathfinding import IMPASSABLE
+from src.core.profiler import Profiler
+
+# Distance of tiles that cannot reach the zone
+UNREACHABLE = np.iinfo(np.int32).max
+
+class FlowField:
+    """
+    Shortest-path tree towards every tile of one zone type. Flat arrays, index = x * height + y:
+        dist    cost of walking from the tile to its nearest zone tile
+        parent  next tile on that walk (-1 on zone tiles and unreachable tiles)
+        target  the zone tile the walk ends on
+    """
+    def __init__(self, zone_type: int, size: int):
+        self.zone_type = zone_type
+        self.dist = np.full(size, UNREACHABLE, dtype=np.int32)
+        self.parent = np.full(size, -1, dtype=np.int32)
+        self.target = np.full(size, -1, dtype=np.int32)
+        # Needs a full rebuild (a cost went up or a zone tile was removed)
+        self.dirty = True
+        # Tiles whose distance went down since the last query; propagated lazily
+        self.pending: List[int] = []
+
+class FlowFieldService:
+    """
+    Multi-source Dijkstra maps for zone types (stockpiles, beds).
+
+    One field per zone type answers "where is the nearest stockpile and which way is it"
+    for every tile at once, so villagers heading for the same kind of zone share one
+    search instead of running one A* each. Fields are built on first use with a
+    vectorized Dial's algorithm (bucketed Dijkstra over whole wavefronts).
+
+    Updates are incremental where that is exact: a new zone tile, or a tile that got
+    cheaper, only re-propagates the distances it lowers. Removed zone tiles and tiles
+    that got more expensive mark the field for a rebuild on its next query.
+    """
+    def __init__(self, grid: Grid, zone_manager: ZoneManager):
+        self.grid = grid
+        self._height = grid.height
+        self.cost = np.ascontiguousarray(grid.layer(LAYER_MOVE_COST), dtype=np.int32).ravel()
+        self.fields: Dict[int, FlowField] = {}
+
+        grid.add_change_listener(self._on_grid_changed)
+        zone_manager.add_listener(self._on_zone_changed)
+
+    # --- Invalidation ---
+    def _on_grid_changed(self, x0: int, y0: int, x1: int, y1: int):
+        old = self.cost.reshape(self.grid.width, self._height)[x0:x1, y0:y1]
+        new = self.grid.layer(LAYER_MOVE_COST)[x0:x1, y0:y1]
+        raised = bool((new > old).any())
+        lowered = np.argwhere(new < old)
+        old[...] = new
+        if raised:
+            for field in self.fields.values():
+                field.dirty = True
+        elif lowered.size:
+            tiles = [(x0 + dx) * self._height + (y0 + dy) for dx, dy in lowered]
+            for field in self.fields.values():
+                field.pending.extend(tiles)
+
+    def _on_zone_changed(self, x: int, y: int, old_zone: int, new_zone: int):
+        tile = x * self._height + y
+        removed = self.fields.get(old_zone)
+        if removed is not None:
+            removed.dirty = True
+        added = self.fields.get(new_zone)
+        if added is not None:
+            added.pending.append(tile)
+
+    # --- Building ---
+    def _field(self, zone_type: int) -> FlowField:
+        field = self.fields.get(zone_type)
+        if field is None:
+            field = self.fields[zone_type] = FlowField(zone_type, self.cost.size)
+        if field.dirty:
+            self._rebuild(field)
+        elif field.pending:
+            self._update(field)
+        return field
+
+    def _rebuild(self, field: FlowField):
+        if Profiler.enabled:
+            Profiler.count("flow.rebuilds")
+        field.dist.fill(UNREACHABLE)
+        field.parent.fill(-1)
+        field.target.fill(-1)
+        zones = self.grid.layer(LAYER_ZONE).ravel() == field.zone_type
+        sources = np.flatnonzero(zones & (self.cost < IMPASSABLE)).astype(np.int32)
+        field.dist[sources] = 0
+        field.target[sources] = sources
+        field.dirty = False
+        field.pending = []
+        self._propagate(field, sources)
+
+    def _update(self, field: FlowField):
+        """Seeds the pending tiles with their new distance and propagates the decrease."""
+        if Profiler.enabled:
+            Profiler.count("flow.updates")
+        height, size = self._height, self.cost.size
+        zones = self.grid.layer(LAYER_ZONE)
+        dist, parent, target, cost = field.dist, field.parent, field.target, self.cost
+        seeds = []
+        for tile in set(field.pending):
+            if cost[tile] >= IMPASSABLE:
+                continue
+            x, y = divmod(tile, height)
+            if zones[x, y] == field.zone_type:
+                dist[tile], parent[tile], target[tile] = 0, -1, tile
+            elif dist[tile] == UNREACHABLE:
+                # Newly walkable: join through the best neighbour
+                for neighbor, inside in ((tile + height, tile + height < size), (tile - height, tile >= height),
+                                         (tile + 1, y + 1 < height), (tile - 1, y > 0)):
+                    if inside and dist[neighbor] != UNREACHABLE and cost[neighbor] < IMPASSABLE:
+                        candidate = int(dist[neighbor]) + int(cost[neighbor])
+                        if candidate < dist[tile]:
+                            dist[tile], parent[tile], target[tile] = candidate, neighbor, target[neighbor]
+                if dist[tile] == UNREACHABLE:
+                    continue
+            seeds.append(tile)
+        field.pending = []
+        if seeds:
+            self._propagate(field, np.array(seeds, dtype=np.int32))
+
+    def _propagate(self, field: FlowField, seeds: np.ndarray):
+        """
+        Dial's algorithm outwards from `seeds`, one distance bucket at a time. Each bucket
+        relaxes its four neighbour directions as array operations. Only lowers distances.
+        """
+        height, size = self._height, self.cost.size
+        dist, parent, target, cost = field.dist, field.parent, field.target, self.cost
+        buckets: Dict[int, List[np.ndarray]] = {}
+        _enqueue(buckets, seeds, dist[seeds])
+        while buckets:
+            d = min(buckets)
+            nodes = np.unique(np.concatenate(buckets.pop(d)))
+            nodes = nodes[dist[nodes] == d]  # Drop entries superseded by a shorter distance
+            if not nodes.size:
+                continue
+            # Walking from a neighbour onto a node costs the node's move cost
+            reached = (cost[nodes] + d).astype(np.int32)
+            y = nodes % height
+            for offset, inside in ((height, nodes < size - height), (-height, nodes >= height),
+                                   (1, y < height - 1), (-1, y > 0)):
+                source, neighbor, nd = nodes[inside], nodes[inside] + offset, reached[inside]
+                better = (cost[neighbor] < IMPASSABLE) & (nd < dist[neighbor])
+                if not better.any():
+                    continue
+                source, neighbor, nd = source[better], neighbor[better], nd[better]
+                np.minimum.at(dist, neighbor, nd)
+                # Several sources can reach one neighbour: keep a winner's parent and target
+                won = dist[neighbor] == nd
+                source, neighbor, nd = source[won], neighbor[won], nd[won]
+                parent[neighbor] = source
+                target[neighbor] = target[source]
+                _enqueue(buckets, neighbor, nd)
+
+    # --- Queries ---
+    def _index(self, pos: Tuple[int, int]) -> Optional[int]:
+        x, y = pos
+        if 0 <= x < self.grid.width and 0 <= y < self._height:
+            return x * self._height + y
+        return None
+
+    def distance(self, zone_type: int, pos: Tuple[int, int]) -> Optional[int]:
+        """Path cost from pos to the nearest tile of the zone, or None if unreachable."""
+        tile = self._index(pos)
+        if tile is None:
+            return None
+        d = self._field(zone_type).dist[tile]
+        return None if d == UNREACHABLE else int(d)
+
+    def nearest(self, zone_type: int, pos: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """Zone tile with the cheapest path from pos (pos itself when standing on the zone)."""
+        tile = self._index(pos)
+        if tile is None:
+            return None
+        target = self._field(zone_type).target[tile]
+        return None if target < 0 else divmod(int(target), self._height)
+
+    def next_step(self, zone_type: int, pos: Tuple[int, int]) -> Optional[Tuple[int, int]]:
+        """Next tile towards the nearest zone tile; None when already there or unreachable."""
+        tile = self._index(pos)
+        if tile is None:
+            return None
+        step = self._field(zone_type).parent[tile]
+        return None if step < 0 else divmod(int(step), self._height)
+
+    def path(self, zone_type: int, pos: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Steps after pos up to the nearest zone tile (same shape as find_path), or []."""
+        tile = self._index(pos)
+        if tile is None:
+            return []
+        parent = self._field(zone_type).parent
+        height = self._height
+        steps = []
+        node = parent[tile]
+        while node >= 0:
+            steps.append(divmod(int(node), height))
+            node = parent[node]
+        return steps
+
+def _enqueue(buckets: Dict[int, List[np.ndarray]], nodes: np.ndarray, dists: np.ndarray):
+    for d in np.unique(dists):
+        buckets.setdefault(int(d), []).append(nodes[dists == d])
@@ -1,5 +1,9 @@
+import math
+import numbers
 import numpy as np
 from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Union
+from src.world.regions import RegionMap, NO_REGION
 
 # Layer Indices
 LAYER_TERRAIN = 0
@@ -21,6 +25,47 @@ ZONE_STOCKPILE = 1
 ZONE_FARM = 2
 ZONE_RESIDENTIAL = 3
 
+# Move cost value marking an impassable tile
+IMPASSABLE = 255
+
+# Value of every layer on a tile nobody has written to (None: no occupant)
+LAYER_DEFAULTS = (TERRAIN_GRASS, 0, 1, None, ZONE_NONE)
+
+# Storage type of each layer, sized to the values it holds: terrain, moisture, move cost
+# (IMPASSABLE = 255) and zone fit a byte. LAYER_OCCUPIED_BY (None) has no array: few
+# tiles are occupied, and their generation-tagged handles live in a tile -> entity dict
+LAYER_DTYPES = (np.uint8, np.uint8, np.uint8, None, np.uint8)
+
+# Layers a terrain change (set_terrain / mark_changed) writes
+TERRAIN_LAYERS = (LAYER_TERRAIN, LAYER_MOVE_COST)
+
+Chunk = Tuple[int, int]
+# End-exclusive tile rect (x0, y0, x1, y1)
+Rect = Tuple[int, int, int, int]
+# A Rect, a polygon (sequence of (x, y) vertices) or a (width, height) bool mask
+Region = Union[Rect, Sequence[Tuple[float, float]], np.ndarray]
+
+def polygon_mask(vertices: Sequence[Tuple[float, float]], rect: Rect) -> np.ndarray:
+    """
+    Bool mask over rect of the tiles whose centres lie inside the polygon (even-odd rule).
+    Vertices are in tile units, so (0, 0) is the corner of tile (0, 0).
+    """
+    x0, y0, x1, y1 = rect
+    cx = np.arange(x0, x1, dtype=np.float64)[:, None] + 0.5
+    cy = np.arange(y0, y1, dtype=np.float64)[None, :] + 0.5
+    inside = np.zeros((x1 - x0, y1 - y0), dtype=bool)
+    count = len(vertices)
+    for i in range(count):
+        ax, ay = vertices[i]
+        bx, by = vertices[(i + 1) % count]
+        if ay == by:
+            continue  # Horizontal edges never cross a horizontal ray
+        # Toggle tiles whose rightward ray from the centre crosses edge a-b
+        spans = (ay > cy) != (by > cy)
+        crossing_x = ax + (cy - ay) * (bx - ax) / (by - ay)
+        inside ^= spans & (cx < crossing_x)
+    return inside
+
 @dataclass
 class GridConfig:
     width: int
@@ -28,44 +73,250 @@ class GridConfig:
     chunk_size: int = 16
 
 class Grid:
-    def __init__(self, width: int, height: int):
+    def __init__(self, width: int, height: int, chunk_size: int = GridConfig.chunk_size):
         self.width = width
         self.height = height
+        self._allocate()
         
-        # Create 3D array: (width, height, layers)
-        # Using int16 to save memory, assuming IDs won't exceed 32k
-        self.data = np.zeros((width, height, NUM_LAYERS), dtype=np.int16)
-        
-        # Initialize default terrain (Grass)
-        self.data[:, :, LAYER_TERRAIN] = TERRAIN_GRASS
-        # Default move cost
-        self.data[:, :, LAYER_MOVE_COST] = 1
+        # Bumped on every write, so caches derived from the grid can tell they are stale
+        self.revision = 0
+        # Bumped only by terrain/move cost writes; zone paints leave pathfinding state valid
+        self.cost_revision = 0
+        # Callbacks (x0, y0, x1, y1) for terrain/move cost changes; the rect is end-exclusive
+        self._listeners: List[Callable[[int, int, int, int], None]] = []
+
+        # --- Chunk tracking ---
+        self.chunk_size = chunk_size
+        self.chunks_x = (width + chunk_size - 1) // chunk_size
+        self.chunks_y = (height + chunk_size - 1) // chunk_size
+        # Grid revision of the last write to each chunk, per layer: [cx, cy, layer]
+        self.chunk_revisions = np.zeros((self.chunks_x, self.chunks_y, NUM_LAYERS), dtype=np.int64)
+        # (cx, cy, layer) written since the last drain_dirty()
+        self._dirty: Set[Tuple[int, int, int]] = set()
+
+        # Connected regions of walkable tiles, for O(1) reachability checks; caught up with
+        # the move cost chunks written since (revision, cost revision) on the next query
+        self.regions = RegionMap(self._walkable_mask())
+        self._regions_synced = (self.revision, self.cost_revision)
+
+    def _allocate(self):
+        # One contiguous (width, height) array per layer, so whole-layer reads
+        # (pathfinding, flow fields, regions) do not stride across unrelated layers
+        self.layers = [np.full((self.width, self.height), LAYER_DEFAULTS[layer], dtype=LAYER_DTYPES[layer])
+                       if LAYER_DTYPES[layer] is not None else None
+                       for layer in range(NUM_LAYERS)]
+        # (x, y) -> entity handle of the occupied tiles (the sparse LAYER_OCCUPIED_BY)
+        self.occupants: Dict[Tuple[int, int], int] = {}
+
+    def layer(self, layer: int) -> np.ndarray:
+        """(width, height) array of one layer. Call mark_changed() after writing to it."""
+        if LAYER_DTYPES[layer] is None:
+            raise ValueError(f"layer {layer} is sparse and has no array; use get_occupant()/set_occupant()")
+        return self.layers[layer]
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the dense layer arrays."""
+        return sum(array.nbytes for array in self.layers if array is not None)
+
+    def add_change_listener(self, listener: Callable[[int, int, int, int], None]):
+        """Registers a callback for terrain/move cost changes (used by pathfinding caches)."""
+        self._listeners.append(listener)
+
+    def mark_changed(self, x0: int = 0, y0: int = 0, x1: Optional[int] = None, y1: Optional[int] = None,
+                     layers: Sequence[int] = TERRAIN_LAYERS):
+        """Bumps the revisions and notifies listeners of a changed rect (whole grid by default)."""
+        self.revision += 1
+        self.cost_revision += 1
+        x1 = self.width if x1 is None else x1
+        y1 = self.height if y1 is None else y1
+        self._mark_chunks(layers, x0, y0, x1, y1)
+        for listener in self._listeners:
+            listener(x0, y0, x1, y1)
+
+    def _mark_chunks(self, layers: Sequence[int], x0: int, y0: int, x1: int, y1: int):
+        size = self.chunk_size
+        cx0, cy0 = x0 // size, y0 // size
+        cx1, cy1 = (x1 - 1) // size + 1, (y1 - 1) // size + 1
+        self.chunk_revisions[cx0:cx1, cy0:cy1, list(layers)] = self.revision
+        dirty = self._dirty
+        for cx in range(cx0, cx1):
+            for cy in range(cy0, cy1):
+                for layer in layers:
+                    dirty.add((cx, cy, layer))
+
+    def drain_dirty(self) -> Set[Tuple[int, int, int]]:
+        """
+        (cx, cy, layer) of every chunk written since the last call, and clears the set.
+        There is one set per grid: with several consumers, use chunks_changed_since().
+        """
+        dirty, self._dirty = self._dirty, set()
+        return dirty
+
+    def chunks_changed_since(self, revision: int, layer: int) -> List[Chunk]:
+        """(cx, cy) of the chunks whose layer was written after the given grid revision."""
+        return [(int(cx), int(cy)) for cx, cy in np.argwhere(self.chunk_revisions[:, :, layer] > revision)]
+
+    def chunk_bounds(self, cx: int, cy: int) -> Tuple[int, int, int, int]:
+        """End-exclusive tile rect (x0, y0, x1, y1) of a chunk."""
+        size = self.chunk_size
+        return cx * size, cy * size, min((cx + 1) * size, self.width), min((cy + 1) * size, self.height)
+
+    def _walkable_mask(self) -> np.ndarray:
+        return self.layer(LAYER_MOVE_COST) < IMPASSABLE
+
+    def region_at(self, x: int, y: int) -> int:
+        """Connected-region label of a tile; NO_REGION for impassable or out-of-bounds tiles."""
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            return NO_REGION
+        self._sync_regions()
+        return int(self.regions.labels[x * self.height + y])
+
+    def _sync_regions(self):
+        """Feeds the move cost chunks written since the last query to the region map."""
+        revision, cost_revision = self._regions_synced
+        if cost_revision == self.cost_revision:
+            return
+        for cx, cy in self.chunks_changed_since(revision, LAYER_MOVE_COST):
+            self.regions.mark_changed(*self.chunk_bounds(cx, cy))
+        self.regions.refresh(self._walkable_mask())
+        self._regions_synced = (self.revision, self.cost_revision)
+
+    # --- Region writes ---
+    def resolve_region(self, region: Region) -> Optional[Tuple[Rect, Optional[np.ndarray]]]:
+        """
+        Clips a region to the grid: (rect, mask over rect), with mask None when the whole
+        rect is covered. None if no tile of the region is on the grid.
+        """
+        if isinstance(region, np.ndarray):
+            return self._clip_mask(region, (0, 0))
+        if len(region) == 4 and all(isinstance(v, numbers.Real) for v in region):
+            # Rect; fractional edges widen it to every tile they touch
+            x0, y0 = max(math.floor(region[0]), 0), max(math.floor(region[1]), 0)
+            x1, y1 = min(math.ceil(region[2]), self.width), min(math.ceil(region[3]), self.height)
+            if x0 >= x1 or y0 >= y1:
+                return None
+            return (x0, y0, x1, y1), None
+        if not all(isinstance(v, (Sequence, np.ndarray)) and len(v) == 2 for v in region):
+            raise ValueError(f"region must be a rect (x0, y0, x1, y1), a polygon of (x, y) "
+                             f"vertices or a bool mask, got {region!r}")
+        xs = [vx for vx, _ in region]
+        ys = [vy for _, vy in region]
+        rect = (max(int(min(xs)), 0), max(int(min(ys)), 0),
+                min(int(np.ceil(max(xs))), self.width), min(int(np.ceil(max(ys))), self.height))
+        if rect[0] >= rect[2] or rect[1] >= rect[3]:
+            return None
+        return self._clip_mask(polygon_mask(region, rect), rect[:2])
+
+    def _clip_mask(self, mask: np.ndarray, origin: Tuple[int, int]) -> Optional[Tuple[Rect, np.ndarray]]:
+        """Shrinks a mask placed at origin to the grid and to the bounding box of its set tiles."""
+        mask = np.asarray(mask, dtype=bool)
+        xs, ys = np.nonzero(mask)
+        ox, oy = origin
+        keep = (xs + ox >= 0) & (xs + ox < self.width) & (ys + oy >= 0) & (ys + oy < self.height)
+        if not keep.all():
+            xs, ys = xs[keep], ys[keep]
+        if not xs.size:
+            return None
+        mx0, my0, mx1, my1 = int(xs.min()), int(ys.min()), int(xs.max()) + 1, int(ys.max()) + 1
+        sub = mask[mx0:mx1, my0:my1]
+        if not keep.all():
+            sub = np.zeros_like(sub)
+            sub[xs - mx0, ys - my0] = True
+        return (ox + mx0, oy + my0, ox + mx1, oy + my1), sub
+
+    def _write(self, layer: int, rect: Rect, mask: Optional[np.ndarray], value: int):
+        """Writes value to the tiles of rect selected by mask (all of them if None)."""
+        x0, y0, x1, y1 = rect
+        view = self.layers[layer][x0:x1, y0:y1]
+        if mask is None:
+            view[...] = value
+        else:
+            view[mask] = value
+
+    def _fill_terrain(self, resolved: Optional[Tuple[Rect, Optional[np.ndarray]]], terrain_id: int):
+        if resolved is None:
+            return
+        rect, mask = resolved
+        self._write(LAYER_TERRAIN, rect, mask, terrain_id)
+        self._write(LAYER_MOVE_COST, rect, mask, IMPASSABLE if terrain_id == TERRAIN_WATER else 1)
+        self.mark_changed(*rect)
+
+    def fill_terrain(self, region: Region, terrain_id: int):
+        """set_terrain over a rect, polygon or mask, with one change notification."""
+        self._fill_terrain(self.resolve_region(region), terrain_id)
+
+    def set_terrain_mask(self, mask: np.ndarray, terrain_id: int, origin: Tuple[int, int] = (0, 0)):
+        """set_terrain on the tiles selected by a bool mask whose [0, 0] sits at origin."""
+        self._fill_terrain(self._clip_mask(mask, origin), terrain_id)
+
+    def set_zone_mask(self, mask: np.ndarray, zone_id: int, origin: Tuple[int, int] = (0, 0)):
+        """set_zone on the tiles selected by a bool mask whose [0, 0] sits at origin."""
+        resolved = self._clip_mask(mask, origin)
+        if resolved is None:
+            return
+        rect, sub = resolved
+        self._write(LAYER_ZONE, rect, sub, zone_id)
+        self.revision += 1
+        self._mark_chunks((LAYER_ZONE,), *rect)
+
+    def is_reachable(self, start: Tuple[int, int], end: Tuple[int, int], adjacent: bool = False) -> bool:
+        """
+        True if a walk from start can reach end (or, with adjacent=True, a tile next to it,
+        for targets such as trees and water that are worked from beside).
+        """
+        region = self.region_at(*start)
+        if region == NO_REGION:
+            return False
+        if self.region_at(*end) == region:
+            return True
+        if adjacent:
+            x, y = end
+            return any(self.region_at(nx, ny) == region
+                       for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)))
+        return False
         
     def set_terrain(self, x: int, y: int, terrain_id: int):
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.data[x, y, LAYER_TERRAIN] = terrain_id
+            self.layers[LAYER_TERRAIN][x, y] = terrain_id
             # Update move cost based on terrain (simplified)
             if terrain_id == TERRAIN_WATER:
-                self.data[x, y, LAYER_MOVE_COST] = 255 # Impassable
+                self.layers[LAYER_MOVE_COST][x, y] = IMPASSABLE
             else:
-                self.data[x, y, LAYER_MOVE_COST] = 1
+                self.layers[LAYER_MOVE_COST][x, y] = 1
+            self.mark_changed(x, y, x + 1, y + 1)
 
     def get_terrain(self, x: int, y: int) -> int:
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.data[x, y, LAYER_TERRAIN]
+            return self.layers[LAYER_TERRAIN][x, y]
         return -1
 
     def is_walkable(self, x: int, y: int) -> bool:
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.data[x, y, LAYER_MOVE_COST] < 255
+            return self.layers[LAYER_MOVE_COST][x, y] < IMPASSABLE
         return False
 
     def set_zone(self, x: int, y: int, zone_id: int):
         if 0 <= x < self.width and 0 <= y < self.height:
-            self.data[x, y, LAYER_ZONE] = zone_id
+            self.layers[LAYER_ZONE][x, y] = zone_id
+            self.revision += 1
+            self._mark_chunks((LAYER_ZONE,), x, y, x + 1, y + 1)
 
     def get_zone(self, x: int, y: int) -> int:
         if 0 <= x < self.width and 0 <= y < self.height:
-            return self.data[x, y, LAYER_ZONE]
+            return self.layers[LAYER_ZONE][x, y]
         return 0
 
+    def set_occupant(self, x: int, y: int, entity: Optional[int]):
+        """Records the entity handle occupying a tile; None clears it."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            if entity is None:
+                self.occupants.pop((x, y), None)
+            else:
+                self.occupants[(x, y)] = entity
+            self.revision += 1
+            self._mark_chunks((LAYER_OCCUPIED_BY,), x, y, x + 1, y + 1)
+
+    def get_occupant(self, x: int, y: int) -> Optional[int]:
+        """Entity handle occupying a tile, None if free. Check it with EntityManager.has_entity."""
+        return self.occupants.get((x, y))
@@ -0,0 +1,364 @@
+import heapq
+import weakref
+import numpy as np
+from typing import Dict, List, Optional, Set, Tuple
+from src.world.grid import Grid, LAYER_MOVE_COST, NO_REGION
+from src.world.pathfinding import IMPASSABLE, Search, find_path, get_engine, run_search
+from src.core.profiler import Profiler
+
+Cluster = Tuple[int, int]
+# ("v", cx, cy): border between clusters (cx, cy) and (cx + 1, cy)
+# ("h", cx, cy): border between clusters (cx, cy) and (cx, cy + 1)
+Border = Tuple[str, int, int]
+
+class HierarchicalPathfinder:
+    """
+    HPA* over chunk_size x chunk_size clusters.
+
+    Every run of walkable tile pairs along a cluster border gets one transition (its middle
+    pair). Transition tiles are the abstract graph's nodes; inter-cluster edges join the two
+    tiles of a transition, and intra-cluster edges hold the cheapest path between two nodes
+    of the same cluster. Border transitions and intra-cluster edges are computed lazily
+    and cached; a terrain change only drops the caches of the chunk it touches (plus the
+    neighbouring chunk when the tile lies on their shared border). Changes are picked up
+    at the start of each search, from the move cost chunks written since the last one.
+
+    Paths are near-optimal, not exact: the abstract search only crosses borders at
+    transition tiles. Tile indices are flat (x * height + y), as in PathEngine.
+    """
+    def __init__(self, grid: Grid, chunk_size: Optional[int] = None):
+        # Proxy: the per-grid registry is keyed weakly, we must not keep the grid alive
+        self.grid = weakref.proxy(grid)
+        # Clusters match the grid's chunks unless asked otherwise
+        chunk_size = grid.chunk_size if chunk_size is None else chunk_size
+        self.chunk_size = chunk_size
+        self._height = grid.height
+        self.clusters_x = (grid.width + chunk_size - 1) // chunk_size
+        self.clusters_y = (grid.height + chunk_size - 1) // chunk_size
+
+        self.cost = np.ascontiguousarray(grid.layer(LAYER_MOVE_COST), dtype=np.int32).ravel()
+        self._cost = memoryview(self.cost)
+
+        # border -> {tile: (tile on the other side, cost of stepping onto it)}
+        self._border_links: Dict[Border, Dict[int, Tuple[int, int]]] = {}
+        # cluster -> {node: [(node, cost)]}, and cluster -> {(a, b): tiles after a up to b}
+        self._cluster_edges: Dict[Cluster, Dict[int, List[Tuple[int, float]]]] = {}
+        self._cluster_paths: Dict[Cluster, Dict[Tuple[int, int], List[int]]] = {}
+        # Grid (revision, cost revision) the cost copy was last brought up to date with
+        self._synced = (grid.revision, grid.cost_revision)
+
+    # --- Invalidation ---
+    def _sync(self):
+        """Copies the move cost chunks written since the last call and drops what they affect."""
+        grid = self.grid
+        revision, cost_revision = self._synced
+        if cost_revision == grid.cost_revision:
+            return
+        costs = grid.layer(LAYER_MOVE_COST)
+        cost = self.cost.reshape(grid.width, self._height)
+        for chunk in grid.chunks_changed_since(revision, LAYER_MOVE_COST):
+            x0, y0, x1, y1 = grid.chunk_bounds(*chunk)
+            changed = np.argwhere(cost[x0:x1, y0:y1] != costs[x0:x1, y0:y1])
+            if changed.size:
+                # Only the tiles that really changed decide which borders go stale
+                (dx0, dy0), (dx1, dy1) = changed.min(axis=0), changed.max(axis=0)
+                self._invalidate_rect(x0 + int(dx0), y0 + int(dy0), x0 + int(dx1) + 1, y0 + int(dy1) + 1)
+        self._synced = (grid.revision, grid.cost_revision)
+
+    def _invalidate_rect(self, x0: int, y0: int, x1: int, y1: int):
+        self.cost.reshape(self.grid.width, self._height)[x0:x1, y0:y1] = self.grid.layer(LAYER_MOVE_COST)[x0:x1, y0:y1]
+        size = self.chunk_size
+        for cx in range(x0 // size, (x1 - 1) // size + 1):
+            for cy in range(y0 // size, (y1 - 1) // size + 1):
+                self._invalidate_cluster((cx, cy))
+                left, top = cx * size, cy * size
+                right, bottom = left + size - 1, top + size - 1
+                # Border tiles also change the transitions shared with the neighbour
+                if x0 <= left:
+                    self._invalidate_border(("v", cx - 1, cy))
+                if x1 - 1 >= right:
+                    self._invalidate_border(("v", cx, cy))
+                if y0 <= top:
+                    self._invalidate_border(("h", cx, cy - 1))
+                if y1 - 1 >= bottom:
+                    self._invalidate_border(("h", cx, cy))
+
+    def _invalidate_cluster(self, cluster: Cluster):
+        self._cluster_edges.pop(cluster, None)
+        self._cluster_paths.pop(cluster, None)
+
+    def _invalidate_border(self, border: Border):
+        self._border_links.pop(border, None)
+        # Both sides' node sets depend on the border's transitions
+        kind, cx, cy = border
+        self._invalidate_cluster((cx, cy))
+        self._invalidate_cluster((cx + 1, cy) if kind == "v" else (cx, cy + 1))
+
+    # --- Geometry ---
+    def cluster_of(self, tile: int) -> Cluster:
+        x, y = divmod(tile, self._height)
+        return x // self.chunk_size, y // self.chunk_size
+
+    def _bounds(self, cluster: Cluster) -> Tuple[int, int, int, int]:
+        cx, cy = cluster
+        size = self.chunk_size
+        return (cx * size, cy * size,
+                min((cx + 1) * size, self.grid.width), min((cy + 1) * size, self.grid.height))
+
+    def _borders(self, cluster: Cluster) -> List[Border]:
+        cx, cy = cluster
+        borders = []
+        if cx > 0:
+            borders.append(("v", cx - 1, cy))
+        if cx + 1 < self.clusters_x:
+            borders.append(("v", cx, cy))
+        if cy > 0:
+            borders.append(("h", cx, cy - 1))
+        if cy + 1 < self.clusters_y:
+            borders.append(("h", cx, cy))
+        return borders
+
+    def _links(self, border: Border) -> Dict[int, Tuple[int, int]]:
+        links = self._border_links.get(border)
+        if links is not None:
+            return links
+
+        kind, cx, cy = border
+        height, cost = self._height, self._cost
+        size = self.chunk_size
+        if kind == "v":
+            # Column x on the left cluster, x + 1 on the right; walk along y
+            x = (cx + 1) * size - 1
+            pairs = [(x * height + y, (x + 1) * height + y)
+                     for y in range(cy * size, min((cy + 1) * size, self.grid.height))]
+        else:
+            y = (cy + 1) * size - 1
+            pairs = [(x * height + y, x * height + y + 1)
+                     for x in range(cx * size, min((cx + 1) * size, self.grid.width))]
+
+        links = {}
+        run: List[Tuple[int, int]] = []
+        for a, b in pairs + [(-1, -1)]:
+            if a >= 0 and cost[a] < IMPASSABLE and cost[b] < IMPASSABLE:
+                run.append((a, b))
+                continue
+            if run:
+                a_mid, b_mid = run[len(run) // 2]
+                links[a_mid] = (b_mid, cost[b_mid])
+                links[b_mid] = (a_mid, cost[a_mid])
+                run = []
+        self._border_links[border] = links
+        return links
+
+    def _nodes(self, cluster: Cluster) -> Set[int]:
+        nodes = set()
+        for border in self._borders(cluster):
+            for tile in self._links(border):
+                if self.cluster_of(tile) == cluster:
+                    nodes.add(tile)
+        return nodes
+
+    # --- Local searches (inside one cluster) ---
+    def _dijkstra(self, cluster: Cluster, source: int, reverse: bool = False) -> Tuple[Dict[int, float], Dict[int, int]]:
+        """
+        Costs from `source` to every tile of the cluster (or, with reverse=True, from every
+        tile to `source`) and the parent (next-hop when reversed) of each tile.
+        """
+        x0, y0, x1, y1 = self._bounds(cluster)
+        height, cost = self._height, self._cost
+        dist = {source: 0.0}
+        parent: Dict[int, int] = {}
+        heap = [(0.0, source)]
+        while heap:
+            d, current = heapq.heappop(heap)
+            if d > dist[current]:
+                continue
+            x, y = divmod(current, height)
+            # Reverse search: stepping from neighbour onto current costs cost[current]
+            step_back = cost[current]
+            for neighbor, inside in ((current + height, x + 1 < x1), (current - height, x > x0),
+                                     (current + 1, y + 1 < y1), (current - 1, y > y0)):
+                if not inside:
+                    continue
+                step = cost[neighbor]
+                if step >= IMPASSABLE:
+                    continue
+                nd = d + (step_back if reverse else step)
+                if nd < dist.get(neighbor, float("inf")):
+                    dist[neighbor] = nd
+                    parent[neighbor] = current
+                    heapq.heappush(heap, (nd, neighbor))
+        return dist, parent
+
+    def _adjacency(self, cluster: Cluster) -> Dict[int, List[Tuple[int, float]]]:
+        """Abstract edges of the cluster's nodes: intra-cluster paths plus their border links."""
+        edges = self._cluster_edges.get(cluster)
+        if edges is not None:
+            return edges
+
+        nodes = self._nodes(cluster)
+        edges = {node: [] for node in nodes}
+        paths = {}
+        for source in nodes:
+            dist, parent = self._dijkstra(cluster, source)
+            for target in nodes:
+                if target == source or target not in dist:
+                    continue
+                edges[source].append((target, dist[target]))
+                paths[(source, target)] = _trace(parent, source, target)
+        # Border links are cached with the cluster: invalidating a border drops both sides
+        for border in self._borders(cluster):
+            for tile, link in self._links(border).items():
+                if tile in edges:
+                    edges[tile].append(link)
+        self._cluster_edges[cluster] = edges
+        self._cluster_paths[cluster] = paths
+        return edges
+
+    # --- Query ---
+    def find_path(self, start: Tuple[int, int], end: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Same contract as pathfinding.find_path (steps after start up to end, or [])."""
+        return run_search(self.search(start, end))
+
+    def search(self, start: Tuple[int, int], end: Tuple[int, int]) -> Search:
+        """
+        find_path as a generator, so PathQueue can spread it over ticks: it yields the
+        tiles / nodes settled since the last yield while it searches the abstract graph,
+        then one refined chunk at a time, and returns the path.
+        """
+        self._sync()
+        width, height = self.grid.width, self._height
+        if not (0 <= end[0] < width and 0 <= end[1] < height and 0 <= start[0] < width and 0 <= start[1] < height):
+            return []
+        source, goal = start[0] * height + start[1], end[0] * height + end[1]
+        if self._cost[goal] >= IMPASSABLE:
+            return []
+        if source == goal:
+            return []
+        if Profiler.enabled:
+            Profiler.count("path.calls")
+        region = self.grid.region_at(*start)
+        if region != NO_REGION and region != self.grid.region_at(*end):
+            if Profiler.enabled:
+                Profiler.count("path.unreachable")
+            return []
+
+        start_cluster, goal_cluster = self.cluster_of(source), self.cluster_of(goal)
+        start_dist, start_parent = self._dijkstra(start_cluster, source)
+        if start_cluster == goal_cluster and goal in start_dist:
+            return self._to_tiles(_trace(start_parent, source, goal))
+        goal_dist, goal_next = self._dijkstra(goal_cluster, goal, reverse=True)
+        yield len(start_dist) + len(goal_dist)
+
+        # A* over transition nodes; GOAL is a virtual node reached from the goal cluster's nodes
+        GOAL = -1
+        ex, ey = end
+        size = self.chunk_size
+        inf = float("inf")
+        heappush, heappop = heapq.heappush, heapq.heappop
+        g: Dict[int, float] = {}
+        came_from: Dict[int, int] = {}
+        # Entries are (f, h, node): on equal f the node closer to the goal goes first
+        heap: List[Tuple[float, float, int]] = []
+        for node in self._nodes(start_cluster):
+            if node in start_dist:
+                g[node] = start_dist[node]
+                x, y = divmod(node, height)
+                h = abs(ex - x) + abs(ey - y)
+                heappush(heap, (g[node] + h, h, node))
+        closed: Set[int] = set()
+        expanded = 0
+        while heap:
+            node = heappop(heap)[2]
+            if node == GOAL:
+                break
+            if node in closed:
+                continue
+            closed.add(node)
+            expanded += 1
+            yield 1
+            base = g[node]
+
+            x, y = divmod(node, height)
+            cluster = (x // size, y // size)
+            for neighbor, step in self._adjacency(cluster)[node]:
+                tentative = base + step
+                if tentative < g.get(neighbor, inf):
+                    g[neighbor] = tentative
+                    came_from[neighbor] = node
+                    nx, ny = divmod(neighbor, height)
+                    h = abs(ex - nx) + abs(ey - ny)
+                    heappush(heap, (tentative + h, h, neighbor))
+            if cluster == goal_cluster and node in goal_dist:
+                tentative = base + goal_dist[node]
+                if tentative < g.get(GOAL, inf):
+                    g[GOAL] = tentative
+                    came_from[GOAL] = node
+                    heappush(heap, (tentative, 0, GOAL))
+
+        if Profiler.enabled:
+            Profiler.count("path.nodes", expanded)
+        if GOAL not in came_from:
+            return []
+
+        # Refine: abstract node chain -> tiles
+        chain = [came_from[GOAL]]
+        while chain[-1] in came_from:
+            chain.append(came_from[chain[-1]])
+        chain.reverse()
+
+        tiles = _trace(start_parent, source, chain[0])
+        for a, b in zip(chain, chain[1:]):
+            cluster = self.cluster_of(a)
+            if cluster == self.cluster_of(b):
+                segment = self._cluster_paths[cluster][(a, b)]
+                tiles.extend(segment)
+                yield len(segment)
+            else:
+                tiles.append(b)
+        node = chain[-1]
+        while node != goal:
+            node = goal_next[node]
+            tiles.append(node)
+        return self._to_tiles(tiles)
+
+    def _to_tiles(self, indices: List[int]) -> List[Tuple[int, int]]:
+        height = self._height
+        return [divmod(i, height) for i in indices]
+
+def _trace(parent: Dict[int, int], source: int, target: int) -> List[int]:
+    """Tiles after source up to target, following a parent map back from target."""
+    path = []
+    node = target
+    while node != source:
+        path.append(node)
+        node = parent[node]
+    path.reverse()
+    return path
+
+# One pathfinder per grid, created on first use
+_pathfinders: "weakref.WeakKeyDictionary[Grid, HierarchicalPathfinder]" = weakref.WeakKeyDictionary()
+
+def get_pathfinder(grid: Grid) -> HierarchicalPathfinder:
+    pathfinder = _pathfinders.get(grid)
+    if pathfinder is None:
+        pathfinder = _pathfinders[grid] = HierarchicalPathfinder(grid)
+    return pathfinder
+
+def search_hierarchical(grid: Grid, start: Tuple[int, int], end: Tuple[int, int]) -> Search:
+    """find_path_hierarchical as a sliced search; short trips run their exact A* in one slice."""
+    if abs(end[0] - start[0]) + abs(end[1] - start[1]) <= 2 * grid.chunk_size:
+        engine = get_engine(grid)
+        path = engine.find_path(start, end)
+        yield engine.expanded
+        return path
+    return (yield from get_pathfinder(grid).search(start, end))
+
+def find_path_hierarchical(grid: Grid, start: Tuple[int, int], end: Tuple[int, int]) -> List[Tuple[int, int]]:
+    """
+    Long-range path via HPA*. Trips within two chunks of each other use exact A* instead,
+    where the abstraction saves nothing.
+    """
+    if abs(end[0] - start[0]) + abs(end[1] - start[1]) <= 2 * grid.chunk_size:
+        return find_path(grid, start, end)
+    return get_pathfinder(grid).find_path(start, end)
@@ -0,0 +1,117 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+from src.world.grid import Grid, LAYER_MOVE_COST
+from src.world.hpa import find_path_hierarchical
+from src.core.profiler import Profiler
+
+Pos = Tuple[int, int]
+Chunk = Tuple[int, int]
+
+class PathCache:
+    """
+    LRU cache of paths by (start, end), in front of find_path_hierarchical.
+
+    Found paths stay valid until the terrain of a chunk they cross changes: each entry is
+    indexed by those chunks, and lookups first drop the entries of the chunks whose move
+    costs were written since the last lookup (Grid.chunks_changed_since). A failed search
+    depends on the whole map, so it is cached with the grid cost revision and only reused
+    while the revision is unchanged.
+
+    Hits and misses are counted as path.cache.hits / path.cache.misses in the profiler.
+    Callers get a copy of the path, since movement consumes it step by step.
+    """
+    def __init__(self, grid: Grid, capacity: int = 512, chunk_size: Optional[int] = None):
+        self.grid = grid
+        self.capacity = capacity
+        # Entries are indexed by the grid's own chunks unless asked otherwise
+        self.chunk_size = grid.chunk_size if chunk_size is None else chunk_size
+        # (start, end) -> (path, cost revision for failures / None for found paths)
+        self._entries: "OrderedDict[Tuple[Pos, Pos], Tuple[List[Pos], Optional[int]]]" = OrderedDict()
+        # chunk -> keys of the found paths crossing it
+        self._by_chunk: Dict[Chunk, Set[Tuple[Pos, Pos]]] = {}
+        self.hits = 0
+        self.misses = 0
+        # Grid (revision, cost revision) the entries were last checked against
+        self._synced = (grid.revision, grid.cost_revision)
+
+    def _sync(self):
+        """Drops the found paths crossing chunks whose move costs changed since the last call."""
+        grid = self.grid
+        revision, cost_revision = self._synced
+        if cost_revision == grid.cost_revision:
+            return
+        size = self.chunk_size
+        for chunk in grid.chunks_changed_since(revision, LAYER_MOVE_COST):
+            x0, y0, x1, y1 = grid.chunk_bounds(*chunk)
+            for cx in range(x0 // size, (x1 - 1) // size + 1):
+                for cy in range(y0 // size, (y1 - 1) // size + 1):
+                    for key in self._by_chunk.pop((cx, cy), ()):
+                        self._drop(key)
+        self._synced = (grid.revision, grid.cost_revision)
+
+    def _chunks(self, start: Pos, path: List[Pos]) -> Set[Chunk]:
+        size = self.chunk_size
+        return {(x // size, y // size) for x, y in [start] + path}
+
+    def _drop(self, key: Tuple[Pos, Pos]):
+        entry = self._entries.pop(key, None)
+        if entry is None or entry[1] is not None:
+            return
+        for chunk in self._chunks(key[0], entry[0]):
+            keys = self._by_chunk.get(chunk)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_chunk[chunk]
+
+    def _store(self, key: Tuple[Pos, Pos], path: List[Pos]):
+        if path:
+            self._entries[key] = (path, None)
+            for chunk in self._chunks(key[0], path):
+                self._by_chunk.setdefault(chunk, set()).add(key)
+        else:
+            self._entries[key] = (path, self.grid.cost_revision)
+        while len(self._entries) > self.capacity:
+            self._drop(next(iter(self._entries)))
+
+    def get(self, start: Pos, end: Pos) -> Optional[List[Pos]]:
+        """Copy of the cached path (possibly [] for a known failure), or None on a miss."""
+        self._sync()
+        key = (start, end)
+        entry = self._entries.get(key)
+        if entry is not None and (entry[1] is None or entry[1] == self.grid.cost_revision):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if Profiler.enabled:
+                Profiler.count("path.cache.hits")
+            return list(entry[0])
+
+        self.misses += 1
+        if Profiler.enabled:
+            Profiler.count("path.cache.misses")
+        if entry is not None:
+            self._drop(key)
+        return None
+
+    def put(self, start: Pos, end: Pos, path: List[Pos]):
+        self._sync()
+        key = (start, end)
+        self._drop(key)
+        self._store(key, list(path))
+
+    def find_path(self, start: Pos, end: Pos) -> List[Pos]:
+        """Same contract as find_path: steps after start up to end, or []."""
+        path = self.get(start, end)
+        if path is None:
+            path = find_path_hierarchical(self.grid, start, end)
+            self._store((start, end), path)
+            path = list(path)
+        return path
+
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def clear(self):
+        self._entries.clear()
+        self._by_chunk.clear()
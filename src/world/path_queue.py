@@ -0,0 +1,136 @@
+import itertools
+import time
+from collections import deque
+from typing import Deque, List, Optional, Sequence, Tuple
+from src.world.grid import Grid, NO_REGION
+from src.world.hpa import search_hierarchical
+from src.world.pathfinding import PathEngine, Search
+from src.core.profiler import Profiler
+
+Pos = Tuple[int, int]
+
+# Nodes expanded (or tiles refined) between budget checks
+SLICE_NODES = 128
+
+class PathRequest:
+    """Handle for a queued path: poll `done`, then read `path` ([] when there is none)."""
+    __slots__ = ("id", "start", "end", "path", "done", "cancelled", "_search", "_revision", "_group")
+
+    def __init__(self, request_id: int, start: Pos, end: Pos):
+        self.id = request_id
+        self.start = start
+        self.end = end
+        self.path: List[Pos] = []
+        self.done = False
+        self.cancelled = False
+        self._search: Optional[Search] = None
+        # Cost revision the search started on
+        self._revision = -1
+        # Requests sharing this one's goal and search (submit_batch), itself included
+        self._group: Optional[List["PathRequest"]] = None
+
+def needs_search(grid: Grid, start: Pos, end: Pos) -> bool:
+    """False when the answer is known without searching: already there, or no path at all."""
+    if not (0 <= start[0] < grid.width and 0 <= start[1] < grid.height) or not grid.is_walkable(*end):
+        return False
+    region = grid.region_at(*start)
+    return start != end and (region == NO_REGION or region == grid.region_at(*end))
+
+class PathQueue:
+    """
+    Time-sliced pathfinding. Callers submit requests and get a PathRequest back; process()
+    runs once per tick and advances the oldest requests until the node or millisecond
+    budget runs out. A search cut off by the budget resumes where it stopped on the next
+    tick, so a burst of requests costs more ticks instead of a longer frame.
+
+    Requests run as search_hierarchical: HPA* over the chunk graph, then refinement one
+    chunk per slice, with short trips on PathEngine's exact A*. A batch (submit_batch) is
+    one reverse search from the shared goal, sliced the same way on an engine the queue
+    owns, since only the oldest search is ever in progress. A search whose costs changed
+    between slices starts over.
+    """
+    def __init__(self, grid: Grid, node_budget: int = 2000, ms_budget: float = 2.0):
+        self.grid = grid
+        self.node_budget = node_budget
+        self.ms_budget = ms_budget
+        self._queue: Deque[PathRequest] = deque()
+        self._ids = itertools.count(1)
+        # Arrays for batch searches, allocated on the first batch
+        self._engine: Optional[PathEngine] = None
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def submit(self, start: Pos, end: Pos) -> PathRequest:
+        request = PathRequest(next(self._ids), start, end)
+        if needs_search(self.grid, start, end):
+            self._queue.append(request)
+        else:
+            request.done = True
+        return request
+
+    def submit_batch(self, end: Pos, starts: Sequence[Pos]) -> List[PathRequest]:
+        """Requests from many starts to one goal, served by one search (find_paths_to)."""
+        requests = [PathRequest(next(self._ids), start, end) for start in starts]
+        group = []
+        for request in requests:
+            if needs_search(self.grid, request.start, end):
+                group.append(request)
+            else:
+                request.done = True
+        for member in group:
+            member._group = group
+        if group:
+            self._queue.append(group[0])
+        return requests
+
+    def cancel(self, request: PathRequest):
+        """The request is skipped (and dropped) when the queue next reaches it."""
+        request.cancelled = True
+
+    def _start(self, request: PathRequest) -> Search:
+        if request._group is None:
+            return search_hierarchical(self.grid, request.start, request.end)
+        if self._engine is None:
+            self._engine = PathEngine(self.grid)
+        return self._engine.search_paths_to(request.end, [member.start for member in request._group])
+
+    def _finish(self, request: PathRequest, result) -> int:
+        if request._group is None:
+            request.path = result
+            request.done = True
+            return 1
+        for member in request._group:
+            member.path = list(result[member.start])
+            member.done = True
+        return len(request._group)
+
+    def process(self):
+        """Services queued requests within this tick's budget."""
+        deadline = time.perf_counter() + self.ms_budget / 1000.0
+        remaining = self.node_budget
+        completed = 0
+        queue = self._queue
+        while queue and remaining > 0:
+            request = queue[0]
+            if all(member.cancelled for member in request._group or (request,)):
+                queue.popleft()
+                continue
+            if request._search is None or request._revision != self.grid.cost_revision:
+                request._search = self._start(request)
+                request._revision = self.grid.cost_revision
+            budget = min(SLICE_NODES, remaining)
+            spent = 0
+            try:
+                while spent < budget:
+                    spent += next(request._search)
+            except StopIteration as stop:
+                queue.popleft()
+                request._search = None
+                completed += self._finish(request, stop.value)
+            remaining -= spent
+            if time.perf_counter() >= deadline:
+                break
+        if Profiler.enabled:
+            Profiler.count("path.queue.done", completed)
+            Profiler.count("path.queue.pending", len(queue))
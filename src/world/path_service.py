@@ -0,0 +1,187 @@
+import multiprocessing
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from src.world.grid import Grid, LAYER_MOVE_COST, LAYER_DTYPES, NO_REGION
+from src.world.pathfinding import PathEngine
+from src.world.path_queue import PathRequest, needs_search
+from src.utils.logger import Logger
+from src.core.profiler import Profiler
+
+Pos = Tuple[int, int]
+
+# Shared block layout: one int64 version counter, then the move costs (x * height + y)
+_HEADER_BYTES = 8
+_COST_DTYPE = np.dtype(LAYER_DTYPES[LAYER_MOVE_COST])
+
+class CostSnapshot:
+    """
+    Move cost layer in a shared memory block, readable from worker processes.
+
+    Quacks like the parts of Grid that PathEngine uses (width, height, cost_revision, layer),
+    so workers run the same A* as the main thread. The owner writes changed rects in
+    place and bumps the version; an engine refreshes its own copy when the version moves.
+    """
+    def __init__(self, name: str, width: int, height: int, create: bool = False):
+        size = _HEADER_BYTES + width * height * _COST_DTYPE.itemsize
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        self.width = width
+        self.height = height
+        self._version = np.ndarray((1,), dtype=np.int64, buffer=self.shm.buf)
+        self.costs = np.ndarray((width, height), dtype=_COST_DTYPE, buffer=self.shm.buf, offset=_HEADER_BYTES)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def cost_revision(self) -> int:
+        return int(self._version[0])
+
+    def layer(self, layer: int) -> np.ndarray:
+        return self.costs
+
+    def region_at(self, x: int, y: int) -> int:
+        # Region checks happen before submitting; workers just search
+        return NO_REGION
+
+    def write(self, grid: Grid, x0: int, y0: int, x1: int, y1: int):
+        self.costs[x0:x1, y0:y1] = grid.layer(LAYER_MOVE_COST)[x0:x1, y0:y1]
+        self._version[0] = grid.cost_revision
+
+    def close(self, unlink: bool = False):
+        # Views into the buffer must go before the block can be closed
+        self._version = self.costs = None
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+# --- Worker side (module level so process pools can pickle it) ---
+_snapshot: Optional[CostSnapshot] = None
+_local = threading.local()
+
+def _init_worker(name: str, width: int, height: int, jps: bool = False):
+    global _snapshot
+    _snapshot = CostSnapshot(name, width, height)
+    # Spawned processes start with class defaults, so the setting travels with the init args
+    PathEngine.configure(jps=jps)
+
+def _find_path(start: Pos, end: Pos) -> Tuple[List[Pos], int]:
+    """Runs in a worker: the path and the snapshot version it was computed on."""
+    engine = getattr(_local, "engine", None)
+    if engine is None:
+        # PathEngine is not thread-safe, so thread workers get one each
+        engine = _local.engine = PathEngine(_snapshot)
+    version = _snapshot.cost_revision
+    return engine.find_path(start, end), version
+
+def _find_paths_to(end: Pos, starts: List[Pos]) -> Tuple[List[List[Pos]], int]:
+    """Runs in a worker: paths from every start to end, in order, and the snapshot version."""
+    engine = getattr(_local, "engine", None)
+    if engine is None:
+        engine = _local.engine = PathEngine(_snapshot)
+    version = _snapshot.cost_revision
+    paths = engine.find_paths_to(end, starts)
+    return [paths[start] for start in starts], version
+
+class PathService:
+    """
+    Pathfinding on a worker pool, with the same interface as PathQueue (submit,
+    submit_batch, cancel, process once per tick). Workers read a shared memory snapshot of the move cost layer,
+    which Grid change listeners keep current, so nothing but the request and the path
+    crosses the process boundary.
+
+    process() hands finished results to their PathRequest; the caller moves them into
+    MovementComponent.path on the next tick. A result computed on an older snapshot than
+    the current one is resubmitted instead of delivered.
+    """
+    def __init__(self, grid: Grid, workers: int = 2, processes: bool = True):
+        self.grid = grid
+        self.snapshot = CostSnapshot(None, grid.width, grid.height, create=True)
+        self.snapshot.write(grid, 0, 0, grid.width, grid.height)
+        init_args = (self.snapshot.name, grid.width, grid.height, PathEngine.use_jps)
+
+        self._executor: Executor
+        if processes:
+            try:
+                # spawn: forking a process that already runs threads (scheduler, config watcher) is unsafe
+                self._executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=_init_worker, initargs=init_args)
+            except (OSError, NotImplementedError) as e:
+                Logger.error(f"Path worker processes unavailable ({e}), using threads")
+                processes = False
+        if not processes:
+            # Threads in this process share the snapshot attached here
+            _init_worker(*init_args)
+            self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="path")
+        self.processes = processes
+
+        # First request's id -> the requests one worker call serves, and that call
+        self._in_flight: Dict[int, Tuple[List[PathRequest], Future]] = {}
+        self._ids = 0
+        grid.add_change_listener(self._on_grid_changed)
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def _on_grid_changed(self, x0: int, y0: int, x1: int, y1: int):
+        self.snapshot.write(self.grid, x0, y0, x1, y1)
+
+    def _run(self, group: List[PathRequest]) -> Future:
+        if len(group) == 1:
+            return self._executor.submit(_find_path, group[0].start, group[0].end)
+        return self._executor.submit(_find_paths_to, group[0].end, [request.start for request in group])
+
+    def submit(self, start: Pos, end: Pos) -> PathRequest:
+        return self.submit_batch(end, [start])[0]
+
+    def submit_batch(self, end: Pos, starts: List[Pos]) -> List[PathRequest]:
+        """Requests from many starts to one goal, served by one worker call (find_paths_to)."""
+        requests = []
+        for start in starts:
+            self._ids += 1
+            requests.append(PathRequest(self._ids, start, end))
+        group = []
+        for request in requests:
+            if needs_search(self.grid, request.start, end):
+                group.append(request)
+            else:
+                request.done = True
+        for request in group:
+            request._group = group
+        if group:
+            self._in_flight[group[0].id] = (group, self._run(group))
+        return requests
+
+    def cancel(self, request: PathRequest):
+        request.cancelled = True
+        group = request._group or [request]
+        if all(member.cancelled for member in group):
+            entry = self._in_flight.pop(group[0].id, None)
+            if entry is not None:
+                entry[1].cancel()
+
+    def process(self):
+        """Delivers finished results; stale ones go back to the pool."""
+        completed = 0
+        for request_id, (group, future) in list(self._in_flight.items()):
+            if not future.done():
+                continue
+            result, version = future.result()
+            if version != self.snapshot.cost_revision:
+                self._in_flight[request_id] = (group, self._run(group))
+                continue
+            del self._in_flight[request_id]
+            for request, path in zip(group, [result] if len(group) == 1 else result):
+                request.path = path
+                request.done = True
+            completed += len(group)
+        if Profiler.enabled:
+            Profiler.count("path.queue.done", completed)
+            Profiler.count("path.queue.pending", len(self._in_flight))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self.snapshot.close(unlink=True)
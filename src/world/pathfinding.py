@@ -1,71 +1,559 @@
 import heapq
-import math
-from typing import List, Tuple, Optional, Set
-from src.world.grid import Grid, LAYER_MOVE_COST
+import weakref
+import numpy as np
+from typing import Any, Dict, Generator, List, Optional, Sequence, Set, Tuple
+from src.world.grid import Grid, GridConfig, LAYER_MOVE_COST, LAYER_DTYPES, IMPASSABLE, NO_REGION
+from src.core.profiler import Profiler
+
+# A search run in slices (PathQueue): yields the work done since the last yield, returns its result
+Search = Generator[int, None, Any]
+
+def run_search(search: Search) -> Any:
+    """Runs a sliced search to the end and returns its result."""
+    try:
+        while True:
+            next(search)
+    except StopIteration as stop:
+        return stop.value
 
 def heuristic(a: Tuple[int, int], b: Tuple[int, int]) -> float:
-    return math.sqrt((b[0] - a[0]) ** 2 + (b[1] - a[1]) ** 2)
+    # Manhattan distance: admissible for 4-way movement with a minimum step cost of 1
+    return abs(b[0] - a[0]) + abs(b[1] - a[1])
+
+def _axis_jumps(free: np.ndarray, stops: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    JPS jump distances along axis 0 of a (n, m) walkable mask, forwards and backwards.
+
+    A scan stops at a forced tile (a neighbour across axis 1 is open, but was closed one
+    step back) or at a tile set in stops. The result is the distance to that tile, or,
+    if a wall or the edge comes first, minus the number of open tiles before it
+    (so <= 0 means a dead end, and -value is how far the scan still reaches).
+    """
+    n, m = free.shape
+    closed_row = np.zeros((1, m), dtype=bool)
+    open_row = np.ones((1, m), dtype=bool)
+    closed_col = np.zeros((n, 1), dtype=bool)
+    left = np.concatenate((closed_col, free[:, :-1]), axis=1)
+    right = np.concatenate((free[:, 1:], closed_col), axis=1)
+    index = np.arange(n, dtype=np.int32)[:, None]
+    results = []
+    for forward in (True, False):
+        if forward:
+            left_behind = np.concatenate((open_row, left[:-1]))
+            right_behind = np.concatenate((open_row, right[:-1]))
+        else:
+            left_behind = np.concatenate((left[1:], open_row))
+            right_behind = np.concatenate((right[1:], open_row))
+        stop = ~free | (left & ~left_behind) | (right & ~right_behind)
+        if stops is not None:
+            stop |= stops
+        if forward:
+            hit = np.minimum.accumulate(np.where(stop, index, n)[::-1])[::-1]
+            hit = np.concatenate((hit[1:], np.full((1, m), n, dtype=hit.dtype)))
+            distance = hit - index
+        else:
+            hit = np.maximum.accumulate(np.where(stop, index, -1))
+            hit = np.concatenate((np.full((1, m), -1, dtype=hit.dtype), hit[:-1]))
+            distance = index - hit
+        landed = (hit >= 0) & (hit < n)
+        landed[landed] = free[hit[landed], np.nonzero(landed)[1]]
+        results.append(np.where(landed, distance, 1 - distance).astype(np.int32))
+    return results[0], results[1]
+
+def _run_starts(free: np.ndarray) -> np.ndarray:
+    """Index along axis 0 where each open run starts (-1 on walls), so two tiles share a run iff equal."""
+    n, m = free.shape
+    starts = free & ~np.concatenate((np.zeros((1, m), dtype=bool), free[:-1]))
+    runs = np.maximum.accumulate(np.where(starts, np.arange(n, dtype=np.int32)[:, None], -1))
+    return np.where(free, runs, -1).astype(np.int32)
 
-def find_path(grid: Grid, start: Tuple[int, int], end: Tuple[int, int]) -> List[Tuple[int, int]]:
+class PathEngine:
+    """
+    A* over flat NumPy arrays (index = x * height + y).
+
+    g-scores, parents and the closed markers live in arrays allocated once per grid size.
+    Instead of clearing them for every search, each search gets a new stamp and a node
+    only counts as visited if its stamp matches. Scalar access goes through memoryviews,
+    which read and write plain Python numbers.
+    Not thread-safe: use one engine per thread.
+
+    In regions where every walkable tile has the same move cost, find_path can use Jump
+    Point Search instead (per call, or for every call via configure(jps=True)); searches
+    in mixed-cost regions stay on A*. Jump distances are precomputed per row and column
+    and rebuilt only around the chunks whose costs changed.
+    """
+    # Default for find_path calls that do not choose themselves
+    use_jps = False
+
+    @classmethod
+    def configure(cls, jps: bool):
+        cls.use_jps = jps
+
+    def __init__(self, grid: Grid):
+        # Proxy, so the per-grid engine cache does not keep the grid alive
+        self.grid = weakref.proxy(grid)
+        self._allocate()
+
+    def _allocate(self):
+        width, height = self.grid.width, self.grid.height
+        size = width * height
+        self._width, self._height = width, height
+        self.g = np.zeros(size, dtype=np.float64)
+        self.parent = np.full(size, -1, dtype=np.int32)
+        # Id of the search that last reached / closed each node
+        self.seen = np.zeros(size, dtype=np.uint32)
+        self.closed = np.zeros(size, dtype=np.uint32)
+        # Contiguous copy of the move cost layer, in the layer's own dtype so refreshing it is a flat memcpy
+        self.cost = np.zeros(size, dtype=LAYER_DTYPES[LAYER_MOVE_COST])
+        self._g, self._parent = memoryview(self.g), memoryview(self.parent)
+        self._seen, self._closed = memoryview(self.seen), memoryview(self.closed)
+        self._cost = memoryview(self.cost)
+        self._search = 0
+        # Nodes the last find_path expanded
+        self.expanded = 0
+        self._cost_revision = -1
+        # Move cost shared by every walkable tile, or 0 if costs vary (JPS needs uniform costs)
+        self.uniform_cost = 0
+        # Regions whose walkable tiles do not all share a cost, as of _mixed_revision
+        self._mixed_regions: Set[int] = set()
+        self._mixed_revision = -1
+        # JPS tables (flat, as cost): jump distances +x, -x, +y, -y and the start of each
+        # tile's horizontal run, built from the costs in _jump_cost
+        self._jump_cost: Optional[np.ndarray] = None
+        self._jump_revision = -1
+
+    def _sync(self):
+        """Reallocates on resize and refreshes the flat cost copy when the grid changed."""
+        grid = self.grid
+        if grid.width != self._width or grid.height != self._height:
+            self._allocate()
+        revision = grid.cost_revision
+        if revision != self._cost_revision:
+            # Read the revision before copying, and copy again if a writer (another thread
+            # on a CostSnapshot) bumped it meanwhile, so the stored revision never claims
+            # newer costs than were copied
+            while True:
+                self.cost[:] = grid.layer(LAYER_MOVE_COST).ravel()
+                latest = grid.cost_revision
+                if latest == revision:
+                    break
+                revision = latest
+            self._cost_revision = revision
+            walkable = self.cost[self.cost < IMPASSABLE]
+            uniform = walkable.size and walkable.min() == walkable.max()
+            self.uniform_cost = int(walkable[0]) if uniform else 0
+
+    def _step_cost(self, region: int) -> int:
+        """Move cost shared by every walkable tile of a region, or 0 if it varies there."""
+        if region == NO_REGION:
+            return self.uniform_cost  # No region labels (worker snapshots): whole-grid check
+        if self._mixed_revision != self._cost_revision:
+            # Labels are member indices, so a region is uniform iff every tile costs what its label tile does
+            labels = self.grid.regions.labels
+            walkable = labels != NO_REGION
+            mixed = walkable & (self.cost != self.cost[np.where(walkable, labels, 0)])
+            self._mixed_regions = set(np.unique(labels[mixed]).tolist())
+            self._mixed_revision = self._cost_revision
+        return 0 if region in self._mixed_regions else int(self.cost[region])
+
+    def _jump_tables(self):
+        """Brings the JPS tables up to date, rebuilding only the rows and columns near changed chunks."""
+        if self._jump_revision == self._cost_revision:
+            return
+        width, height = self._width, self._height
+        free = (self.cost < IMPASSABLE).reshape(width, height)
+        if self._jump_cost is None:
+            self._east, self._west = (np.zeros((width, height), dtype=np.int32) for _ in range(2))
+            self._south, self._north = (np.zeros((width, height), dtype=np.int32) for _ in range(2))
+            self._run = np.zeros((width, height), dtype=np.int32)
+            rows, columns = [(0, height)], [(0, width)]
+        else:
+            changed = np.argwhere((self.cost != self._jump_cost).reshape(width, height))
+            size = getattr(self.grid, "chunk_size", GridConfig.chunk_size)
+            chunks = {(int(x) // size, int(y) // size) for x, y in changed}
+            # A row's table reads the rows beside it, so bands grow by one tile each way
+            rows = [(max(0, cy * size - 1), min(height, (cy + 1) * size + 1)) for cy in {cy for _, cy in chunks}]
+            columns = [(max(0, cx * size - 1), min(width, (cx + 1) * size + 1)) for cx in {cx for cx, _ in chunks}]
+
+        # Horizontal: scan along x, one band of rows at a time
+        horizontal = np.zeros(width, dtype=bool)
+        for y0, y1 in rows:
+            p0, p1 = max(0, y0 - 1), min(height, y1 + 1)
+            east, west = _axis_jumps(free[:, p0:p1])
+            old = (self._east[:, y0:y1] > 0) | (self._west[:, y0:y1] > 0)
+            self._east[:, y0:y1] = east[:, y0 - p0:y1 - p0]
+            self._west[:, y0:y1] = west[:, y0 - p0:y1 - p0]
+            self._run[:, y0:y1] = _run_starts(free[:, y0:y1])
+            # Vertical scans stop where a horizontal scan finds a jump point
+            horizontal |= (old != ((self._east[:, y0:y1] > 0) | (self._west[:, y0:y1] > 0))).any(axis=1)
+
+        # Vertical: scan along y, for the changed columns and those whose horizontal stops moved
+        if self._jump_cost is not None:
+            mask = np.zeros(width + 1, dtype=bool)
+            for x0, x1 in columns:
+                mask[x0:x1] = True
+            mask[:width] |= horizontal
+            edges = np.flatnonzero(np.diff(np.concatenate(([False], mask))))
+            columns = list(zip(edges[::2], edges[1::2]))
+        for x0, x1 in columns:
+            p0, p1 = max(0, x0 - 1), min(width, x1 + 1)
+            stops = (self._east[p0:p1] > 0) | (self._west[p0:p1] > 0)
+            south, north = _axis_jumps(free[p0:p1].T, stops.T)
+            self._south[x0:x1] = south.T[x0 - p0:x1 - p0]
+            self._north[x0:x1] = north.T[x0 - p0:x1 - p0]
+
+        self._jump_cost = self.cost.copy()
+        self._jump_revision = self._cost_revision
+        self._jumps = tuple(memoryview(table.ravel()) for table in (self._east, self._west, self._south, self._north))
+        self._runs = memoryview(self._run.ravel())
+
+    def costs(self) -> memoryview:
+        """Flat move costs (index = x * height + y), refreshed if the grid changed."""
+        self._sync()
+        return self._cost
+
+    def _next_search(self) -> int:
+        self._search += 1
+        if self._search > 0xFFFFFFFF:
+            # Stamp wrapped: old stamps could collide, so clear once
+            self.seen.fill(0)
+            self.closed.fill(0)
+            self._search = 1
+        return self._search
+
+    def find_path(self, start: Tuple[int, int], end: Tuple[int, int], jps: Optional[bool] = None) -> List[Tuple[int, int]]:
+        """Same contract as find_path(): the steps after start, up to and including end, or []."""
+        self._sync()
+        self.expanded = 0
+        width, height = self._width, self._height
+        sx, sy = start
+        ex, ey = end
+        if not (0 <= ex < width and 0 <= ey < height and 0 <= sx < width and 0 <= sy < height):
+            return []
+        cost = self._cost
+        goal = ex * height + ey
+        if cost[goal] >= IMPASSABLE:
+            return []
+        region = self.grid.region_at(sx, sy)
+        if region != NO_REGION and region != self.grid.region_at(ex, ey):
+            # Different regions: no need to flood the start's region to find out
+            if Profiler.enabled:
+                Profiler.count("path.unreachable")
+            return []
+        if self.use_jps if jps is None else jps:
+            step_cost = self._step_cost(region)
+            if step_cost:
+                return self._find_path_jps(start, end, step_cost)
+
+        search = self._next_search()
+        g, parent, seen, closed = self._g, self._parent, self._seen, self._closed
+        origin = sx * height + sy
+        g[origin] = 0.0
+        seen[origin] = search
+
+        # Entries are (f, -g, node): on equal f the deeper node goes first, so open maps do not
+        # expand every tie in the start-goal rectangle
+        open_heap = [(abs(ex - sx) + abs(ey - sy), 0.0, origin)]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        last_x, last_y = width - 1, height - 1
+        expanded = 0
+        found = False
+
+        while open_heap:
+            current = heappop(open_heap)[2]
+            if closed[current] == search:
+                continue  # Stale heap entry
+            closed[current] = search
+            expanded += 1
+            if current == goal:
+                found = True
+                break
+
+            x, y = divmod(current, height)
+            base = g[current]
+            # 4-way movement, unrolled: +x, -x, +y, -y
+            if x < last_x:
+                neighbor = current + height
+                step = cost[neighbor]
+                if step < IMPASSABLE and closed[neighbor] != search:
+                    tentative = base + step
+                    if seen[neighbor] != search or tentative < g[neighbor]:
+                        seen[neighbor] = search
+                        g[neighbor] = tentative
+                        parent[neighbor] = current
+                        heappush(open_heap, (tentative + abs(ex - x - 1) + abs(ey - y), -tentative, neighbor))
+            if x > 0:
+                neighbor = current - height
+                step = cost[neighbor]
+                if step < IMPASSABLE and closed[neighbor] != search:
+                    tentative = base + step
+                    if seen[neighbor] != search or tentative < g[neighbor]:
+                        seen[neighbor] = search
+                        g[neighbor] = tentative
+                        parent[neighbor] = current
+                        heappush(open_heap, (tentative + abs(ex - x + 1) + abs(ey - y), -tentative, neighbor))
+            if y < last_y:
+                neighbor = current + 1
+                step = cost[neighbor]
+                if step < IMPASSABLE and closed[neighbor] != search:
+                    tentative = base + step
+                    if seen[neighbor] != search or tentative < g[neighbor]:
+                        seen[neighbor] = search
+                        g[neighbor] = tentative
+                        parent[neighbor] = current
+                        heappush(open_heap, (tentative + abs(ex - x) + abs(ey - y - 1), -tentative, neighbor))
+            if y > 0:
+                neighbor = current - 1
+                step = cost[neighbor]
+                if step < IMPASSABLE and closed[neighbor] != search:
+                    tentative = base + step
+                    if seen[neighbor] != search or tentative < g[neighbor]:
+                        seen[neighbor] = search
+                        g[neighbor] = tentative
+                        parent[neighbor] = current
+                        heappush(open_heap, (tentative + abs(ex - x) + abs(ey - y + 1), -tentative, neighbor))
+
+        self.expanded = expanded
+        if Profiler.enabled:
+            Profiler.count("path.nodes", expanded)
+            if not found:
+                Profiler.count("path.failed")
+        if not found:
+            return []
+
+        path = []
+        node = goal
+        while node != origin:
+            path.append(divmod(node, height))
+            node = parent[node]
+        path.reverse()
+        return path
+
+    # --- Jump Point Search (4-connected, uniform cost) ---
+    # Canonical paths run vertically first and turn horizontal where a horizontal scan
+    # finds something; horizontal runs only turn vertical at forced neighbours (the end of
+    # a wall beside them). Every other node on a straight run is skipped, not expanded.
+    # The goal-independent part of each scan is a table lookup (_jump_tables); only the
+    # goal check is done per search.
+    def _free(self, x: int, y: int) -> bool:
+        return 0 <= x < self._width and 0 <= y < self._height and self._cost[x * self._height + y] < IMPASSABLE
+
+    def _jump_horizontal(self, x: int, y: int, dx: int, end: Tuple[int, int]) -> int:
+        """x of the next jump point scanning from (x, y) along dx, or -1."""
+        distance = self._jumps[0 if dx > 0 else 1][x * self._height + y]
+        ex, ey = end
+        if y == ey and (ex - x) * dx > 0 and abs(ex - x) <= abs(distance):
+            return ex  # The goal comes first (or is the jump point)
+        return x + dx * distance if distance > 0 else -1
+
+    def _jump_vertical(self, x: int, y: int, dy: int, end: Tuple[int, int]) -> int:
+        """y of the next jump point scanning from (x, y) along dy, or -1."""
+        height = self._height
+        distance = self._jumps[2 if dy > 0 else 3][x * height + y]
+        ex, ey = end
+        # A horizontal scan from the goal's row finds the goal if they share an open run
+        if ((ey - y) * dy > 0 and abs(ey - y) <= abs(distance)
+                and self._runs[x * height + ey] == self._runs[ex * height + ey]):
+            return ey
+        return y + dy * distance if distance > 0 else -1
+
+    def _find_path_jps(self, start: Tuple[int, int], end: Tuple[int, int], step_cost: int) -> List[Tuple[int, int]]:
+        self._jump_tables()
+        height = self._height
+        sx, sy = start
+        ex, ey = end
+        search = self._next_search()
+        g, parent, seen, closed = self._g, self._parent, self._seen, self._closed
+        origin, goal = sx * height + sy, ex * height + ey
+        g[origin] = 0.0
+        seen[origin] = search
+        parent[origin] = -1
+        open_heap = [(step_cost * (abs(ex - sx) + abs(ey - sy)), 0.0, origin)]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        expanded = 0
+        found = False
+
+        while open_heap:
+            current = heappop(open_heap)[2]
+            if closed[current] == search:
+                continue
+            closed[current] = search
+            expanded += 1
+            if current == goal:
+                found = True
+                break
+
+            x, y = divmod(current, height)
+            successors = []
+            if current == origin:
+                directions = ((1, 0), (-1, 0), (0, 1), (0, -1))
+            else:
+                px, py = divmod(parent[current], height)
+                if px == x:
+                    dy = 1 if y > py else -1
+                    directions = ((0, dy), (1, 0), (-1, 0))
+                else:
+                    dx = 1 if x > px else -1
+                    directions = [(dx, 0)] + [(0, dy) for dy in (-1, 1)
+                                              if self._free(x, y + dy) and not self._free(x - dx, y + dy)]
+            for dx, dy in directions:
+                if dx:
+                    jx = self._jump_horizontal(x, y, dx, end)
+                    if jx >= 0:
+                        successors.append((jx, y))
+                else:
+                    jy = self._jump_vertical(x, y, dy, end)
+                    if jy >= 0:
+                        successors.append((x, jy))
+
+            base = g[current]
+            for nx, ny in successors:
+                neighbor = nx * height + ny
+                if closed[neighbor] == search:
+                    continue
+                tentative = base + step_cost * (abs(nx - x) + abs(ny - y))
+                if seen[neighbor] != search or tentative < g[neighbor]:
+                    seen[neighbor] = search
+                    g[neighbor] = tentative
+                    parent[neighbor] = current
+                    heappush(open_heap, (tentative + step_cost * (abs(ex - nx) + abs(ey - ny)), -tentative, neighbor))
+
+        self.expanded = expanded
+        if Profiler.enabled:
+            Profiler.count("path.nodes", expanded)
+            if not found:
+                Profiler.count("path.failed")
+        if not found:
+            return []
+
+        # Jump points -> every tile of the straight runs between them
+        path = []
+        node = goal
+        while node != origin:
+            x, y = divmod(node, height)
+            px, py = divmod(parent[node], height)
+            while (x, y) != (px, py):
+                path.append((x, y))
+                x += (px > x) - (px < x)
+                y += (py > y) - (py < y)
+            node = parent[node]
+        path.reverse()
+        return path
+
+    def find_paths_to(self, end: Tuple[int, int], starts: Sequence[Tuple[int, int]]) -> Dict[Tuple[int, int], List[Tuple[int, int]]]:
+        """
+        Paths from every start to one goal with a single reverse Dijkstra from the goal,
+        stopping once every reachable start is settled. Same per-path contract as find_path.
+        """
+        return run_search(self.search_paths_to(end, starts))
+
+    def search_paths_to(self, end: Tuple[int, int], starts: Sequence[Tuple[int, int]]) -> Search:
+        """
+        find_paths_to as a sliced search, yielding once per expanded node. The search
+        lives in this engine's arrays, so nothing else may use the engine until it ends.
+        """
+        self._sync()
+        width, height = self._width, self._height
+        ex, ey = end
+        paths: Dict[Tuple[int, int], List[Tuple[int, int]]] = {start: [] for start in starts}
+        if not (0 <= ex < width and 0 <= ey < height):
+            return paths
+        cost = self._cost
+        goal = ex * height + ey
+        if cost[goal] >= IMPASSABLE:
+            return paths
+
+        # Starts in another region can never be settled; leave them out of the stop condition
+        region = self.grid.region_at(ex, ey)
+        wanted = set()
+        for sx, sy in starts:
+            if 0 <= sx < width and 0 <= sy < height and (sx, sy) != end:
+                start_region = self.grid.region_at(sx, sy)
+                if start_region == NO_REGION or start_region == region:
+                    wanted.add(sx * height + sy)
+        if not wanted:
+            return paths
+
+        search = self._next_search()
+        g, parent, seen, closed = self._g, self._parent, self._seen, self._closed
+        g[goal] = 0.0
+        seen[goal] = search
+        open_heap = [(0.0, goal)]
+        heappush, heappop = heapq.heappush, heapq.heappop
+        remaining = len(wanted)
+        expanded = 0
+        while open_heap and remaining:
+            d, current = heappop(open_heap)
+            if closed[current] == search:
+                continue
+            closed[current] = search
+            expanded += 1
+            yield 1
+            if current in wanted:
+                remaining -= 1
+            if cost[current] >= IMPASSABLE:
+                continue  # An impassable start: reached, but nothing goes through it
+            # Walking from a neighbour onto current costs current's move cost
+            nd = d + cost[current]
+            x, y = divmod(current, height)
+            for neighbor, inside in ((current + height, x + 1 < width), (current - height, x > 0),
+                                     (current + 1, y + 1 < height), (current - 1, y > 0)):
+                if not inside or closed[neighbor] == search:
+                    continue
+                if cost[neighbor] >= IMPASSABLE and neighbor not in wanted:
+                    continue
+                if seen[neighbor] != search or nd < g[neighbor]:
+                    seen[neighbor] = search
+                    g[neighbor] = nd
+                    parent[neighbor] = current  # Next hop towards the goal
+                    heappush(open_heap, (nd, neighbor))
+
+        if Profiler.enabled:
+            Profiler.count("path.nodes", expanded)
+        for sx, sy in paths:
+            node = sx * height + sy
+            if node not in wanted or closed[node] != search:
+                continue
+            path = []
+            while node != goal:
+                node = parent[node]
+                path.append(divmod(node, height))
+            paths[(sx, sy)] = path
+        return paths
+
+# One engine (and its scratch arrays) per grid
+_engines: "weakref.WeakKeyDictionary[Grid, PathEngine]" = weakref.WeakKeyDictionary()
+
+def get_engine(grid: Grid) -> PathEngine:
+    engine = _engines.get(grid)
+    if engine is None:
+        engine = _engines[grid] = PathEngine(grid)
+    return engine
+
+def find_path(grid: Grid, start: Tuple[int, int], end: Tuple[int, int], jps: Optional[bool] = None) -> List[Tuple[int, int]]:
     """
     A* Pathfinding.
     Returns a list of (x, y) tuples from start to end.
     Returns empty list if no path found.
+    jps: use Jump Point Search when move costs are uniform (None: PathEngine.use_jps).
     """
-    if not grid.is_walkable(end[0], end[1]):
-        return []
-
-    start_node = start
-    end_node = end
-
-    open_set: List[Tuple[float, Tuple[int, int]]] = []
-    heapq.heappush(open_set, (0, start_node))
-    
-    came_from = {}
-    g_score = {start_node: 0.0}
-    f_score = {start_node: heuristic(start_node, end_node)}
-    
-    open_set_hash = {start_node} # Keep track of what's in heap for faster lookup
-
-    while open_set:
-        current = heapq.heappop(open_set)[1]
-        open_set_hash.remove(current)
-
-        if current == end_node:
-            path = []
-            while current in came_from:
-                path.append(current)
-                current = came_from[current]
-            # path.append(start) # Optional: include start? Usually we want steps *after* start
-            path.reverse()
-            return path
-
-        neighbors = []
-        x, y = current
-        # 4-way movement
-        candidates = [
-            (x+1, y), (x-1, y), (x, y+1), (x, y-1)
-        ]
-        
-        # Check bounds and walkability
-        for nx, ny in candidates:
-            if 0 <= nx < grid.width and 0 <= ny < grid.height:
-                # Get move cost from grid layer
-                cost = grid.data[nx, ny, LAYER_MOVE_COST]
-                if cost < 255: # 255 is impassable
-                    neighbors.append(((nx, ny), float(cost)))
-
-        for neighbor, cost in neighbors:
-            tentative_g_score = g_score[current] + cost
-            
-            if tentative_g_score < g_score.get(neighbor, float('inf')):
-                came_from[neighbor] = current
-                g_score[neighbor] = tentative_g_score
-                f_score[neighbor] = tentative_g_score + heuristic(neighbor, end_node)
-                
-                if neighbor not in open_set_hash:
-                    heapq.heappush(open_set, (f_score[neighbor], neighbor))
-                    open_set_hash.add(neighbor)
-                    
-    return []
+    if Profiler.enabled:
+        Profiler.count("path.calls")
+    return get_engine(grid).find_path(start, end, jps)
+
+def find_paths_batch(grid: Grid, requests: Sequence[Tuple[Tuple[int, int], Tuple[int, int]]]) -> List[List[Tuple[int, int]]]:
+    """
+    Paths for many (start, end) requests, in request order. Requests are grouped by end
+    and each group is served by one reverse search from its goal, so N villagers heading
+    for the same stockpile tile cost one search instead of N.
+    """
+    if Profiler.enabled:
+        Profiler.count("path.calls", len(requests))
+    by_goal: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}
+    for start, end in requests:
+        by_goal.setdefault(end, []).append(start)
+    engine = get_engine(grid)
+    results = {end: engine.find_paths_to(end, starts) for end, starts in by_goal.items()}
+    # Copies: requests sharing a (start, end) pair must not share one list
+    return [list(results[end][start]) for start, end in requests]
 
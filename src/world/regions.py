@@ -0,0 +1,150 @@
+import numpy as np
+from typing import List, Tuple
+
+# Label of impassable tiles
+NO_REGION = -1
+
+# Past this many changed tiles, one full relabel beats per-tile updates
+FULL_RELABEL_THRESHOLD = 16
+
+# The 8 tiles around a tile in ring order; consecutive entries are 4-adjacent
+_RING = ((0, -1), (1, -1), (1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1))
+
+def label_regions(walkable: np.ndarray) -> np.ndarray:
+    """
+    4-connected components of a (width, height) bool array, as a flat int32 array
+    (index = x * height + y). Each region is labelled with the smallest index in it,
+    impassable tiles with NO_REGION.
+
+    Vectorized union-find: every round hooks the larger root of each edge whose ends
+    disagree onto the smaller one, then pointer-jumps until every label is a root.
+    """
+    width, height = walkable.shape
+    flat = walkable.ravel()
+    nodes = np.flatnonzero(flat).astype(np.int32)
+    labels = np.full(flat.size, NO_REGION, dtype=np.int32)
+    labels[nodes] = nodes
+
+    index = np.arange(flat.size, dtype=np.int32).reshape(width, height)
+    right = index[:-1, :][walkable[:-1, :] & walkable[1:, :]]
+    down = index[:, :-1][walkable[:, :-1] & walkable[:, 1:]]
+    a = np.concatenate((right, down))
+    b = np.concatenate((right + height, down + 1))
+
+    while a.size:
+        la, lb = labels[a], labels[b]
+        differ = la != lb
+        # Edges whose ends agree keep agreeing: both follow the same root from now on
+        a, b, la, lb = a[differ], b[differ], la[differ], lb[differ]
+        if not a.size:
+            break
+        np.minimum.at(labels, np.maximum(la, lb), np.minimum(la, lb))
+        while True:
+            current = labels[nodes]
+            parent = labels[current]
+            if np.array_equal(current, parent):
+                break
+            labels[nodes] = parent
+    return labels
+
+class RegionMap:
+    """
+    Connected-region labels of a grid's walkable tiles, kept up to date lazily.
+
+    The grid queues the move cost chunks written since the last query; the next query
+    applies them. A tile that became walkable joins (and merges) its neighbours' regions;
+    a tile that became impassable may split its region, so only that region is relabelled.
+    """
+    def __init__(self, walkable: np.ndarray):
+        self.width, self.height = walkable.shape
+        self.walkable = walkable.copy()
+        self.labels = label_regions(self.walkable)
+        self._pending: List[Tuple[int, int, int, int]] = []
+
+    def mark_changed(self, x0: int, y0: int, x1: int, y1: int):
+        self._pending.append((x0, y0, x1, y1))
+
+    def refresh(self, walkable: np.ndarray):
+        """Applies the queued rects, given the grid's current walkable mask."""
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, []
+        changed = []
+        for x0, y0, x1, y1 in pending:
+            diff = np.argwhere(walkable[x0:x1, y0:y1] != self.walkable[x0:x1, y0:y1])
+            if len(changed) + len(diff) > FULL_RELABEL_THRESHOLD:
+                self.walkable[...] = walkable
+                self.labels = label_regions(self.walkable)
+                return
+            changed.extend((x0 + int(dx), y0 + int(dy)) for dx, dy in diff)
+        for x, y in changed:
+            self.walkable[x, y] = walkable[x, y]
+            if walkable[x, y]:
+                self._join(x, y)
+            else:
+                self._split(x, y)
+
+    def _join(self, x: int, y: int):
+        height, labels = self.height, self.labels
+        tile = x * height + y
+        touching = set()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < self.width and 0 <= ny < height and labels[nx * height + ny] != NO_REGION:
+                touching.add(int(labels[nx * height + ny]))
+        if not touching:
+            labels[tile] = tile
+            return
+        merged = min(touching)
+        if len(touching) > 1:
+            labels[np.isin(labels, list(touching))] = merged
+        labels[tile] = merged
+
+    def _split(self, x: int, y: int):
+        labels = self.labels
+        tile = x * self.height + y
+        region = labels[tile]
+        labels[tile] = NO_REGION
+        if region == NO_REGION:
+            return
+        neighbours = sum(1 for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1))
+                         if 0 <= nx < self.width and 0 <= ny < self.height
+                         and labels[nx * self.height + ny] == region)
+        if neighbours <= 1 and region != tile:
+            return  # A dead end cannot split its region (labels must stay member indices)
+        if self._joined_around(x, y):
+            if region == tile:
+                # Still one region, but the label must stay a member index
+                members = labels == region
+                if members.any():
+                    labels[members] = np.flatnonzero(members)[0]
+            return
+        members = labels == region
+        if not members.any():
+            return
+        relabelled = label_regions(members.reshape(self.width, self.height))
+        labels[members] = relabelled[members]
+
+    def _joined_around(self, x: int, y: int) -> bool:
+        """
+        True if the walkable 4-neighbours of (x, y) all lie on one unbroken run of walkable
+        tiles in the ring around it, so they stay connected without it and removing it
+        cannot split its region.
+        """
+        width, height, walkable = self.width, self.height, self.walkable
+        open_ring = [0 <= x + dx < width and 0 <= y + dy < height and bool(walkable[x + dx, y + dy])
+                     for dx, dy in _RING]
+        if all(open_ring):
+            return True
+        # Walk the ring from a closed tile, counting runs that hold a 4-neighbour (even entries)
+        first = open_ring.index(False)
+        runs = 0
+        in_run = holds_neighbour = False
+        for step in range(1, 9):
+            i = (first + step) % 8
+            if open_ring[i]:
+                in_run = True
+                holds_neighbour = holds_neighbour or i % 2 == 0
+            elif in_run:
+                runs += holds_neighbour
+                in_run = holds_neighbour = False
+        return runs <= 1
@@ -0,0 +1,158 @@
+import heapq
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.world.grid import Grid, IMPASSABLE
+from src.world.pathfinding import get_engine, heuristic
+from src.core.profiler import Profiler
+
+Pos = Tuple[int, int]
+Key = Tuple[float, float]
+
+INF = float("inf")
+
+class IncrementalPlanner:
+    """
+    D* Lite for one agent and one destination.
+
+    The search runs backwards from the goal and keeps its g / rhs values between calls,
+    so after a terrain edit only the tiles whose cost-to-goal changed are re-expanded,
+    and the agent moving along the path only shifts the key modifier (km). Stepping onto
+    a tile costs its move cost, as in find_path. Nodes are flat indices (x * height + y).
+    """
+    def __init__(self, grid: Grid, start: Pos, goal: Pos):
+        self.grid = grid
+        self.start = start
+        self.goal = goal
+        self._height = grid.height
+        self._goal = goal[0] * grid.height + goal[1]
+        self._km = 0.0
+        self._last_start = start
+        self._g: Dict[int, float] = {}
+        self._rhs: Dict[int, float] = {self._goal: 0.0}
+        # Open list with lazy deletion: a heap entry is live only if it matches _open[node]
+        self._open: Dict[int, Key] = {}
+        self._heap: List[Tuple[Key, int]] = []
+        self._changed: List[Pos] = []
+        # Nodes the last path() call expanded
+        self.expanded = 0
+        self._costs = get_engine(grid).costs()
+        self._push(self._goal)
+
+    # --- Bookkeeping ---
+    def _neighbors(self, node: int) -> List[int]:
+        height = self._height
+        x, y = divmod(node, height)
+        result = []
+        if x + 1 < self.grid.width:
+            result.append(node + height)
+        if x > 0:
+            result.append(node - height)
+        if y + 1 < height:
+            result.append(node + 1)
+        if y > 0:
+            result.append(node - 1)
+        return result
+
+    def _step_cost(self, node: int) -> float:
+        step = self._costs[node]
+        return INF if step >= IMPASSABLE else step
+
+    def _key(self, node: int) -> Key:
+        best = min(self._g.get(node, INF), self._rhs.get(node, INF))
+        x, y = divmod(node, self._height)
+        sx, sy = self.start
+        return (best + abs(sx - x) + abs(sy - y) + self._km, best)
+
+    def _push(self, node: int):
+        key = self._key(node)
+        self._open[node] = key
+        heapq.heappush(self._heap, (key, node))
+
+    def _update(self, node: int):
+        g, rhs = self._g, self._rhs
+        if node != self._goal:
+            if self._costs[node] >= IMPASSABLE:
+                value = INF
+            else:
+                costs = self._costs
+                value = INF
+                for neighbor in self._neighbors(node):
+                    step = costs[neighbor]
+                    if step < IMPASSABLE:
+                        candidate = step + g.get(neighbor, INF)
+                        if candidate < value:
+                            value = candidate
+            rhs[node] = value
+        if g.get(node, INF) != rhs.get(node, INF):
+            self._push(node)
+        else:
+            self._open.pop(node, None)
+
+    def _compute(self) -> int:
+        g, rhs, open_keys, heap = self._g, self._rhs, self._open, self._heap
+        heappop = heapq.heappop
+        start = self.start[0] * self._height + self.start[1]
+        expanded = 0
+        while heap:
+            key, node = heap[0]
+            if open_keys.get(node) != key:
+                heappop(heap)  # Stale entry
+                continue
+            start_g, start_rhs = g.get(start, INF), rhs.get(start, INF)
+            if start_g == start_rhs and key >= (min(start_g, start_rhs) + self._km, min(start_g, start_rhs)):
+                break
+            heappop(heap)
+            new_key = self._key(node)
+            if key < new_key:
+                self._push(node)
+                continue
+            del open_keys[node]
+            expanded += 1
+            if g.get(node, INF) > rhs.get(node, INF):
+                g[node] = rhs[node]
+            else:
+                g[node] = INF
+                self._update(node)
+            for neighbor in self._neighbors(node):
+                self._update(neighbor)
+        if Profiler.enabled:
+            Profiler.count("path.nodes", expanded)
+        self.expanded = expanded
+        return expanded
+
+    # --- Interface ---
+    def tiles_changed(self, tiles: Iterable[Pos]):
+        """Queues terrain edits; they are repaired on the next path() call."""
+        self._changed.extend(tiles)
+
+    def path(self, start: Optional[Pos] = None) -> List[Pos]:
+        """Steps after start up to the goal, repairing only what changed since the last call."""
+        if start is not None and start != self.start:
+            self.start = start
+        if self.start != self._last_start:
+            self._km += heuristic(self._last_start, self.start)
+            self._last_start = self.start
+        self._costs = get_engine(self.grid).costs()
+        height = self._height
+        if self._changed:
+            changed, self._changed = self._changed, []
+            for x, y in set(changed):
+                if 0 <= x < self.grid.width and 0 <= y < height:
+                    # A tile's cost is part of every edge into it: refresh it and its neighbours
+                    node = x * height + y
+                    self._update(node)
+                    for neighbor in self._neighbors(node):
+                        self._update(neighbor)
+        self._compute()
+
+        g = self._g
+        node = self.start[0] * height + self.start[1]
+        if g.get(node, INF) == INF or self._step_cost(self._goal) == INF:
+            return []
+        steps: List[Pos] = []
+        limit = self.grid.width * height
+        while node != self._goal and len(steps) < limit:
+            node = min(self._neighbors(node), key=lambda n: self._step_cost(n) + g.get(n, INF))
+            if self._step_cost(node) + g.get(node, INF) == INF:
+                return []
+            steps.append(divmod(node, height))
+        return steps if node == self._goal else []
@@ -1,13 +1,267 @@
-from typing import List, Tuple, Optional
+import heapq
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple, Optional
 import numpy as np
-from src.world.grid import Grid, ZONE_NONE
+from src.world.grid import Grid, GridConfig, Region, LAYER_MOVE_COST, LAYER_ZONE, ZONE_NONE, ZONE_STOCKPILE
+from src.world.pathfinding import find_path
+
+Pos = Tuple[int, int]
+
+# Scheduler resource name for systems that reserve or fill stockpile slots
+STOCKPILE = "stockpile"
+
+class ZoneIndex:
+    """
+    Tiles of one zone type bucketed into bucket_size x bucket_size cells.
+
+    Nearest queries visit occupied buckets in order of their Manhattan lower bound from
+    the query point, so they only look at the tiles of the few buckets near the answer
+    instead of every tile of the zone.
+    """
+    def __init__(self, bucket_size: int = GridConfig.chunk_size):
+        self.bucket_size = bucket_size
+        self.buckets: Dict[Pos, Set[Pos]] = {}
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, x: int, y: int):
+        bucket = self.buckets.setdefault((x // self.bucket_size, y // self.bucket_size), set())
+        if (x, y) not in bucket:
+            bucket.add((x, y))
+            self._count += 1
+
+    def discard(self, x: int, y: int):
+        key = (x // self.bucket_size, y // self.bucket_size)
+        bucket = self.buckets.get(key)
+        if bucket is not None and (x, y) in bucket:
+            bucket.remove((x, y))
+            self._count -= 1
+            if not bucket:
+                del self.buckets[key]
+
+    def update(self, tiles: Iterable[Pos]):
+        for x, y in tiles:
+            self.add(x, y)
+
+    def difference_update(self, tiles: Iterable[Pos]):
+        for x, y in tiles:
+            self.discard(x, y)
+
+    def iter_nearest(self, pos: Pos) -> Iterator[Tuple[int, Pos]]:
+        """(manhattan distance, tile) for every tile, nearest first."""
+        px, py = pos
+        size = self.bucket_size
+        # Buckets enter the heap at their lower bound and are opened when they reach the top
+        heap: List[Tuple[int, int, Pos]] = []
+        for bx, by in self.buckets:
+            x0, y0 = bx * size, by * size
+            bound = max(x0 - px, 0, px - (x0 + size - 1)) + max(y0 - py, 0, py - (y0 + size - 1))
+            heap.append((bound, 1, (bx, by)))
+        heapq.heapify(heap)
+        while heap:
+            dist, is_bucket, item = heapq.heappop(heap)
+            if not is_bucket:
+                yield dist, item
+                continue
+            for x, y in self.buckets[item]:
+                heapq.heappush(heap, (abs(x - px) + abs(y - py), 0, (x, y)))
+
+    def nearest(self, pos: Pos, k: int = 1) -> List[Pos]:
+        """Up to k tiles by Manhattan distance, nearest first."""
+        found = []
+        for _, tile in self.iter_nearest(pos):
+            found.append(tile)
+            if len(found) == k:
+                break
+        return found
+
+@dataclass
+class StockpileSlot:
+    item_type: Optional[str] = None  # None while the tile is empty and unreserved
+    amount: int = 0
+    reserved: int = 0
+    entity: Optional[int] = None  # Item entity holding the stack
+    pending: Any = None  # The stack's ItemComponent while its spawn is still queued
+
+class StockpileStorage:
+    """
+    What each stockpile tile holds and what haulers have promised to bring to it.
+
+    A tile stores one item type, up to slot_capacity units, as a single item entity.
+    Haulers reserve room when they take a job, so concurrent haulers fan out over the
+    stockpile instead of converging on its nearest tile, and drops merge into the
+    tile's stack instead of spawning a new entity each time.
+    """
+    def __init__(self, zone_manager: 'ZoneManager', slot_capacity: int = 20):
+        self.zone_manager = zone_manager
+        self.slot_capacity = slot_capacity
+        self.slots: Dict[Pos, StockpileSlot] = {}
+        # item_type -> tiles holding or expecting it
+        self._by_type: Dict[str, Set[Pos]] = {}
+        # hauler -> (tile, amount)
+        self._reservations: Dict[int, Tuple[Pos, int]] = {}
+        # stack entity -> tile
+        self._stacks: Dict[int, Pos] = {}
+
+    def _room(self, slot: StockpileSlot) -> int:
+        return self.slot_capacity - slot.amount - slot.reserved
+
+    def reservation(self, hauler: int) -> Optional[Pos]:
+        held = self._reservations.get(hauler)
+        return held[0] if held else None
+
+    def reserve(self, hauler: int, item_type: str, amount: int, near: Pos) -> Optional[Pos]:
+        """
+        Reserves room for amount units of item_type on the stockpile tile nearest to near:
+        a tile already stacking that type if one has room, else an empty tile. Replaces
+        the hauler's previous reservation. None if the stockpile is full.
+        """
+        self.release(hauler)
+        nx, ny = near
+        stacking = [tile for tile in self._by_type.get(item_type, ()) if self._room(self.slots[tile]) >= amount]
+        if stacking:
+            tile = min(stacking, key=lambda t: abs(t[0] - nx) + abs(t[1] - ny))
+        else:
+            index = self.zone_manager.zone_index.get(ZONE_STOCKPILE)
+            tile = None
+            for _, candidate in (index.iter_nearest(near) if index else ()):
+                slot = self.slots.get(candidate)
+                if slot is None or slot.item_type is None:
+                    tile = candidate
+                    break
+            if tile is None:
+                return None
+        slot = self.slots.setdefault(tile, StockpileSlot())
+        if slot.item_type is None:
+            slot.item_type = item_type
+            self._by_type.setdefault(item_type, set()).add(tile)
+        slot.reserved += amount
+        self._reservations[hauler] = (tile, amount)
+        return tile
+
+    def release(self, hauler: int):
+        """Gives back a hauler's unused reservation, if any."""
+        held = self._reservations.pop(hauler, None)
+        if held is not None:
+            tile, amount = held
+            slot = self.slots.get(tile)
+            if slot is not None:
+                slot.reserved = max(slot.reserved - amount, 0)
+                self._clear_if_empty(tile)
+
+    def stack_at(self, tile: Pos, item_type: str) -> Optional[int]:
+        """Item entity stacking item_type on a tile, to merge a drop into."""
+        slot = self.slots.get(tile)
+        if slot is None or slot.item_type != item_type:
+            return None
+        return slot.entity
+
+    def room(self, tile: Pos, item_type: str, hauler: Optional[int] = None) -> int:
+        """
+        Units of item_type a tile can still take, counting hauler's own reservation on it
+        as free. 0 if the tile is not stockpile or stacks another type.
+        """
+        if self.zone_manager.grid.get_zone(*tile) != ZONE_STOCKPILE:
+            return 0
+        slot = self.slots.get(tile)
+        if slot is None:
+            return self.slot_capacity
+        if slot.item_type not in (None, item_type):
+            return 0
+        room = self._room(slot)
+        held = self._reservations.get(hauler) if hauler is not None else None
+        if held is not None and held[0] == tile:
+            room += held[1]
+        return max(room, 0)
+
+    def accepts(self, tile: Pos, item_type: str, hauler: Optional[int] = None) -> bool:
+        """True if a stockpile tile is empty or already stacks item_type, and has room left."""
+        return self.room(tile, item_type, hauler) > 0
+
+    def pending_item(self, tile: Pos) -> Any:
+        """ItemComponent of the tile's stack if it was spawned this tick and is not in the world yet."""
+        slot = self.slots.get(tile)
+        return slot.pending if slot is not None else None
+
+    def deposit(self, tile: Pos, item_type: str, amount: int, entity: int, hauler: Optional[int] = None,
+                spawned: Any = None):
+        """
+        Records amount units dropped onto a tile's stack (entity), using up hauler's
+        reservation. Check room() first, amount must fit. For a stack spawned through the command
+        buffer, pass its ItemComponent as spawned, so later drops this tick merge into it.
+        """
+        if hauler is not None:
+            self.release(hauler)
+        slot = self.slots.setdefault(tile, StockpileSlot())
+        if slot.item_type is None:
+            slot.item_type = item_type
+            self._by_type.setdefault(item_type, set()).add(tile)
+        if slot.entity != entity:
+            if slot.entity is not None:
+                self._stacks.pop(slot.entity, None)  # Its stack was lost; count the new one
+            slot.entity = entity
+            slot.amount = 0
+            slot.pending = spawned
+            self._stacks[entity] = tile
+        slot.amount += amount
+
+    def withdraw(self, entity: int, amount: int):
+        """Records amount units taken off a stack that stays on its tile."""
+        tile = self._stacks.get(entity)
+        if tile is not None:
+            slot = self.slots[tile]
+            slot.amount = max(slot.amount - amount, 0)
+
+    def remove_stack(self, entity: int):
+        """Forgets a stack entity that was picked up or destroyed."""
+        tile = self._stacks.pop(entity, None)
+        if tile is None:
+            return
+        slot = self.slots[tile]
+        slot.amount = 0
+        slot.entity = slot.pending = None
+        self._clear_if_empty(tile)
+
+    def _clear_if_empty(self, tile: Pos):
+        slot = self.slots[tile]
+        if slot.amount == 0 and slot.reserved == 0 and slot.entity is None:
+            if slot.item_type is not None:
+                self._by_type[slot.item_type].discard(tile)
+            del self.slots[tile]
+
+    def _on_zone_changed(self, x: int, y: int, old_zone: int, new_zone: int):
+        if old_zone != ZONE_STOCKPILE:
+            return
+        slot = self.slots.pop((x, y), None)
+        if slot is None:
+            return
+        # The tile is no longer storage: its stack stays as a loose item, haulers re-reserve
+        if slot.item_type is not None:
+            self._by_type[slot.item_type].discard((x, y))
+        if slot.entity is not None:
+            self._stacks.pop(slot.entity, None)
+        if slot.reserved:
+            for hauler in [h for h, (tile, _) in self._reservations.items() if tile == (x, y)]:
+                del self._reservations[hauler]
 
 class ZoneManager:
-    def __init__(self, grid: Grid):
+    def __init__(self, grid: Grid, stockpile_slot_capacity: int = 20):
         self.grid = grid
         # Cache for zone locations to avoid scanning the whole grid
         # dict[zone_type] -> set of (x, y)
         self.zone_cache = {}
+        # dict[zone_type] -> ZoneIndex over the same tiles, for nearest queries
+        self.zone_index: Dict[int, ZoneIndex] = {}
+        # Callbacks (x, y, old_zone, new_zone), e.g. for flow fields
+        self._listeners: List[Callable[[int, int, int, int], None]] = []
+        # Slot contents and hauler reservations of stockpile tiles
+        self.stockpile = StockpileStorage(self, stockpile_slot_capacity)
+        self.add_listener(self.stockpile._on_zone_changed)
+
+    def add_listener(self, listener: Callable[[int, int, int, int], None]):
+        self._listeners.append(listener)
 
     def mark_zone(self, x: int, y: int, zone_type: int):
         current_zone = self.grid.get_zone(x, y)
@@ -18,6 +272,7 @@ class ZoneManager:
         if current_zone != ZONE_NONE:
             if current_zone in self.zone_cache:
                 self.zone_cache[current_zone].discard((x, y))
+                self.zone_index[current_zone].discard(x, y)
 
         # Set new zone
         self.grid.set_zone(x, y, zone_type)
@@ -26,26 +281,88 @@ class ZoneManager:
         if zone_type != ZONE_NONE:
             if zone_type not in self.zone_cache:
                 self.zone_cache[zone_type] = set()
+                self.zone_index[zone_type] = ZoneIndex(self.grid.chunk_size)
             self.zone_cache[zone_type].add((x, y))
+            self.zone_index[zone_type].add(x, y)
+
+        for listener in self._listeners:
+            listener(x, y, current_zone, zone_type)
+
+    def mark_zone_region(self, region: Region, zone_type: int) -> int:
+        """
+        mark_zone over a rect, polygon or mask (see Grid.resolve_region), done with array
+        ops. Returns the number of tiles whose zone changed.
+        """
+        resolved = self.grid.resolve_region(region)
+        if resolved is None:
+            return 0
+        (x0, y0, x1, y1), mask = resolved
+        current = self.grid.layer(LAYER_ZONE)[x0:x1, y0:y1]
+        changed = current != zone_type
+        if mask is not None:
+            changed &= mask
+        xs, ys = np.nonzero(changed)
+        if not xs.size:
+            return 0
+        old_zones = current[changed]  # A copy, taken before the grid write below
+        xs, ys = (xs + x0).tolist(), (ys + y0).tolist()
+
+        # Remove from old caches
+        for old_zone in np.unique(old_zones).tolist():
+            if old_zone != ZONE_NONE and old_zone in self.zone_cache:
+                removed = [(x, y) for x, y, zone in zip(xs, ys, old_zones.tolist()) if zone == old_zone]
+                self.zone_cache[old_zone].difference_update(removed)
+                self.zone_index[old_zone].difference_update(removed)
+
+        self.grid.set_zone_mask(changed, zone_type, (x0, y0))
+
+        # Add to new cache
+        if zone_type != ZONE_NONE:
+            self.zone_cache.setdefault(zone_type, set()).update(zip(xs, ys))
+            self.zone_index.setdefault(zone_type, ZoneIndex(self.grid.chunk_size)).update(zip(xs, ys))
+
+        if self._listeners:
+            for x, y, old_zone in zip(xs, ys, old_zones.tolist()):
+                for listener in self._listeners:
+                    listener(x, y, old_zone, zone_type)
+        return len(xs)
 
     def get_nearest_zone_tile(self, start_pos: Tuple[int, int], zone_type: int) -> Optional[Tuple[int, int]]:
-        """Find the nearest tile of a specific zone type."""
-        if zone_type not in self.zone_cache or not self.zone_cache[zone_type]:
-            return None
+        """Find the nearest tile of a specific zone type (Manhattan distance)."""
+        nearest = self.get_nearest_zone_tiles(start_pos, zone_type)
+        return nearest[0] if nearest else None
 
-        best_pos = None
-        min_dist = float('inf')
-        
-        sx, sy = start_pos
-        
-        # Simple scan of cached locations
-        # For large numbers of zone tiles, a spatial index (KDTree) would be better,
-        # but for now iterating over a set is fine.
-        for zx, zy in self.zone_cache[zone_type]:
-            dist = abs(zx - sx) + abs(zy - sy) # Manhattan distance
-            if dist < min_dist:
-                min_dist = dist
-                best_pos = (zx, zy)
-                
-        return best_pos
+    def get_nearest_zone_tiles(self, start_pos: Tuple[int, int], zone_type: int, k: int = 1,
+                               by_path: bool = False) -> List[Tuple[int, int]]:
+        """
+        Up to k tiles of a zone type, nearest first.
+
+        by_path ranks by the cost of walking there and skips unreachable tiles. Every step
+        costs at least 1, so Manhattan distance bounds the walk from below: tiles are
+        tried in Manhattan order and the search stops once that bound passes the k-th
+        best walk found, which keeps the number of A* runs close to k.
+        """
+        index = self.zone_index.get(zone_type)
+        if not index:
+            return []
+        if not by_path:
+            return index.nearest(start_pos, k)
 
+        costs = self.grid.layer(LAYER_MOVE_COST)
+        best: List[Tuple[int, Tuple[int, int]]] = []
+        for bound, tile in index.iter_nearest(start_pos):
+            if len(best) == k and bound >= best[-1][0]:
+                break
+            if tile == start_pos:
+                walk = 0
+            elif self.grid.is_reachable(start_pos, tile):
+                path = find_path(self.grid, start_pos, tile)
+                if not path:
+                    continue
+                walk = sum(int(costs[x, y]) for x, y in path)
+            else:
+                continue
+            best.append((walk, tile))
+            best.sort()
+            del best[k:]
+        return [tile for _, tile in best]
@@ -0,0 +1,24 @@
+import json
+import pytest
+from src.core.ecs import EntityManager
+from src.core.config_manager import ConfigManager
+
+@pytest.fixture
+def em() -> EntityManager:
+    return EntityManager()
+
+@pytest.fixture
+def make_config(tmp_path):
+    """Builds a ConfigManager over a temporary balance.json holding `data`."""
+    managers = []
+
+    def make(data: dict) -> ConfigManager:
+        path = tmp_path / "balance.json"
+        path.write_text(json.dumps(data), encoding="utf-8")
+        manager = ConfigManager(str(path))
+        managers.append(manager)
+        return manager
+
+    yield make
+    for manager in managers:
+        manager.stop()
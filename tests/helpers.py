@@ -0,0 +1,65 @@
+"""Grid builders and a plain reference A* for the pathfinding tests."""
+import heapq
+import random
+from typing import List, Optional, Tuple
+import numpy as np
+from src.world.grid import Grid, LAYER_MOVE_COST, LAYER_TERRAIN, IMPASSABLE, TERRAIN_WATER
+
+Pos = Tuple[int, int]
+
+def random_grid(width: int, height: int, seed: int, water: float = 0.2, max_cost: int = 1,
+                chunk_size: int = 8) -> Grid:
+    """Grid with random impassable water tiles and, if max_cost > 1, random move costs."""
+    grid = Grid(width, height, chunk_size)
+    rng = np.random.default_rng(seed)
+    costs = grid.layer(LAYER_MOVE_COST)
+    costs[...] = rng.integers(1, max_cost + 1, size=(width, height))
+    blocked = rng.random((width, height)) < water
+    costs[blocked] = IMPASSABLE
+    grid.layer(LAYER_TERRAIN)[blocked] = TERRAIN_WATER
+    grid.mark_changed()
+    return grid
+
+def walkable_tiles(grid: Grid) -> List[Pos]:
+    costs = grid.layer(LAYER_MOVE_COST)
+    return [(int(x), int(y)) for x, y in np.argwhere(costs < IMPASSABLE)]
+
+def random_pairs(grid: Grid, count: int, seed: int) -> List[Tuple[Pos, Pos]]:
+    tiles = walkable_tiles(grid)
+    rng = random.Random(seed)
+    return [(rng.choice(tiles), rng.choice(tiles)) for _ in range(count)]
+
+def reference_cost(grid: Grid, start: Pos, end: Pos) -> Optional[int]:
+    """Cost of the cheapest 4-way walk (sum of the move costs of the tiles entered), or None."""
+    costs = grid.layer(LAYER_MOVE_COST)
+    width, height = costs.shape
+    if costs[end] >= IMPASSABLE:
+        return None
+    best = {start: 0}
+    heap = [(abs(end[0] - start[0]) + abs(end[1] - start[1]), 0, start)]
+    while heap:
+        _, g, (x, y) = heapq.heappop(heap)
+        if (x, y) == end:
+            return g
+        if g > best[(x, y)]:
+            continue
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < width and 0 <= ny < height and costs[nx, ny] < IMPASSABLE:
+                ng = g + int(costs[nx, ny])
+                if ng < best.get((nx, ny), ng + 1):
+                    best[(nx, ny)] = ng
+                    heapq.heappush(heap, (ng + abs(end[0] - nx) + abs(end[1] - ny), ng, (nx, ny)))
+    return None
+
+def path_cost(grid: Grid, start: Pos, end: Pos, path: List[Pos]) -> int:
+    """Checks that path walks from start to end over 4-adjacent walkable tiles and returns its cost."""
+    costs = grid.layer(LAYER_MOVE_COST)
+    assert path and path[-1] == end
+    x, y = start
+    total = 0
+    for nx, ny in path:
+        assert abs(nx - x) + abs(ny - y) == 1, f"jump from {(x, y)} to {(nx, ny)}"
+        assert costs[nx, ny] < IMPASSABLE, f"{(nx, ny)} is impassable"
+        total += int(costs[nx, ny])
+        x, y = nx, ny
+    return total
@@ -0,0 +1,37 @@
+import pytest
+from src.core.ecs import EntityManager
+from src.components.data_components import ActionComponent, PositionComponent, JobComponent
+from src.components.skill_component import SkillComponent
+from src.systems.ai_system import AISystem
+from src.systems.job_system import Job, JobSystem
+from src.world.grid import Grid
+from src.world.zone_manager import ZoneManager
+
+@pytest.fixture
+def ai(em: EntityManager, make_config) -> AISystem:
+    grid = Grid(16, 16)
+    return AISystem(em, JobSystem(), grid, ZoneManager(grid), make_config({}))
+
+def test_job_removal_is_deferred_but_seen_this_tick(em: EntityManager, ai: AISystem):
+    worker = em.create_entity(
+        PositionComponent(0, 0), ActionComponent(current_action="chop"), SkillComponent(),
+        # Its job is no longer on the board
+        JobComponent(job_id="gone", job_type="chop"),
+    )
+    fresh = Job(job_type="build", target_pos=(3, 3))
+    ai.job_system.add_job(fresh)
+
+    ai.update(0.1)
+
+    # The stale job is dropped through the command buffer, so the worker still carries it...
+    assert em.get_component(worker, JobComponent).job_id == "gone"
+    # ...but already counted as job-less and picked up the new job in the same tick
+    assert fresh.assignee == worker
+    assert em.get_component(worker, ActionComponent).current_action == "idle"
+
+    em.flush_commands()
+    assert em.get_component(worker, JobComponent).job_id == fresh.id
+
+    # The next tick starts with a clean slate
+    ai.update(0.1)
+    assert worker not in ai._dropped_jobs
@@ -0,0 +1,295 @@
+import threading
+import numpy as np
+from src.core.ecs import EntityManager, TOMBSTONE, entity_slot, entity_generation
+from src.components.data_components import (
+    PositionComponent, ActionComponent, InventoryComponent, ItemComponent, HungerComponent, CropComponent,
+)
+
+# --- Archetypes ---
+def test_entities_with_same_components_share_a_table(em: EntityManager):
+    a = em.create_entity(PositionComponent(0, 0), ActionComponent())
+    b = em.create_entity(ActionComponent(), PositionComponent(1, 1))
+    c = em.create_entity(PositionComponent(2, 2))
+
+    assert em._entity_archetype[a] is em._entity_archetype[b]
+    assert em._entity_archetype[a] is not em._entity_archetype[c]
+    assert len(em._entity_archetype[a]) == 2
+
+def test_add_and_remove_component_move_the_row(em: EntityManager):
+    position = PositionComponent(3, 4)
+    entity = em.create_entity(position)
+    source = em._entity_archetype[entity]
+
+    em.add_component(entity, ActionComponent(current_action="chop"))
+    target = em._entity_archetype[entity]
+    assert target is not source and len(source) == 0
+    assert em.get_component(entity, PositionComponent) is position
+    assert em.get_component(entity, ActionComponent).current_action == "chop"
+    # The transition is cached on both tables
+    assert source.add_edges[ActionComponent] is target
+
+    em.remove_component(entity, ActionComponent)
+    assert em._entity_archetype[entity] is source
+    assert em.get_component(entity, ActionComponent) is None
+    assert em.get_component(entity, PositionComponent) is position
+
+def test_add_existing_component_replaces_in_place(em: EntityManager):
+    entity = em.create_entity(PositionComponent(0, 0))
+    table = em._entity_archetype[entity]
+    em.add_component(entity, PositionComponent(5, 6))
+    assert em._entity_archetype[entity] is table
+    assert em.get_component(entity, PositionComponent) == PositionComponent(5, 6)
+
+def test_swap_remove_keeps_other_rows_consistent(em: EntityManager):
+    entities = [em.create_entity(PositionComponent(i, 0)) for i in range(5)]
+    em.destroy_entity(entities[1])
+
+    for entity in entities[:1] + entities[2:]:
+        assert em.get_component(entity, PositionComponent).x == entity
+    assert sorted(e for e, _ in em.get_entities_with(PositionComponent)) == entities[:1] + entities[2:]
+
+def test_query_matches_supersets_only(em: EntityManager):
+    both = em.create_entity(PositionComponent(0, 0), InventoryComponent())
+    em.create_entity(PositionComponent(1, 1))
+    em.create_entity(ItemComponent("log"))
+
+    assert [e for e, *_ in em.get_entities_with(PositionComponent, InventoryComponent)] == [both]
+    assert len(list(em.get_entities_with(PositionComponent))) == 2
+
+# --- Views ---
+def test_view_is_cached_and_tracks_new_archetypes(em: EntityManager):
+    view = em.view(PositionComponent)
+    assert em.view(PositionComponent) is view
+    assert len(view) == 0
+
+    entity = em.create_entity(PositionComponent(0, 0), ItemComponent("log"))
+    assert em._entity_archetype[entity] in view.archetypes
+    assert [e for e, _ in view] == [entity]
+
+def test_removals_during_iteration_are_skipped(em: EntityManager):
+    entities = [em.create_entity(PositionComponent(i, 0)) for i in range(6)]
+    seen = []
+    for entity, _ in em.view(PositionComponent):
+        seen.append(entity)
+        if entity == entities[0]:
+            # Later rows die before the loop reaches them
+            em.destroy_entity(entities[3])
+            em.remove_component(entities[4], PositionComponent)
+    assert seen == [e for e in entities if e not in (entities[3], entities[4])]
+
+def test_entities_added_during_iteration_wait_for_next_pass(em: EntityManager):
+    em.create_entity(PositionComponent(0, 0))
+    seen = []
+    for entity, _ in em.view(PositionComponent):
+        seen.append(entity)
+        em.create_entity(PositionComponent(1, 1))
+    assert len(seen) == 1
+    assert len(list(em.view(PositionComponent))) == 2
+
+def test_tombstones_compact_after_outermost_nested_iteration(em: EntityManager):
+    entities = [em.create_entity(PositionComponent(i, 0), ActionComponent()) for i in range(4)]
+    table = em._entity_archetype[entities[0]]
+
+    outer_seen = []
+    for outer, _ in em.view(PositionComponent):
+        outer_seen.append(outer)
+        for inner, _ in em.view(ActionComponent):
+            if inner == entities[1]:
+                em.destroy_entity(inner)
+                # Moving an entity out keeps a tombstone too
+                em.remove_component(entities[2], ActionComponent)
+        # Inner loop finished, but the outer one still holds row indices
+        assert TOMBSTONE in table.entities
+        assert table.holes == 2
+
+    assert outer_seen == [entities[0], entities[3]]
+    # Compacted once the outermost iteration ended
+    assert TOMBSTONE not in table.entities and table.holes == 0
+    assert table.entities == [entities[0], entities[3]]
+    assert table.rows == {entities[0]: 0, entities[3]: 1}
+    assert em.get_component(entities[3], PositionComponent).x == 3
+    assert em.get_component(entities[2], PositionComponent).x == 2
+    assert not em._dirty_archetypes
+
+def test_abandoned_iteration_still_compacts(em: EntityManager):
+    entities = [em.create_entity(PositionComponent(i, 0)) for i in range(3)]
+    for entity, _ in em.view(PositionComponent):
+        em.destroy_entity(entities[2])
+        break
+    assert em._iter_depth == 0
+    assert TOMBSTONE not in em._entity_archetype[entities[0]].entities
+
+# --- Column components ---
+def test_attached_column_component_proxies_its_row(em: EntityManager):
+    hunger = HungerComponent(hunger=10.0)
+    entity = em.create_entity(PositionComponent(0, 0), hunger)
+    table = em._entity_archetype[entity]
+    column = table.column(HungerComponent, "hunger")
+
+    assert column[table.rows[entity]] == 10.0
+    column[table.rows[entity]] = 42.0
+    assert hunger.hunger == 42.0
+    hunger.hunger = 7.5
+    assert table.column(HungerComponent, "hunger")[table.rows[entity]] == 7.5
+
+def test_column_values_follow_table_moves_and_detach(em: EntityManager):
+    crop = CropComponent("wheat", growth_progress=0.25)
+    entity = em.create_entity(PositionComponent(0, 0), crop)
+    em.add_component(entity, ActionComponent())
+    assert em.get_component(entity, CropComponent) is crop
+    assert crop.growth_progress == 0.25 and crop.crop_type == "wheat"
+
+    em.destroy_entity(entity)
+    # Detached instances keep their last value locally
+    assert crop._ecs_arrays is None
+    assert crop.growth_progress == 0.25
+
+def test_columns_survive_growth_swap_remove_and_compaction(em: EntityManager):
+    entities = [em.create_entity(HungerComponent(hunger=float(i))) for i in range(40)]
+    em.destroy_entity(entities[0])
+    for entity, _ in em.view(HungerComponent):
+        if entity == entities[1]:
+            em.destroy_entity(entities[5])
+
+    live = [e for e in entities if e not in (entities[0], entities[5])]
+    assert [em.get_component(e, HungerComponent).hunger for e in live] == [float(e) for e in live]
+    table = em._entity_archetype[live[0]]
+    expected = np.array([em.get_component(e, HungerComponent).hunger for e in table.entities])
+    assert np.array_equal(table.column(HungerComponent, "hunger"), expected)
+
+def test_create_entities_fills_columns_in_bulk(em: EntityManager):
+    entities = em.create_entities({HungerComponent: [HungerComponent(hunger=float(i)) for i in range(20)]})
+    table = em._entity_archetype[entities[0]]
+    assert np.array_equal(table.column(HungerComponent, "hunger"), np.arange(20, dtype=np.float64))
+
+# --- Entity handles ---
+def test_destroyed_slot_is_recycled_with_a_new_generation(em: EntityManager):
+    old = em.create_entity(PositionComponent(0, 0))
+    em.destroy_entity(old)
+    new = em.create_entity(PositionComponent(1, 1))
+
+    assert entity_slot(new) == entity_slot(old)
+    assert entity_generation(new) == entity_generation(old) + 1
+    assert not em.has_entity(old) and em.has_entity(new)
+    assert em.slot_count == 1
+
+def test_stale_handle_cannot_touch_the_new_occupant(em: EntityManager):
+    old = em.create_entity(PositionComponent(0, 0))
+    em.destroy_entity(old)
+    new = em.create_entity(PositionComponent(1, 1))
+
+    assert em.get_component(old, PositionComponent) is None
+    em.add_component(old, ActionComponent())
+    em.destroy_entity(old)
+    assert em.has_entity(new)
+    assert not em.has_component(new, ActionComponent)
+
+def test_double_destroy_does_not_free_the_slot_twice(em: EntityManager):
+    entity = em.create_entity()
+    em.destroy_entity(entity)
+    em.destroy_entity(entity)
+    assert len(em._free_slots) == 1
+    assert em.create_entity() != em.create_entity()
+
+def test_reserved_handle_is_alive_but_unplaced(em: EntityManager):
+    entity = em.reserve_entity()
+    assert em.has_entity(entity)
+    assert em.get_signature(entity) == 0
+    em.destroy_entity(entity)
+    assert not em.has_entity(entity)
+    assert em._free_slots == [entity_slot(entity)]
+
+# --- Component masks ---
+def test_component_mask_assigns_one_bit_per_type(em: EntityManager):
+    position = em.component_mask(PositionComponent)
+    action = em.component_mask(ActionComponent)
+    assert position and action and position & action == 0
+    assert em.component_mask(PositionComponent, ActionComponent) == position | action
+    assert em.component_mask(PositionComponent) == position
+
+def test_signature_and_mask_membership(em: EntityManager):
+    entity = em.create_entity(PositionComponent(0, 0), ActionComponent())
+    mask = em.component_mask(PositionComponent, ActionComponent)
+
+    assert em.get_signature(entity) == mask
+    assert em.has_components(entity, mask)
+    assert em.has_component(entity, ActionComponent)
+    assert not em.has_component(entity, InventoryComponent)
+    assert not em.has_components(entity, em.component_mask(PositionComponent, InventoryComponent))
+
+    em.destroy_entity(entity)
+    assert em.get_signature(entity) == 0
+    assert not em.has_components(entity, em.component_mask(PositionComponent))
+
+def test_destroy_only_touches_the_entity_table(em: EntityManager):
+    entity = em.create_entity(PositionComponent(0, 0))
+    other = em.create_entity(ItemComponent("log"))
+    other_table = em._entity_archetype[other]
+    before = list(other_table.entities)
+
+    em.destroy_entity(entity)
+    assert other_table.entities == before
+    assert not any(entity in table.rows for table in em._archetypes.values())
+
+# --- Command buffer ---
+def test_commands_apply_at_flush_in_order(em: EntityManager):
+    entity = em.create_entity(PositionComponent(0, 0))
+    commands = em.commands
+    commands.add_component(entity, ActionComponent(current_action="chop"))
+    commands.remove_component(entity, PositionComponent)
+    spawned = commands.spawn(PositionComponent(5, 5), ItemComponent("log"))
+
+    assert len(commands) == 3
+    assert em.has_component(entity, PositionComponent)
+    assert not em.has_component(entity, ActionComponent)
+    # The handle is live at once but the entity is not queryable yet
+    assert em.has_entity(spawned)
+    assert list(em.get_entities_with(ItemComponent)) == []
+
+    assert em.flush_commands() == 3
+    assert len(commands) == 0
+    assert em.get_signature(entity) == em.component_mask(ActionComponent)
+    assert em.get_component(spawned, ItemComponent).item_type == "log"
+    assert em.get_component(spawned, PositionComponent) == PositionComponent(5, 5)
+
+def test_spawn_goes_straight_to_its_final_table(em: EntityManager):
+    spawned = em.commands.spawn(PositionComponent(0, 0), ItemComponent("log"))
+    em.flush_commands()
+    assert em._empty_archetype.entities == []
+    assert em._entity_archetype[spawned].signature == {PositionComponent, ItemComponent}
+
+def test_destroy_claims_an_entity_once(em: EntityManager):
+    entity = em.create_entity(ItemComponent("log"))
+    assert em.commands.destroy(entity)
+    assert not em.commands.destroy(entity)
+    assert em.commands.is_destroyed(entity)
+    em.flush_commands()
+    assert not em.has_entity(entity)
+    assert not em.commands.is_destroyed(entity)
+    assert not em.commands.destroy(entity)
+
+def test_commands_for_dead_entities_are_ignored(em: EntityManager):
+    entity = em.create_entity(PositionComponent(0, 0))
+    em.commands.destroy(entity)
+    em.commands.add_component(entity, ActionComponent())
+    spawned = em.commands.spawn(ItemComponent("log"))
+    em.commands.destroy(spawned)
+    em.flush_commands()
+
+    assert not em.has_entity(entity) and not em.has_entity(spawned)
+    assert list(em.get_entities_with(ActionComponent)) == []
+    assert list(em.get_entities_with(ItemComponent)) == []
+
+def test_commands_recorded_from_many_threads(em: EntityManager):
+    def record():
+        for _ in range(200):
+            em.commands.spawn(ItemComponent("log"))
+
+    threads = [threading.Thread(target=record) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert em.flush_commands() == 800
+    assert len(set(e for e, _ in em.get_entities_with(ItemComponent))) == 800
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from src.world.grid import Grid, LAYER_MOVE_COST, TERRAIN_GRASS, TERRAIN_WATER, ZONE_STOCKPILE, ZONE_NONE
+from src.world.zone_manager import ZoneManager
+from src.world.flow_field import FlowFieldService
+from tests.helpers import random_grid, walkable_tiles, reference_cost, path_cost
+
+ZONE_TILES = [(2, 3), (17, 12), (10, 1), (5, 14)]
+
+@pytest.fixture
+def world():
+    grid = random_grid(20, 16, 21, water=0.2, max_cost=3)
+    grid.fill_terrain((2, 3, 3, 4), TERRAIN_GRASS)
+    zones = ZoneManager(grid)
+    for tile in ZONE_TILES[:3]:
+        zones.mark_zone(*tile, ZONE_STOCKPILE)
+    return grid, zones, FlowFieldService(grid, zones)
+
+def _zone_tiles(grid: Grid):
+    return [tile for tile in walkable_tiles(grid) if grid.get_zone(*tile) == ZONE_STOCKPILE]
+
+def _check_against_reference(grid: Grid, flow: FlowFieldService):
+    targets = _zone_tiles(grid)
+    for pos in walkable_tiles(grid)[::7]:
+        costs = [c for c in (reference_cost(grid, pos, t) if t != pos else 0 for t in targets) if c is not None]
+        expected = min(costs) if costs else None
+        assert flow.distance(ZONE_STOCKPILE, pos) == expected
+        if expected:
+            path = flow.path(ZONE_STOCKPILE, pos)
+            assert path_cost(grid, pos, path[-1], path) == expected
+            assert path[-1] == flow.nearest(ZONE_STOCKPILE, pos)
+            assert path[0] == flow.next_step(ZONE_STOCKPILE, pos)
+
+def _assert_same_fields(grid: Grid, zones: ZoneManager, flow: FlowFieldService):
+    fresh = FlowFieldService(grid, zones)
+    field, expected = flow._field(ZONE_STOCKPILE), fresh._field(ZONE_STOCKPILE)
+    assert np.array_equal(field.dist, expected.dist)
+
+def test_distances_match_reference(world):
+    grid, _, flow = world
+    _check_against_reference(grid, flow)
+    assert flow.distance(ZONE_STOCKPILE, (2, 3)) == 0
+    assert flow.next_step(ZONE_STOCKPILE, (2, 3)) is None
+    assert flow.path(ZONE_STOCKPILE, (2, 3)) == []
+    assert flow.distance(ZONE_STOCKPILE, (99, 0)) is None
+
+def test_new_zone_tile_updates_incrementally(world):
+    grid, zones, flow = world
+    flow.distance(ZONE_STOCKPILE, (0, 0))
+    grid.fill_terrain((5, 14, 6, 15), TERRAIN_GRASS)
+    zones.mark_zone(*ZONE_TILES[3], ZONE_STOCKPILE)
+
+    field = flow.fields[ZONE_STOCKPILE]
+    assert not field.dirty and field.pending
+    _assert_same_fields(grid, zones, flow)
+    _check_against_reference(grid, flow)
+
+def test_cheaper_tiles_update_incrementally(world):
+    grid, zones, flow = world
+    flow.distance(ZONE_STOCKPILE, (0, 0))
+    # Also opens the water in the block
+    grid.layer(LAYER_MOVE_COST)[4:12, 4:12] = 1
+    grid.mark_changed(4, 4, 12, 12)
+
+    assert not flow.fields[ZONE_STOCKPILE].dirty
+    _assert_same_fields(grid, zones, flow)
+    _check_against_reference(grid, flow)
+
+def test_removals_and_walls_rebuild(world):
+    grid, zones, flow = world
+    flow.distance(ZONE_STOCKPILE, (0, 0))
+    zones.mark_zone(*ZONE_TILES[0], ZONE_NONE)
+    assert flow.fields[ZONE_STOCKPILE].dirty
+    _check_against_reference(grid, flow)
+
+    grid.fill_terrain((8, 0, 9, 16), TERRAIN_WATER)
+    assert flow.fields[ZONE_STOCKPILE].dirty
+    _check_against_reference(grid, flow)
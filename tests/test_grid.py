@@ -0,0 +1,158 @@
+import pytest
+import numpy as np
+from src.core.ecs import EntityManager, ENTITY_INDEX_BITS
+from src.world.grid import (
+    Grid, polygon_mask, LAYER_TERRAIN, LAYER_MOVE_COST, LAYER_OCCUPIED_BY, LAYER_ZONE, LAYER_DTYPES, LAYER_DEFAULTS, NUM_LAYERS,
+    IMPASSABLE, TERRAIN_GRASS, TERRAIN_WATER, ZONE_NONE, ZONE_STOCKPILE, ZONE_FARM,
+)
+from src.world.zone_manager import ZoneManager
+
+# --- Chunk tracking ---
+def test_writes_mark_their_chunks_dirty():
+    grid = Grid(40, 20, chunk_size=16)
+    assert (grid.chunks_x, grid.chunks_y) == (3, 2)
+    assert grid.chunk_bounds(2, 1) == (32, 16, 40, 20)
+
+    grid.set_terrain(17, 3, TERRAIN_WATER)
+    grid.set_zone(39, 19, ZONE_STOCKPILE)
+    assert grid.drain_dirty() == {(1, 0, LAYER_TERRAIN), (1, 0, LAYER_MOVE_COST), (2, 1, LAYER_ZONE)}
+    assert grid.drain_dirty() == set()
+
+def test_rect_changes_cover_every_chunk_they_touch():
+    grid = Grid(64, 64, chunk_size=16)
+    grid.fill_terrain((15, 15, 17, 33), TERRAIN_WATER)
+    chunks = {(cx, cy) for cx, cy, layer in grid.drain_dirty() if layer == LAYER_TERRAIN}
+    assert chunks == {(0, 0), (1, 0), (0, 1), (1, 1), (0, 2), (1, 2)}
+
+def test_chunks_changed_since_a_revision():
+    grid = Grid(32, 32, chunk_size=16)
+    grid.set_terrain(0, 0, TERRAIN_WATER)
+    seen = grid.revision
+    grid.set_terrain(20, 20, TERRAIN_WATER)
+    grid.set_zone(20, 0, ZONE_STOCKPILE)
+
+    assert grid.chunks_changed_since(seen, LAYER_MOVE_COST) == [(1, 1)]
+    assert grid.chunks_changed_since(seen, LAYER_ZONE) == [(1, 0)]
+    assert grid.chunks_changed_since(0, LAYER_TERRAIN) == [(0, 0), (1, 1)]
+
+def test_zone_writes_do_not_bump_the_cost_revision():
+    grid = Grid(8, 8)
+    revision, cost_revision = grid.revision, grid.cost_revision
+    grid.set_zone(1, 1, ZONE_STOCKPILE)
+    assert grid.revision > revision and grid.cost_revision == cost_revision
+    grid.set_terrain(1, 1, TERRAIN_WATER)
+    assert grid.cost_revision == cost_revision + 1
+
+# --- Layers ---
+def test_layers_are_separate_arrays_with_their_own_dtype():
+    grid = Grid(12, 7)
+    for layer in range(NUM_LAYERS):
+        if LAYER_DTYPES[layer] is None:
+            with pytest.raises(ValueError):
+                grid.layer(layer)
+            continue
+        array = grid.layer(layer)
+        assert array.shape == (12, 7)
+        assert array.dtype == LAYER_DTYPES[layer]
+        assert array.flags.c_contiguous
+        assert (array == LAYER_DEFAULTS[layer]).all()
+    # Down from 10 bytes a tile (five int16 layers); occupancy no longer costs any
+    assert grid.nbytes == 12 * 7 * 4
+
+def test_occupancy_holds_recycled_entity_handles():
+    em = EntityManager()
+    entity = em.create_entity()
+    for _ in range(300):
+        em.destroy_entity(entity)
+        entity = em.create_entity()
+    assert entity >> ENTITY_INDEX_BITS == 300
+
+    grid = Grid(40, 40, chunk_size=16)
+    seen = grid.revision
+    grid.set_occupant(17, 2, entity)
+    grid.set_occupant(50, 2, entity)
+    assert grid.get_occupant(17, 2) == entity and em.has_entity(grid.get_occupant(17, 2))
+    assert grid.get_occupant(0, 0) is None and grid.get_occupant(50, 2) is None
+    assert grid.chunks_changed_since(seen, LAYER_OCCUPIED_BY) == [(1, 0)]
+
+    em.destroy_entity(entity)
+    assert not em.has_entity(grid.get_occupant(17, 2))
+    grid.set_occupant(17, 2, None)
+    assert grid.occupants == {}
+
+def test_terrain_writes_keep_move_costs_in_step():
+    grid = Grid(6, 6)
+    grid.set_terrain(2, 3, TERRAIN_WATER)
+    assert grid.get_terrain(2, 3) == TERRAIN_WATER
+    assert grid.layer(LAYER_MOVE_COST)[2, 3] == IMPASSABLE and not grid.is_walkable(2, 3)
+    grid.set_terrain(2, 3, TERRAIN_GRASS)
+    assert grid.is_walkable(2, 3)
+    assert grid.get_terrain(-1, 0) == -1 and grid.get_zone(6, 0) == ZONE_NONE
+
+# --- Region writes ---
+def test_fill_terrain_matches_per_tile_writes_with_one_notification():
+    grid, reference = Grid(20, 20), Grid(20, 20)
+    changes = []
+    grid.add_change_listener(lambda *rect: changes.append(rect))
+
+    grid.fill_terrain((15, -3, 25, 4), TERRAIN_WATER)
+    for x in range(15, 20):
+        for y in range(0, 4):
+            reference.set_terrain(x, y, TERRAIN_WATER)
+
+    assert changes == [(15, 0, 20, 4)]
+    for layer in (LAYER_TERRAIN, LAYER_MOVE_COST):
+        assert np.array_equal(grid.layer(layer), reference.layer(layer))
+    assert not grid.is_reachable((0, 0), (17, 2))
+
+def test_polygon_regions():
+    square = polygon_mask([(2, 2), (6, 2), (6, 5), (2, 5)], (0, 0, 8, 8))
+    expected = np.zeros((8, 8), dtype=bool)
+    expected[2:6, 2:5] = True
+    assert np.array_equal(square, expected)
+
+    grid = Grid(10, 10)
+    grid.fill_terrain([(5, 0), (10, 5), (5, 10), (0, 5)], TERRAIN_WATER)
+    water = grid.layer(LAYER_TERRAIN) == TERRAIN_WATER
+    # Tiles count by their centre; centres exactly on an edge may go either way
+    for x in range(10):
+        for y in range(10):
+            distance = abs(x + 0.5 - 5) + abs(y + 0.5 - 5)
+            if distance != 5:
+                assert water[x, y] == (distance < 5), (x, y)
+
+def test_masks_are_clipped_at_the_grid_edge():
+    grid = Grid(8, 8)
+    mask = np.ones((4, 4), dtype=bool)
+    mask[0, 0] = False
+    grid.set_terrain_mask(mask, TERRAIN_WATER, origin=(6, -2))
+    water = np.argwhere(grid.layer(LAYER_TERRAIN) == TERRAIN_WATER).tolist()
+    assert water == [[6, 0], [6, 1], [7, 0], [7, 1]]
+    assert grid.resolve_region((9, 9, 12, 12)) is None
+
+def test_float_rects_cover_the_tiles_they_touch():
+    grid = Grid(8, 8)
+    assert grid.resolve_region((0.0, 0.0, 5.0, 5.0)) == ((0, 0, 5, 5), None)
+    assert grid.resolve_region((1.5, 2, np.float64(3.2), 9.0)) == ((1, 2, 4, 8), None)
+    with pytest.raises(ValueError, match="rect"):
+        grid.resolve_region([(0, 0), (4, 0), 4])
+
+def test_mark_zone_region_matches_per_tile_marks():
+    grid, reference = Grid(16, 16), Grid(16, 16)
+    zones, reference_zones = ZoneManager(grid), ZoneManager(reference)
+    events, reference_events = [], []
+    zones.add_listener(lambda *event: events.append(event))
+    reference_zones.add_listener(lambda *event: reference_events.append(event))
+
+    for manager in (zones, reference_zones):
+        manager.mark_zone(3, 3, ZONE_FARM)
+    assert zones.mark_zone_region((2, 2, 6, 5), ZONE_STOCKPILE) == 12
+    assert zones.mark_zone_region((2, 2, 6, 5), ZONE_STOCKPILE) == 0
+    for x in range(2, 6):
+        for y in range(2, 5):
+            reference_zones.mark_zone(x, y, ZONE_STOCKPILE)
+
+    assert np.array_equal(grid.layer(LAYER_ZONE), reference.layer(LAYER_ZONE))
+    assert zones.zone_cache == reference_zones.zone_cache
+    assert len(zones.zone_index[ZONE_FARM]) == 0 and len(zones.zone_index[ZONE_STOCKPILE]) == 12
+    assert sorted(events) == sorted(reference_events)
@@ -0,0 +1,74 @@
+import pytest
+from src.world.grid import Grid, TERRAIN_GRASS, TERRAIN_WATER
+from src.world.hpa import HierarchicalPathfinder, find_path_hierarchical, search_hierarchical
+from src.world.pathfinding import run_search
+from tests.helpers import random_grid, random_pairs, reference_cost, path_cost
+
+@pytest.mark.parametrize("seed, max_cost", [(11, 1), (12, 3)])
+def test_paths_are_valid_and_found_iff_reachable(seed: int, max_cost: int):
+    grid = random_grid(48, 40, seed, water=0.2, max_cost=max_cost)
+    pathfinder = HierarchicalPathfinder(grid)
+    for start, end in random_pairs(grid, 60, seed):
+        expected = reference_cost(grid, start, end)
+        path = pathfinder.find_path(start, end)
+        if expected is None or start == end:
+            assert path == []
+        else:
+            # Near-optimal: never cheaper than the exact answer
+            assert path_cost(grid, start, end, path) >= expected
+
+def test_open_grid_paths_are_optimal():
+    grid = Grid(64, 64, chunk_size=8)
+    pathfinder = HierarchicalPathfinder(grid)
+    path = pathfinder.find_path((1, 2), (60, 57))
+    assert path_cost(grid, (1, 2), (60, 57), path) == 59 + 55
+
+def test_terrain_change_invalidates_touched_clusters():
+    grid = Grid(32, 16, chunk_size=8)
+    pathfinder = HierarchicalPathfinder(grid)
+    assert pathfinder.find_path((0, 8), (31, 8))
+    cached = set(pathfinder._cluster_edges)
+
+    # Wall off x = 20 except for one gap at the bottom
+    grid.fill_terrain((20, 0, 21, 15), TERRAIN_WATER)
+    # Picked up from the chunk revisions when the next search starts
+    assert (2, 0) in pathfinder._cluster_edges
+    pathfinder._sync()
+    assert (2, 0) not in pathfinder._cluster_edges and (2, 1) not in pathfinder._cluster_edges
+    assert (0, 0) in cached and (0, 0) in pathfinder._cluster_edges
+
+    path = pathfinder.find_path((0, 8), (31, 8))
+    path_cost(grid, (0, 8), (31, 8), path)
+    assert (20, 15) in path
+
+    grid.set_terrain(20, 15, TERRAIN_WATER)
+    assert pathfinder.find_path((0, 8), (31, 8)) == []
+
+def test_search_yields_work_and_returns_the_path():
+    grid = random_grid(48, 48, 5, water=0.1)
+    pathfinder = HierarchicalPathfinder(grid)
+    start, end = (0, 0), (47, 47)
+    grid.fill_terrain((0, 0, 1, 1), TERRAIN_GRASS)
+    grid.fill_terrain((47, 47, 48, 48), TERRAIN_GRASS)
+
+    search = pathfinder.search(start, end)
+    slices = []
+    try:
+        while True:
+            slices.append(next(search))
+    except StopIteration as stop:
+        path = stop.value
+    assert len(slices) > 1 and all(work > 0 for work in slices)
+    assert path == pathfinder.find_path(start, end)
+
+def test_short_trips_use_exact_astar():
+    grid = random_grid(64, 64, 9, water=0.2, max_cost=5)
+    for start, end in random_pairs(grid, 80, 9):
+        if abs(end[0] - start[0]) + abs(end[1] - start[1]) > 2 * grid.chunk_size:
+            continue
+        expected = reference_cost(grid, start, end)
+        for path in (find_path_hierarchical(grid, start, end), run_search(search_hierarchical(grid, start, end))):
+            if expected is None or start == end:
+                assert path == []
+            else:
+                assert path_cost(grid, start, end, path) == expected
@@ -0,0 +1,74 @@
+import pytest
+from src.core.ecs import EntityManager
+from src.core.time_manager import TimeManager
+from src.systems.needs_system import NeedsSystem
+from src.components.data_components import (
+    ActionComponent, HungerComponent, TirednessComponent, MoodComponent, PositionComponent,
+)
+
+NEEDS_CONFIG = {
+    # One game hour per real second
+    "simulation": {"day_length_seconds": 24.0},
+    "entities": {"villager": {"needs": {
+        "hunger_per_hour": 2.0, "tiredness_per_hour_working": 5.0, "tiredness_per_hour_resting": -10.0,
+    }}},
+    "time": {"seasons": {"spring": {"food_consumption_multiplier": 1.5}}},
+}
+
+@pytest.fixture
+def needs(em: EntityManager, make_config):
+    time_manager = TimeManager(day_length_seconds=24.0)
+    time_manager.time_of_day = 12.0
+    return NeedsSystem(em, time_manager, make_config(NEEDS_CONFIG))
+
+def _villager(em: EntityManager, action=None, hunger=0.0, tiredness=50.0, mood=50.0) -> int:
+    components = [HungerComponent(hunger), TirednessComponent(tiredness), MoodComponent(mood)]
+    if action is not None:
+        components.append(ActionComponent(current_action=action))
+    return em.create_entity(*components)
+
+def _needs(em: EntityManager, entity: int):
+    return (em.get_component(entity, HungerComponent).hunger,
+            em.get_component(entity, TirednessComponent).tiredness,
+            em.get_component(entity, MoodComponent).mood)
+
+def test_tiredness_depends_on_activity(em: EntityManager, needs: NeedsSystem):
+    idle = _villager(em, "idle")
+    sleeping = _villager(em, "sleep")
+    working = _villager(em, "chop")
+    # No ActionComponent, and in a different table
+    passive = _villager(em)
+    em.add_component(passive, PositionComponent(0, 0))
+
+    needs.update(1.0)
+
+    for entity in (idle, sleeping, working, passive):
+        assert _needs(em, entity)[0] == pytest.approx(3.0)
+    assert _needs(em, idle)[1] == pytest.approx(50.0)
+    assert _needs(em, sleeping)[1] == pytest.approx(40.0)
+    assert _needs(em, working)[1] == pytest.approx(55.0)
+    assert _needs(em, passive)[1] == pytest.approx(50.0)
+
+def test_night_work_is_more_tiring(em: EntityManager, needs: NeedsSystem):
+    needs.time_manager.time_of_day = 23.0
+    working = _villager(em, "build")
+    needs.update(1.0)
+    assert _needs(em, working)[1] == pytest.approx(57.5)
+
+def test_values_are_clamped_and_mood_tracks_unmet_needs(em: EntityManager, needs: NeedsSystem):
+    starving = _villager(em, "chop", hunger=99.0, tiredness=99.0, mood=0.2)
+    rested = _villager(em, "sleep", hunger=0.0, tiredness=2.0, mood=99.9)
+
+    needs.update(1.0)
+
+    assert _needs(em, starving) == pytest.approx((100.0, 100.0, 0.0))
+    assert _needs(em, rested) == pytest.approx((3.0, 0.0, 100.0))
+
+def test_update_skips_tombstoned_rows(em: EntityManager, needs: NeedsSystem):
+    villagers = [_villager(em, "chop") for _ in range(3)]
+    for entity, _ in em.view(ActionComponent):
+        em.destroy_entity(villagers[1])
+        # Runs while the destroyed row is still a tombstone
+        needs.update(1.0)
+        break
+    assert _needs(em, villagers[2])[1] == pytest.approx(55.0)
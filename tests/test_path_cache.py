@@ -0,0 +1,52 @@
+from src.world.grid import Grid, TERRAIN_GRASS, TERRAIN_WATER, ZONE_STOCKPILE
+from src.world.path_cache import PathCache
+
+def test_hits_return_copies():
+    grid = Grid(32, 32, chunk_size=8)
+    cache = PathCache(grid)
+    path = cache.find_path((0, 0), (5, 0))
+    path.pop()
+    again = cache.find_path((0, 0), (5, 0))
+
+    assert len(again) == 5
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.hit_rate() == 0.5
+
+def test_terrain_change_drops_only_paths_through_the_chunk():
+    grid = Grid(32, 32, chunk_size=8)
+    cache = PathCache(grid)
+    cache.find_path((0, 0), (5, 0))  # Chunk (0, 0) only
+    cache.find_path((0, 20), (5, 20))  # Chunk (0, 2) only
+
+    grid.set_terrain(3, 3, TERRAIN_WATER)
+    assert cache.get((0, 0), (5, 0)) is None
+    assert cache.get((0, 20), (5, 20)) is not None
+    assert (0, 0) not in cache._by_chunk
+
+def test_failures_are_reused_until_the_costs_change():
+    grid = Grid(16, 16, chunk_size=8)
+    grid.fill_terrain((8, 0, 9, 16), TERRAIN_WATER)
+    cache = PathCache(grid)
+    assert cache.find_path((0, 0), (15, 15)) == []
+    assert cache.get((0, 0), (15, 15)) == []
+
+    # Zone paints do not touch move costs
+    grid.set_zone(1, 1, ZONE_STOCKPILE)
+    assert cache.get((0, 0), (15, 15)) == []
+
+    # A failure depends on the whole map, even far from the cached endpoints
+    grid.set_terrain(8, 15, TERRAIN_GRASS)
+    assert cache.get((0, 0), (15, 15)) is None
+    assert cache.find_path((0, 0), (15, 15))
+
+def test_lru_eviction():
+    grid = Grid(16, 16)
+    cache = PathCache(grid, capacity=2)
+    cache.put((0, 0), (1, 0), [(1, 0)])
+    cache.put((0, 0), (2, 0), [(1, 0), (2, 0)])
+    cache.get((0, 0), (1, 0))
+    cache.put((0, 0), (3, 0), [(1, 0), (2, 0), (3, 0)])
+
+    assert cache.get((0, 0), (2, 0)) is None
+    assert cache.get((0, 0), (1, 0)) == [(1, 0)]
+    assert sum(len(keys) for keys in cache._by_chunk.values()) == 2
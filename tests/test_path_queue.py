@@ -0,0 +1,118 @@
+from src.components.data_components import ActionComponent, MovementComponent, PositionComponent, ResourceComponent
+from src.systems.action_system import ActionSystem
+from src.world.grid import Grid, TERRAIN_GRASS, TERRAIN_WATER
+from src.world.path_queue import PathQueue
+from tests.helpers import random_grid, random_pairs, reference_cost, path_cost
+
+def _drain(queue: PathQueue, limit: int = 1000) -> int:
+    """Processes until the queue is empty; returns the number of ticks it took."""
+    ticks = 0
+    while len(queue) and ticks < limit:
+        queue.process()
+        ticks += 1
+    return ticks
+
+def test_budget_spreads_searches_over_ticks():
+    grid = random_grid(64, 64, 31, water=0.15)
+    queue = PathQueue(grid, node_budget=64, ms_budget=1000.0)
+    pairs = [pair for pair in random_pairs(grid, 20, 31) if pair[0] != pair[1]]
+    requests = [queue.submit(start, end) for start, end in pairs]
+
+    queue.process()
+    assert not all(request.done for request in requests)
+    assert _drain(queue) > 1
+
+    for request, (start, end) in zip(requests, pairs):
+        assert request.done
+        if reference_cost(grid, start, end) is None:
+            assert request.path == []
+        else:
+            path_cost(grid, start, end, request.path)
+
+def test_trivial_requests_finish_at_submit():
+    grid = Grid(16, 16)
+    grid.fill_terrain((8, 0, 9, 16), TERRAIN_WATER)
+    queue = PathQueue(grid)
+    for request in (queue.submit((1, 1), (1, 1)), queue.submit((0, 0), (15, 15)), queue.submit((0, 0), (8, 3))):
+        assert request.done and request.path == []
+    assert len(queue) == 0
+
+def test_cancelled_requests_are_dropped():
+    grid = Grid(32, 32)
+    queue = PathQueue(grid, ms_budget=1000.0)
+    cancelled = queue.submit((0, 0), (31, 31))
+    kept = queue.submit((0, 0), (5, 5))
+    queue.cancel(cancelled)
+    queue.process()
+    assert not cancelled.done
+    assert kept.done and len(kept.path) == 10
+
+def test_search_restarts_after_terrain_change():
+    grid = Grid(64, 16, chunk_size=8)
+    queue = PathQueue(grid, node_budget=8, ms_budget=1000.0)
+    request = queue.submit((0, 8), (63, 8))
+    queue.process()
+    assert not request.done
+
+    # Wall across the map with one gap, between slices
+    grid.fill_terrain((40, 0, 41, 16), TERRAIN_WATER)
+    grid.set_terrain(40, 2, TERRAIN_GRASS)
+    _drain(queue)
+
+    assert request.done
+    path_cost(grid, (0, 8), (63, 8), request.path)
+    assert (40, 2) in request.path
+
+def test_batch_is_one_exact_search():
+    grid = random_grid(48, 48, 33, water=0.2, max_cost=3)
+    queue = PathQueue(grid, node_budget=100, ms_budget=1000.0)
+    pairs = random_pairs(grid, 12, 33)
+    end = pairs[0][1]
+    starts = [start for start, _ in pairs] + [end]
+    requests = queue.submit_batch(end, starts)
+    assert len(queue) <= 1 and requests[-1].done
+
+    _drain(queue)
+    for request in requests:
+        expected = reference_cost(grid, request.start, end)
+        if expected is None or request.start == end:
+            assert request.done and request.path == []
+        else:
+            assert path_cost(grid, request.start, end, request.path) == expected
+    # Members do not share path lists
+    assert len({id(request.path) for request in requests}) == len(requests)
+
+def test_batch_runs_while_any_member_wants_it():
+    grid = Grid(32, 32)
+    queue = PathQueue(grid, ms_budget=1000.0)
+    first, second = queue.submit_batch((31, 31), [(0, 0), (0, 31)])
+    queue.cancel(first)
+    queue.process()
+    assert second.done and len(second.path) == 31
+
+    dropped = queue.submit_batch((31, 31), [(0, 0), (0, 31)])
+    for request in dropped:
+        queue.cancel(request)
+    queue.process()
+    assert len(queue) == 0 and not any(request.done for request in dropped)
+
+def test_chop_approach_goes_through_the_queue(em, make_config):
+    grid = Grid(48, 8)
+    grid.fill_terrain((20, 0, 21, 7), TERRAIN_WATER)
+    config = make_config({"pathfinding": {"node_budget_per_tick": 8, "ms_budget_per_tick": 1000.0}})
+    actions = ActionSystem(em, grid, config, path_workers=0)
+    tree = em.create_entity(PositionComponent(45, 3), ResourceComponent("tree_oak", health=5, max_health=5))
+    chopper = em.create_entity(PositionComponent(0, 3), MovementComponent(speed=0.0),
+                               ActionComponent(current_action="chop", target_entity_id=tree))
+
+    actions.update(0.1)
+    move = em.get_component(chopper, MovementComponent)
+    assert move.pathing and move.path == [] and move.target == (44, 3)
+    assert em.get_component(chopper, ActionComponent).current_action == "chop"
+
+    for _ in range(200):
+        actions.update(0.1)
+        if move.path:
+            break
+    assert not move.pathing and move.path[-1] == (44, 3)
+    path_cost(grid, (0, 3), (44, 3), move.path)
@@ -0,0 +1,87 @@
+import time
+import pytest
+from src.world.grid import Grid, TERRAIN_GRASS, TERRAIN_WATER
+from src.world.path_service import PathService
+from tests.helpers import random_grid, random_pairs, reference_cost, path_cost
+
+def _wait(service: PathService, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while len(service) and time.monotonic() < deadline:
+        service.process()
+        time.sleep(0.001)
+    assert not len(service), "path workers did not finish"
+
+@pytest.fixture(params=[False, True], ids=["threads", "processes"])
+def make_service(request):
+    services = []
+
+    def make(grid: Grid) -> PathService:
+        service = PathService(grid, workers=2, processes=request.param)
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.shutdown()
+
+def test_worker_paths_are_exact(make_service):
+    grid = random_grid(40, 40, 41, water=0.2, max_cost=3)
+    service = make_service(grid)
+    pairs = random_pairs(grid, 30, 41)
+    requests = [service.submit(start, end) for start, end in pairs]
+    _wait(service)
+
+    for request, (start, end) in zip(requests, pairs):
+        assert request.done
+        expected = reference_cost(grid, start, end)
+        if expected is None or start == end:
+            assert request.path == []
+        else:
+            assert path_cost(grid, start, end, request.path) == expected
+
+def test_results_from_old_costs_are_recomputed(make_service):
+    grid = Grid(48, 16)
+    service = make_service(grid)
+    request = service.submit((0, 8), (47, 8))
+    # Lands before or while the worker runs; either way the delivered path must see it
+    grid.fill_terrain((24, 0, 25, 16), TERRAIN_WATER)
+    grid.set_terrain(24, 1, TERRAIN_GRASS)
+    _wait(service)
+
+    assert request.done
+    path_cost(grid, (0, 8), (47, 8), request.path)
+    assert (24, 1) in request.path
+
+def test_cancel_drops_the_request(make_service):
+    grid = Grid(16, 16)
+    service = make_service(grid)
+    request = service.submit((0, 0), (15, 15))
+    service.cancel(request)
+    assert len(service) == 0
+    service.process()
+    assert not request.done
+
+def test_batch_paths_are_exact(make_service):
+    grid = random_grid(40, 40, 43, water=0.2, max_cost=3)
+    service = make_service(grid)
+    pairs = random_pairs(grid, 15, 43)
+    end = pairs[0][1]
+    requests = service.submit_batch(end, [start for start, _ in pairs])
+    assert len(service) == 1
+    _wait(service)
+
+    for request in requests:
+        expected = reference_cost(grid, request.start, end)
+        if expected is None or request.start == end:
+            assert request.path == []
+        else:
+            assert path_cost(grid, request.start, end, request.path) == expected
+
+def test_batch_cancel_needs_every_member(make_service):
+    grid = Grid(16, 16)
+    service = make_service(grid)
+    first, second = service.submit_batch((15, 15), [(0, 0), (0, 15)])
+    service.cancel(first)
+    assert len(service) == 1
+    service.cancel(second)
+    assert len(service) == 0
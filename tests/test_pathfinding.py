@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+from src.core.profiler import Profiler
+from src.world.grid import Grid, LAYER_MOVE_COST, TERRAIN_WATER, TERRAIN_GRASS
+from src.world.pathfinding import PathEngine, find_path, find_paths_batch, get_engine
+from tests.helpers import random_grid, random_pairs, reference_cost, path_cost
+
+@pytest.mark.parametrize("seed, max_cost", [(1, 1), (2, 1), (3, 4), (4, 9)])
+def test_astar_matches_reference_costs(seed: int, max_cost: int):
+    grid = random_grid(40, 30, seed, water=0.25, max_cost=max_cost)
+    for start, end in random_pairs(grid, 60, seed):
+        expected = reference_cost(grid, start, end)
+        path = find_path(grid, start, end, jps=False)
+        if expected is None or start == end:
+            assert path == []
+        else:
+            assert path_cost(grid, start, end, path) == expected
+
+def test_invalid_endpoints_return_empty():
+    grid = Grid(8, 8)
+    grid.set_terrain(5, 5, TERRAIN_WATER)
+    assert find_path(grid, (0, 0), (5, 5)) == []
+    assert find_path(grid, (0, 0), (8, 0)) == []
+    assert find_path(grid, (-1, 0), (3, 3)) == []
+
+def test_walled_off_goal_is_rejected_without_searching():
+    grid = Grid(10, 10)
+    grid.fill_terrain((5, 0, 6, 10), TERRAIN_WATER)
+    engine = get_engine(grid)
+    assert engine.find_path((0, 0), (9, 9)) == []
+    assert engine.expanded == 0
+
+def test_engine_follows_terrain_and_size_changes():
+    grid = Grid(10, 3)
+    engine = PathEngine(grid)
+    assert len(engine.find_path((0, 1), (9, 1))) == 9
+
+    grid.fill_terrain((5, 0, 6, 2), TERRAIN_WATER)
+    path = engine.find_path((0, 1), (9, 1))
+    assert (5, 2) in path and len(path) == 11
+
+    grid.set_terrain(5, 2, TERRAIN_WATER)
+    assert engine.find_path((0, 1), (9, 1)) == []
+    grid.fill_terrain((5, 0, 6, 3), TERRAIN_GRASS)
+    assert len(engine.find_path((0, 1), (9, 1))) == 9
+
+def test_zone_writes_keep_the_cost_copy():
+    grid = Grid(10, 10)
+    engine = get_engine(grid)
+    engine.find_path((0, 0), (9, 9))
+    cost_revision = engine._cost_revision
+    grid.set_zone(3, 3, 1)
+    engine.find_path((0, 0), (9, 9))
+    assert engine._cost_revision == cost_revision == grid.cost_revision
+
+def test_profiler_counts_calls_and_nodes():
+    grid = Grid(10, 10)
+    Profiler.configure(True)
+    try:
+        find_path(grid, (0, 0), (9, 9), jps=False)
+        Profiler.end_tick(1)
+        summary = Profiler.summary()
+    finally:
+        Profiler.configure(False)
+    assert summary["path.calls"][0] == 1.0
+    assert summary["path.nodes"][0] == get_engine(grid).expanded
+
+# --- Batches ---
+@pytest.mark.parametrize("seed", [5, 6])
+def test_batch_paths_match_reference(seed: int):
+    grid = random_grid(40, 30, seed, water=0.25, max_cost=4)
+    pairs = random_pairs(grid, 40, seed)
+    goals = [end for _, end in pairs[:3]]
+    requests = [(start, goals[i % 3]) for i, (start, _) in enumerate(pairs)]
+    # Repeated and trivial requests
+    requests += [requests[0], (goals[0], goals[0]), ((0, -1), goals[1])]
+
+    paths = find_paths_batch(grid, requests)
+    assert paths[0] is not paths[-3]
+    for (start, end), path in zip(requests, paths):
+        expected = reference_cost(grid, start, end) if 0 <= start[1] else None
+        if expected is None or start == end:
+            assert path == []
+        else:
+            assert path_cost(grid, start, end, path) == expected
+
+def test_batch_search_slices_and_skips_other_regions():
+    grid = Grid(20, 20)
+    grid.fill_terrain((10, 0, 11, 20), TERRAIN_WATER)
+    engine = PathEngine(grid)
+    search = engine.search_paths_to((0, 0), [(5, 5), (15, 15)])
+    slices = 0
+    try:
+        while True:
+            slices += next(search)
+    except StopIteration as stop:
+        paths = stop.value
+    assert len(paths[(5, 5)]) == 10 and paths[(15, 15)] == []
+    # Stopped once (5, 5) settled instead of flooding the whole half
+    assert slices < 10 * 20
+
+# --- Jump Point Search ---
+@pytest.mark.parametrize("seed, water", [(7, 0.0), (8, 0.15), (9, 0.3)])
+def test_jps_matches_reference_on_uniform_costs(seed: int, water: float):
+    grid = random_grid(48, 40, seed, water=water)
+    engine = PathEngine(grid)
+    for start, end in random_pairs(grid, 80, seed):
+        expected = reference_cost(grid, start, end)
+        path = engine.find_path(start, end, jps=True)
+        if expected is None or start == end:
+            assert path == []
+        else:
+            assert path_cost(grid, start, end, path) == expected
+
+def test_jps_expands_fewer_nodes_on_open_maps():
+    grid = random_grid(64, 64, 3, water=0.05)
+    grid.fill_terrain((0, 0, 1, 1), TERRAIN_GRASS)
+    grid.fill_terrain((63, 63, 64, 64), TERRAIN_GRASS)
+    engine = PathEngine(grid)
+    engine.find_path((0, 0), (63, 63), jps=False)
+    astar = engine.expanded
+    engine.find_path((0, 0), (63, 63), jps=True)
+    assert engine.expanded < astar
+
+def test_jps_is_gated_per_region():
+    grid = Grid(20, 10)
+    grid.fill_terrain((10, 0, 11, 10), TERRAIN_WATER)
+    # The right half gets a mixed-cost swamp; the left half stays uniform
+    grid.layer(LAYER_MOVE_COST)[14:17, 2:8] = 5
+    grid.mark_changed(14, 2, 17, 8)
+    engine = PathEngine(grid)
+    for start, end in (((0, 5), (9, 5)), ((11, 5), (19, 5))):
+        path = engine.find_path(start, end, jps=True)
+        assert path_cost(grid, start, end, path) == reference_cost(grid, start, end)
+
+    assert engine._step_cost(grid.region_at(0, 0)) == 1
+    assert engine._step_cost(grid.region_at(19, 0)) == 0
+
+def test_jump_tables_update_incrementally():
+    grid = random_grid(48, 48, 12, water=0.2, chunk_size=8)
+    engine = PathEngine(grid)
+    engine.find_path((0, 0), (1, 1), jps=True)
+    rng = np.random.default_rng(12)
+    for _ in range(20):
+        x, y = int(rng.integers(48)), int(rng.integers(48))
+        grid.set_terrain(x, y, TERRAIN_WATER if grid.is_walkable(x, y) else TERRAIN_GRASS)
+        engine._sync()
+        engine._jump_tables()
+
+        fresh = PathEngine(grid)
+        fresh._sync()
+        fresh._jump_tables()
+        for name in ("_east", "_west", "_south", "_north", "_run"):
+            assert np.array_equal(getattr(engine, name), getattr(fresh, name)), name
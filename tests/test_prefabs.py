@@ -0,0 +1,77 @@
+import copy
+import pytest
+from src.core.ecs import EntityManager
+from src.core.prefabs import PrefabRegistry
+from src.components.data_components import PositionComponent, ResourceComponent, ActionComponent
+from src.components.skill_component import SkillComponent
+from src.components.tags import IsTree
+
+PREFAB_CONFIG = {
+    "entities": {"tree_oak": {"hp": 30, "drops": {"log": [2, 4]}}, "villager": {"skills": {"logging": 0.5}}},
+    "prefabs": {
+        "tree_oak": {"components": {
+            "ResourceComponent": {"resource_type": "tree_oak", "health": "$entities.tree_oak.hp",
+                                  "max_health": "$entities.tree_oak.hp", "drops": "$entities.tree_oak.drops"},
+            "IsTree": {},
+        }},
+        "villager": {"components": {
+            "ActionComponent": {},
+            "SkillComponent": {"skills": "$entities.villager.skills"},
+        }},
+        "broken": {"components": {"NoSuchComponent": {}}},
+    },
+}
+
+@pytest.fixture
+def prefabs(em: EntityManager, make_config) -> PrefabRegistry:
+    return PrefabRegistry(em, make_config(PREFAB_CONFIG))
+
+def test_spawn_resolves_config_references(em: EntityManager, prefabs: PrefabRegistry):
+    tree = prefabs.spawn("tree_oak", (4, 5))
+    resource = em.get_component(tree, ResourceComponent)
+    assert (resource.health, resource.max_health, resource.drops) == (30, 30, {"log": [2, 4]})
+    assert em.has_component(tree, IsTree)
+    assert em.get_component(tree, PositionComponent) == PositionComponent(4, 5)
+
+def test_mutable_values_are_not_shared(em: EntityManager, prefabs: PrefabRegistry):
+    single = prefabs.spawn("villager", (0, 0))
+    batch = prefabs.spawn_batch("villager", [(1, 1), (2, 2)])
+    skills = [em.get_component(e, SkillComponent).skills for e in [single] + batch]
+    skills[0]["logging"] = 1.0
+    skills[1]["farming"] = 0.2
+    assert skills[2] == {"logging": 0.5}
+    assert prefabs.config_manager.get("entities.villager.skills") == {"logging": 0.5}
+
+def test_spawn_batch_fills_one_table(em: EntityManager, prefabs: PrefabRegistry):
+    positions = [(x, 0) for x in range(10)]
+    trees = prefabs.spawn_batch("tree_oak", positions)
+
+    assert len(trees) == 10
+    assert len({id(em._entity_archetype[t]) for t in trees}) == 1
+    assert [(em.get_component(t, PositionComponent).x, 0) for t in trees] == positions
+    # Each tree has its own health
+    em.get_component(trees[0], ResourceComponent).health -= 10
+    assert em.get_component(trees[1], ResourceComponent).health == 30
+    assert prefabs.spawn_batch("tree_oak", []) == []
+
+def test_overrides_apply_per_component(em: EntityManager, prefabs: PrefabRegistry):
+    overrides = {"ResourceComponent": {"health": 5}, "ActionComponent": {"current_action": "chop"}}
+    tree = prefabs.spawn("tree_oak", (0, 0), overrides)
+    batch = prefabs.spawn_batch("villager", [(0, 0)], overrides)
+    assert em.get_component(tree, ResourceComponent).health == 5
+    assert em.get_component(batch[0], ActionComponent).current_action == "chop"
+
+def test_templates_recompile_after_config_reload(em: EntityManager, prefabs: PrefabRegistry):
+    prefabs.spawn("tree_oak", (0, 0))
+    # A reload swaps in freshly parsed dicts
+    reloaded = copy.deepcopy(prefabs.config_manager.config)
+    reloaded["entities"]["tree_oak"]["hp"] = 99
+    prefabs.config_manager.config = reloaded
+    tree = prefabs.spawn("tree_oak", (0, 0))
+    assert em.get_component(tree, ResourceComponent).health == 99
+
+def test_unknown_names_raise(prefabs: PrefabRegistry):
+    with pytest.raises(KeyError):
+        prefabs.spawn("dragon", (0, 0))
+    with pytest.raises(KeyError):
+        prefabs.spawn("broken", (0, 0))
@@ -0,0 +1,77 @@
+import csv
+import json
+import pytest
+from src.core.ecs import System, EntityManager
+from src.core.profiler import Profiler
+from src.core.scheduler import Scheduler
+from src.components.data_components import PositionComponent
+
+@pytest.fixture
+def profiler():
+    Profiler.configure(True, history=4)
+    yield Profiler
+    Profiler.configure(False)
+
+def test_series_stay_aligned_across_ticks(profiler):
+    profiler.count("a")
+    profiler.end_tick(1)
+    profiler.count("b", 3)
+    profiler.count("b", 2)
+    profiler.end_tick(2)
+    profiler.end_tick(3)
+
+    assert list(profiler._series["a"]) == [1.0, 0.0, 0.0]
+    assert list(profiler._series["b"]) == [0.0, 5.0, 0.0]
+    assert profiler.summary()["b"] == (pytest.approx(5.0 / 3), 5.0)
+
+def test_ring_buffer_keeps_the_last_ticks(profiler):
+    for tick in range(10):
+        profiler.count("a", tick)
+        profiler.end_tick(tick)
+    assert list(profiler._ticks) == [6, 7, 8, 9]
+    assert list(profiler._series["a"]) == [6.0, 7.0, 8.0, 9.0]
+
+def test_system_times_and_queries_are_attributed(em: EntityManager, profiler):
+    class Walker(System):
+        reads = (PositionComponent,)
+
+        def update(self, dt: float):
+            for _ in em.view(PositionComponent):
+                pass
+
+    for x in range(3):
+        em.create_entity(PositionComponent(x, 0))
+    em.destroy_entity(em.create_entity())
+    scheduler = Scheduler(em, max_workers=1)
+    scheduler.add_system(Walker())
+    scheduler.run_frame(0.1)
+    profiler.end_tick(1)
+
+    summary = profiler.summary()
+    assert summary["query.Walker.count"][0] == 1.0
+    assert summary["query.Walker.rows"][0] == 3.0
+    assert summary["entities.created"][0] == 4.0
+    assert summary["entities.destroyed"][0] == 1.0
+    assert "tick.ms" in summary
+    assert [name for name, _ in profiler.slowest_systems()] == ["Walker"]
+
+def test_disabled_profiler_records_nothing(em: EntityManager):
+    Profiler.configure(False)
+    em.create_entity(PositionComponent(0, 0))
+    list(em.view(PositionComponent))
+    Profiler.end_tick(1)
+    assert Profiler.summary() == {}
+
+def test_dump_writes_csv_and_json(profiler, tmp_path):
+    profiler.count("path.calls", 2)
+    profiler.end_tick(7)
+    prefix = tmp_path / "out" / "profile"
+    profiler.dump(str(prefix))
+
+    with open(str(prefix) + ".csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.reader(f))
+    assert rows == [["tick", "path.calls"], ["7", "2.0"]]
+    with open(str(prefix) + ".json", encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["ticks"] == [7]
+    assert data["summary"]["path.calls"] == {"mean": 2.0, "max": 2.0}
@@ -0,0 +1,100 @@
+from collections import deque
+import numpy as np
+import pytest
+from src.world.grid import Grid, TERRAIN_GRASS, TERRAIN_WATER
+from src.world.regions import RegionMap, label_regions, NO_REGION
+
+def _reference_labels(walkable: np.ndarray) -> np.ndarray:
+    """Flood fill from each unlabelled tile in index order, so every label is its region's smallest index."""
+    width, height = walkable.shape
+    labels = np.full(walkable.size, NO_REGION, dtype=np.int32)
+    for x in range(width):
+        for y in range(height):
+            if not walkable[x, y] or labels[x * height + y] != NO_REGION:
+                continue
+            label = x * height + y
+            labels[label] = label
+            queue = deque([(x, y)])
+            while queue:
+                cx, cy = queue.popleft()
+                for nx, ny in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                    if 0 <= nx < width and 0 <= ny < height and walkable[nx, ny] and labels[nx * height + ny] == NO_REGION:
+                        labels[nx * height + ny] = label
+                        queue.append((nx, ny))
+    return labels
+
+def _assert_same_regions(labels: np.ndarray, walkable: np.ndarray):
+    """Same partition as a fresh labelling, and every label is the index of a tile in its region."""
+    expected = _reference_labels(walkable)
+    assert np.array_equal(labels == NO_REGION, expected == NO_REGION)
+    walkable_tiles = expected != NO_REGION
+    assert np.array_equal(expected[labels[walkable_tiles]], expected[walkable_tiles])
+    pairs = set(zip(labels[walkable_tiles].tolist(), expected[walkable_tiles].tolist()))
+    assert len(pairs) == len(set(expected[walkable_tiles].tolist()))
+
+@pytest.mark.parametrize("seed", range(4))
+def test_label_regions_matches_flood_fill(seed: int):
+    walkable = np.random.default_rng(seed).random((23, 17)) > 0.4
+    assert np.array_equal(label_regions(walkable), _reference_labels(walkable))
+
+@pytest.mark.parametrize("seed", range(3))
+def test_incremental_updates_match_full_relabel(seed: int):
+    rng = np.random.default_rng(seed)
+    walkable = rng.random((16, 12)) > 0.35
+    regions = RegionMap(walkable)
+    for _ in range(300):
+        x, y = int(rng.integers(16)), int(rng.integers(12))
+        walkable[x, y] = not walkable[x, y]
+        regions.mark_changed(x, y, x + 1, y + 1)
+        regions.refresh(walkable)
+        _assert_same_regions(regions.labels, walkable)
+
+def test_blocking_a_tile_with_a_connected_ring_skips_the_relabel(monkeypatch):
+    walkable = np.ones((12, 12), dtype=bool)
+    walkable[6, 3:9] = False
+    walkable[10, :] = False
+    walkable[10, 5] = True
+    regions = RegionMap(walkable)
+    relabels = []
+    monkeypatch.setattr("src.world.regions.label_regions",
+                        lambda mask: relabels.append(mask) or label_regions(mask))
+
+    # Open field, and the end of a wall: the neighbours stay joined around the tile
+    for x, y in ((2, 2), (6, 9)):
+        walkable[x, y] = False
+        regions.mark_changed(x, y, x + 1, y + 1)
+        regions.refresh(walkable)
+    assert relabels == []
+    _assert_same_regions(regions.labels, walkable)
+
+    # The gap in the other wall is the only way through: that one relabels
+    walkable[10, 5] = False
+    regions.mark_changed(10, 5, 11, 6)
+    regions.refresh(walkable)
+    assert len(relabels) == 1
+    _assert_same_regions(regions.labels, walkable)
+
+def test_large_edits_relabel_everything():
+    walkable = np.ones((10, 10), dtype=bool)
+    regions = RegionMap(walkable)
+    walkable[5, :] = False
+    regions.mark_changed(5, 0, 6, 10)
+    walkable[:, 5] = False
+    regions.mark_changed(0, 5, 10, 6)
+    # 19 changed tiles: past FULL_RELABEL_THRESHOLD
+    regions.refresh(walkable)
+    assert np.array_equal(regions.labels, label_regions(walkable))
+    assert len(set(regions.labels.tolist()) - {NO_REGION}) == 4
+
+def test_grid_reachability():
+    grid = Grid(10, 10)
+    grid.fill_terrain((5, 0, 6, 10), TERRAIN_WATER)
+    assert grid.is_reachable((0, 0), (4, 9))
+    assert not grid.is_reachable((0, 0), (9, 9))
+    # Water is worked from beside it
+    assert not grid.is_reachable((0, 0), (5, 5))
+    assert grid.is_reachable((0, 0), (5, 5), adjacent=True)
+    assert grid.region_at(5, 5) == NO_REGION and grid.region_at(-1, 0) == NO_REGION
+
+    grid.set_terrain(5, 9, TERRAIN_GRASS)
+    assert grid.is_reachable((0, 0), (9, 9))
@@ -0,0 +1,40 @@
+import pygame
+from src.core.ecs import EntityManager
+from src.systems.render_system import RenderSystem, COLOR_GRASS, COLOR_WATER
+from src.world.grid import Grid, TERRAIN_WATER, ZONE_STOCKPILE
+from src.world.zone_manager import ZoneManager
+
+def _renderer(em: EntityManager) -> RenderSystem:
+    zones = ZoneManager(Grid(32, 32, chunk_size=8))
+    renderer = RenderSystem(pygame.Surface((160, 160)), zones.grid, em, {"global": {"pixels_per_unit": 8}}, zone_manager=zones)
+    # Grid lines off, so tile centres show their plain terrain colour
+    renderer.zoom_level = 0.5
+    return renderer
+
+def test_only_changed_chunks_are_redrawn(em: EntityManager):
+    renderer = _renderer(em)
+    renderer.update(0.0)
+    cached = dict(renderer._chunk_surfaces)
+    assert set(cached) == {(cx, cy) for cx in range(4) for cy in range(4)}
+
+    renderer.grid.set_terrain(9, 2, TERRAIN_WATER)
+    renderer.grid.set_zone(30, 30, ZONE_STOCKPILE)
+    renderer.update(0.0)
+    redrawn = {chunk for chunk, surface in renderer._chunk_surfaces.items() if surface is not cached[chunk]}
+    assert redrawn == {(1, 0), (3, 3)}
+    # Tile (9, 2) at 4 px per tile
+    assert renderer.screen.get_at((9 * 4 + 2, 2 * 4 + 2))[:3] == COLOR_WATER
+    assert renderer.screen.get_at((8 * 4 + 2, 2 * 4 + 2))[:3] == COLOR_GRASS
+
+def test_zoom_and_overlay_changes_redraw_everything(em: EntityManager):
+    renderer = _renderer(em)
+    renderer.update(0.0)
+    cached = dict(renderer._chunk_surfaces)
+    renderer.show_zones = False
+    renderer.update(0.0)
+    assert all(renderer._chunk_surfaces[chunk] is not surface for chunk, surface in cached.items())
+
+    # Chunks scrolled out of view are dropped
+    renderer.camera_pos = [16 * 8, 0.0]
+    renderer.update(0.0)
+    assert min(cx for cx, _ in renderer._chunk_surfaces) == 2
@@ -0,0 +1,104 @@
+from typing import Any, Tuple
+import numpy as np
+import pytest
+from src.components.data_components import ActionComponent, MovementComponent, PositionComponent
+from src.core.profiler import Profiler
+from src.systems.action_system import ActionSystem
+from src.world.grid import Grid, TERRAIN_GRASS, TERRAIN_WATER
+from src.world.pathfinding import find_path
+from src.world.replanner import IncrementalPlanner
+from tests.helpers import random_grid, walkable_tiles, reference_cost, path_cost
+
+def _check(grid: Grid, planner: IncrementalPlanner, start, goal):
+    path = planner.path(start)
+    expected = reference_cost(grid, start, goal)
+    if expected is None or start == goal:
+        assert path == []
+    else:
+        assert path_cost(grid, start, goal, path) == expected
+    return path
+
+@pytest.mark.parametrize("seed", range(3))
+def test_repairs_match_reference_while_walking(seed: int):
+    grid = random_grid(24, 24, 50 + seed, water=0.2, max_cost=3)
+    rng = np.random.default_rng(seed)
+    tiles = walkable_tiles(grid)
+    start, goal = tiles[0], tiles[-1]
+    planner = IncrementalPlanner(grid, start, goal)
+    path = _check(grid, planner, start, goal)
+
+    for _ in range(25):
+        # Walk a few steps, then edit terrain somewhere
+        if path:
+            start = path[min(2, len(path) - 1)]
+        x, y = int(rng.integers(24)), int(rng.integers(24))
+        if (x, y) not in (start, goal):
+            terrain = TERRAIN_WATER if grid.is_walkable(x, y) else TERRAIN_GRASS
+            grid.set_terrain(x, y, terrain)
+            planner.tiles_changed([(x, y)])
+        path = _check(grid, planner, start, goal)
+
+def _expanded(run) -> Tuple[Any, float]:
+    """Result of run() and the number of nodes it expanded."""
+    Profiler.configure(True)
+    try:
+        result = run()
+        Profiler.end_tick(0)
+        return result, Profiler.summary()["path.nodes"][0]
+    finally:
+        Profiler.configure(False)
+
+def test_repair_expands_less_than_replanning():
+    grid = random_grid(60, 60, 1, water=0.2, max_cost=4)
+    tiles = walkable_tiles(grid)
+    goal = tiles[-1]
+    planner = IncrementalPlanner(grid, tiles[0], goal)
+    path = planner.path()
+
+    # Halfway there, a tile a few steps ahead floods
+    start, blocked = path[len(path) // 2], path[len(path) // 2 + 3]
+    grid.set_terrain(*blocked, TERRAIN_WATER)
+    planner.tiles_changed([blocked])
+    path, repaired = _expanded(lambda: planner.path(start))
+    _, replanned = _expanded(IncrementalPlanner(grid, start, goal).path)
+
+    assert path_cost(grid, start, goal, path) == reference_cost(grid, start, goal)
+    assert repaired * 10 < replanned
+
+def test_blocked_goal_gives_no_path():
+    grid = Grid(10, 10)
+    planner = IncrementalPlanner(grid, (0, 0), (9, 9))
+    assert len(planner.path()) == 18
+    grid.fill_terrain((8, 9, 9, 10), TERRAIN_WATER)
+    grid.set_terrain(9, 8, TERRAIN_WATER)
+    planner.tiles_changed([(8, 9), (9, 8)])
+    assert planner.path() == []
+
+def test_action_system_repairs_within_budget_and_keeps_planners(em, make_config):
+    grid = Grid(40, 20)
+    config = make_config({"pathfinding": {"node_budget_per_tick": 1, "ms_budget_per_tick": 1000.0}})
+    actions = ActionSystem(em, grid, config, path_workers=0)
+    walkers = {}
+    for y in range(4):
+        move = MovementComponent(path=find_path(grid, (0, y), (39, y)), speed=0.0, target=(39, y))
+        walkers[em.create_entity(PositionComponent(0, y), move, ActionComponent(current_action="move"))] = move
+    actions.update(0.1)
+
+    # A wall with a gap at the bottom blocks every path; one repair fits each tick's budget
+    grid.fill_terrain((20, 0, 21, 19), TERRAIN_WATER)
+    for tick in range(1, 5):
+        actions.update(0.1)
+        repaired = [entity for entity, move in walkers.items() if (20, 19) in move.path]
+        assert len(repaired) == tick and len(actions._repairs) == 4 - tick
+    for entity, move in walkers.items():
+        start = em.get_component(entity, PositionComponent)
+        assert path_cost(grid, (start.x, start.y), move.target, move.path) == reference_cost(grid, (start.x, start.y), move.target)
+
+    # Later edits reuse the same planners
+    planners = dict(actions._planners)
+    assert set(planners) == set(walkers)
+    grid.set_terrain(22, 19, TERRAIN_WATER)
+    for _ in range(4):
+        actions.update(0.1)
+    assert actions._planners == planners
+    assert all((22, 19) not in move.path and move.path[-1] == move.target for move in walkers.values())
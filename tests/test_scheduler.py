@@ -0,0 +1,76 @@
+import threading
+import pytest
+from src.core.ecs import System, EntityManager, STRUCTURE
+from src.core.scheduler import Scheduler
+from src.components.data_components import PositionComponent, ItemComponent, HungerComponent
+
+class Probe(System):
+    def __init__(self, reads=(), writes=(), action=None):
+        self.reads = reads
+        self.writes = writes
+        self.action = action
+        self.threads = []
+
+    def update(self, dt: float):
+        self.threads.append(threading.current_thread().name)
+        if self.action:
+            self.action()
+
+@pytest.fixture
+def scheduler(em: EntityManager):
+    scheduler = Scheduler(em, max_workers=2)
+    yield scheduler
+    scheduler.shutdown()
+
+def _stages(scheduler: Scheduler, systems):
+    return [[systems.index(s) for s in stage] for stage in scheduler.stages]
+
+def test_stages_follow_read_write_conflicts(scheduler: Scheduler):
+    systems = [
+        Probe(writes=(PositionComponent,)),
+        Probe(reads=(HungerComponent,)),  # Independent of 0
+        Probe(reads=(PositionComponent,)),  # Reads what 0 writes
+        Probe(writes=(HungerComponent,)),  # Writes what 1 reads
+        Probe(reads=(ItemComponent,), writes=("jobs",)),
+    ]
+    for system in systems:
+        scheduler.add_system(system)
+    assert _stages(scheduler, systems) == [[0, 1, 4], [2, 3]]
+
+def test_structure_and_undeclared_systems_run_alone(scheduler: Scheduler):
+    systems = [Probe(reads=(PositionComponent,)), Probe(writes=(STRUCTURE,)), Probe(reads=(ItemComponent,)), Probe()]
+    for system in systems:
+        scheduler.add_system(system)
+    assert _stages(scheduler, systems) == [[0], [1], [2], [3]]
+
+def test_commands_flush_between_stages(em: EntityManager, scheduler: Scheduler):
+    seen = []
+    spawner = Probe(writes=(ItemComponent,), action=lambda: em.commands.spawn(ItemComponent("log")))
+    reader = Probe(reads=(ItemComponent,), action=lambda: seen.append(len(em.view(ItemComponent))))
+    scheduler.add_system(spawner)
+    scheduler.add_system(reader)
+
+    scheduler.run_frame(0.1)
+
+    assert seen == [1]
+    assert [name for name, _ in scheduler.stage_timings] == ["Probe", "Probe"]
+    assert set(scheduler.system_timings) == {"Probe"}
+
+def test_parallel_stage_runs_on_the_pool(scheduler: Scheduler):
+    barrier = threading.Barrier(2, timeout=5)
+    systems = [Probe(writes=(PositionComponent,), action=barrier.wait),
+               Probe(writes=(ItemComponent,), action=barrier.wait)]
+    for system in systems:
+        scheduler.add_system(system)
+
+    # Both systems must be running at once to get past the barrier
+    scheduler.run_frame(0.1)
+    assert all(name.startswith("system") for s in systems for name in s.threads)
+
+def test_worker_exceptions_propagate(scheduler: Scheduler):
+    def fail():
+        raise ValueError("boom")
+    scheduler.add_system(Probe(writes=(PositionComponent,), action=fail))
+    scheduler.add_system(Probe(writes=(ItemComponent,)))
+    with pytest.raises(ValueError):
+        scheduler.run_frame(0.1)
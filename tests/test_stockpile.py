@@ -0,0 +1,125 @@
+import pytest
+from src.core.ecs import EntityManager
+from src.components.data_components import ActionComponent, InventoryComponent, ItemComponent, PositionComponent
+from src.systems.action_system import ActionSystem
+from src.world.grid import Grid, ZONE_STOCKPILE, ZONE_NONE
+from src.world.zone_manager import ZoneManager
+
+@pytest.fixture
+def zones() -> ZoneManager:
+    zones = ZoneManager(Grid(20, 20), stockpile_slot_capacity=10)
+    zones.mark_zone_region((10, 10, 13, 11), ZONE_STOCKPILE)
+    return zones
+
+# --- Reservations ---
+def test_haulers_fan_out_once_a_tile_is_promised(zones: ZoneManager):
+    storage = zones.stockpile
+    assert storage.reserve(1, "log", 6, (0, 10)) == (10, 10)
+    # Room left for 4: a second load of 6 needs another tile
+    assert storage.reserve(2, "log", 6, (0, 10)) == (11, 10)
+    assert storage.reserve(3, "log", 4, (0, 10)) == (10, 10)
+    assert storage.reserve(4, "stone", 1, (0, 10)) == (12, 10)
+    assert storage.reserve(5, "plank", 1, (0, 10)) is None
+    assert storage.reservation(2) == (11, 10)
+
+def test_release_and_re_reserve_give_room_back(zones: ZoneManager):
+    storage = zones.stockpile
+    storage.reserve(1, "log", 10, (10, 10))
+    assert storage.reserve(2, "log", 10, (10, 10)) == (11, 10)
+    storage.release(1)
+    assert (10, 10) not in storage.slots
+    # A new reservation replaces the old one
+    assert storage.reserve(2, "log", 10, (10, 10)) == (10, 10)
+    assert (11, 10) not in storage.slots
+    storage.release(2)
+    storage.release(2)
+    assert storage.slots == {}
+
+def test_deposits_fill_the_stack_and_withdrawals_empty_it(zones: ZoneManager):
+    storage = zones.stockpile
+    tile = storage.reserve(1, "log", 3, (10, 10))
+    storage.deposit(tile, "log", 3, entity=100, hauler=1)
+    slot = storage.slots[tile]
+    assert (slot.amount, slot.reserved, slot.entity) == (3, 0, 100)
+    assert storage.stack_at(tile, "log") == 100 and storage.stack_at(tile, "stone") is None
+    assert storage.accepts(tile, "log") and not storage.accepts(tile, "stone")
+    assert not storage.accepts((0, 0), "log")
+    assert storage.room(tile, "log") == 7
+
+    storage.deposit(tile, "log", 7, entity=100)
+    assert not storage.accepts(tile, "log")
+    # A hauler's own reservation is room for that hauler only
+    storage.withdraw(100, 4)
+    storage.reserve(2, "log", 4, (10, 10))
+    assert storage.room(tile, "log") == 0 and storage.room(tile, "log", hauler=2) == 4
+    storage.deposit(tile, "log", 4, entity=100, hauler=2)
+
+    storage.withdraw(100, 9)
+    assert slot.amount == 1
+    storage.remove_stack(100)
+    assert tile not in storage.slots
+    assert storage.reserve(2, "stone", 1, (10, 10)) == tile
+
+def test_unzoned_tile_drops_its_slot_and_reservations(zones: ZoneManager):
+    storage = zones.stockpile
+    storage.deposit((10, 10), "log", 2, entity=100)
+    storage.reserve(1, "log", 2, (10, 10))
+    zones.mark_zone(10, 10, ZONE_NONE)
+
+    assert (10, 10) not in storage.slots
+    assert storage.reservation(1) is None
+    assert storage.reserve(2, "log", 2, (10, 10)) == (11, 10)
+
+# --- Drops and pickups ---
+@pytest.fixture
+def actions(em: EntityManager, zones: ZoneManager, make_config) -> ActionSystem:
+    return ActionSystem(em, zones.grid, make_config({}), path_workers=0, zone_manager=zones)
+
+def _stacks(em: EntityManager):
+    return sorted((pos.x, pos.y, item.item_type, item.amount) for _, item, pos in em.get_entities_with(ItemComponent, PositionComponent))
+
+def test_same_tick_drops_merge_into_one_stack(em: EntityManager, zones: ZoneManager, actions: ActionSystem):
+    haulers = [em.create_entity(PositionComponent(10, 10), InventoryComponent(items={"log": 3}),
+                                ActionComponent(current_action="drop")) for _ in range(2)]
+    actions.update(0.1)
+    em.flush_commands()
+
+    assert _stacks(em) == [(10, 10, "log", 6)]
+    assert zones.stockpile.slots[(10, 10)].amount == 6
+    for hauler in haulers:
+        assert em.get_component(hauler, InventoryComponent).items.get("log", 0) == 0
+
+    # A later drop merges into the stack, now in the world
+    em.create_entity(PositionComponent(10, 10), InventoryComponent(items={"log": 2}), ActionComponent(current_action="drop"))
+    actions.update(0.1)
+    em.flush_commands()
+    assert _stacks(em) == [(10, 10, "log", 8)]
+
+def test_pickup_is_capped_by_inventory_room(em: EntityManager, zones: ZoneManager, actions: ActionSystem):
+    stack = em.create_entity(PositionComponent(10, 10), ItemComponent("log", amount=6))
+    zones.stockpile.deposit((10, 10), "log", 6, stack)
+    hauler = em.create_entity(PositionComponent(10, 10), InventoryComponent(items={"stone": 8}, capacity=10),
+                              ActionComponent(current_action="pickup", target_entity_id=stack))
+    actions.update(0.1)
+    em.flush_commands()
+
+    assert em.get_component(hauler, InventoryComponent).items == {"stone": 8, "log": 2}
+    assert _stacks(em) == [(10, 10, "log", 4)]
+    assert zones.stockpile.slots[(10, 10)].amount == 4
+
+def test_drops_onto_a_full_stack_leave_the_rest_loose(em: EntityManager, zones: ZoneManager, actions: ActionSystem):
+    for _ in range(2):
+        em.create_entity(PositionComponent(10, 10), InventoryComponent(items={"log": 7}),
+                         ActionComponent(current_action="drop"))
+    actions.update(0.1)
+    em.flush_commands()
+    assert _stacks(em) == [(10, 10, "log", 4), (10, 10, "log", 10)]
+    assert zones.stockpile.slots[(10, 10)].amount == 10
+
+    # Nothing more fits, and another type never shares the tile
+    em.create_entity(PositionComponent(10, 10), InventoryComponent(items={"log": 1, "stone": 2}),
+                     ActionComponent(current_action="drop"))
+    actions.update(0.1)
+    em.flush_commands()
+    assert _stacks(em) == [(10, 10, "log", 1), (10, 10, "log", 4), (10, 10, "log", 10)]
+    assert zones.stockpile.slots[(10, 10)].amount == 10
@@ -0,0 +1,77 @@
+import random
+import pytest
+from src.world.grid import Grid, TERRAIN_GRASS, TERRAIN_WATER, ZONE_STOCKPILE, ZONE_FARM, ZONE_NONE
+from src.world.zone_manager import ZoneIndex, ZoneManager
+from tests.helpers import random_grid, walkable_tiles, reference_cost
+
+def _manhattan(a, b) -> int:
+    return abs(a[0] - b[0]) + abs(a[1] - b[1])
+
+# --- Zone index ---
+@pytest.mark.parametrize("seed", range(3))
+def test_nearest_matches_brute_force(seed: int):
+    rng = random.Random(seed)
+    index = ZoneIndex(bucket_size=8)
+    tiles = {(rng.randrange(100), rng.randrange(80)) for _ in range(150)}
+    index.update(tiles)
+    removed = set(rng.sample(sorted(tiles), 40))
+    index.difference_update(removed)
+    tiles -= removed
+    assert len(index) == len(tiles)
+
+    for _ in range(50):
+        pos = (rng.randrange(-10, 110), rng.randrange(-10, 90))
+        found = index.nearest(pos, k=5)
+        expected = sorted(_manhattan(pos, tile) for tile in tiles)[:5]
+        assert [_manhattan(pos, tile) for tile in found] == expected
+        assert len(set(found)) == 5 and set(found) <= tiles
+
+def test_index_ignores_duplicates_and_drops_empty_buckets():
+    index = ZoneIndex(bucket_size=4)
+    index.add(1, 1)
+    index.add(1, 1)
+    index.discard(9, 9)
+    assert len(index) == 1
+    index.discard(1, 1)
+    assert len(index) == 0 and index.buckets == {}
+    assert index.nearest((0, 0)) == []
+
+def test_manager_keeps_index_in_step_with_marks():
+    zones = ZoneManager(Grid(32, 32))
+    zones.mark_zone(30, 30, ZONE_STOCKPILE)
+    zones.mark_zone(2, 2, ZONE_STOCKPILE)
+    assert zones.get_nearest_zone_tile((0, 0), ZONE_STOCKPILE) == (2, 2)
+
+    zones.mark_zone(2, 2, ZONE_FARM)
+    assert zones.get_nearest_zone_tile((0, 0), ZONE_STOCKPILE) == (30, 30)
+    zones.mark_zone(30, 30, ZONE_NONE)
+    assert zones.get_nearest_zone_tile((0, 0), ZONE_STOCKPILE) is None
+    assert zones.get_nearest_zone_tiles((0, 0), ZONE_FARM, k=3) == [(2, 2)]
+
+def test_manager_index_buckets_follow_grid_chunk_size():
+    zones = ZoneManager(Grid(40, 40, chunk_size=5))
+    zones.mark_zone(12, 3, ZONE_STOCKPILE)
+    zones.mark_zone_region((20, 20, 26, 22), ZONE_FARM)
+    assert zones.zone_index[ZONE_STOCKPILE].bucket_size == 5
+    assert zones.zone_index[ZONE_FARM].bucket_size == 5
+    assert set(zones.zone_index[ZONE_FARM].buckets) == {(4, 4), (5, 4)}
+    assert zones.get_nearest_zone_tile((0, 0), ZONE_STOCKPILE) == (12, 3)
+    assert zones.get_nearest_zone_tile((39, 39), ZONE_FARM) == (25, 21)
+
+def test_nearest_by_path_ranks_by_walking_cost():
+    grid = random_grid(30, 30, 61, water=0.0, max_cost=3)
+    # A wall with a gap at the far end: tiles just past it are close, but a long walk
+    grid.fill_terrain((0, 3, 29, 4), TERRAIN_WATER)
+    grid.fill_terrain((29, 0, 30, 30), TERRAIN_GRASS)
+    zones = ZoneManager(grid)
+    for tile in random.Random(61).sample(walkable_tiles(grid), 12):
+        zones.mark_zone(*tile, ZONE_STOCKPILE)
+
+    start = (1, 1)
+    costs = sorted(
+        (cost, tile) for tile in zones.zone_cache[ZONE_STOCKPILE]
+        for cost in [reference_cost(grid, start, tile) if tile != start else 0] if cost is not None
+    )
+    assert len(costs) >= 3
+    found = zones.get_nearest_zone_tiles(start, ZONE_STOCKPILE, k=3, by_path=True)
+    assert [reference_cost(grid, start, tile) for tile in found] == [cost for cost, _ in costs[:3]]